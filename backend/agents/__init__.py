@@ -7,7 +7,7 @@ from .cv_validator import validate_cv
 # Phase 2 - Job + Company Intelligence
 from .jd_analyzer import analyze_job_description
 from .company_intel import get_company_intelligence, get_company_intelligence_from_text
-from .url_resolver import extract_jd_from_url
+from .url_resolver import extract_jd_from_url, resolve_job_posting
 from .job_normalizer import normalize_job_company_package, get_phase2_warnings
 
 # Phase 3 - CV Matching & Tailoring
@@ -30,6 +30,7 @@ __all__ = [
     "get_company_intelligence",
     "get_company_intelligence_from_text",
     "extract_jd_from_url",
+    "resolve_job_posting",
     "normalize_job_company_package",
     "get_phase2_warnings",
     # Phase 3
@@ -0,0 +1,259 @@
+"""ATS platform adapters for job posting URLs.
+
+Greenhouse, Lever, Ashby and Workday expose postings through public JSON
+endpoints. An adapter recognizes the platform's URL pattern, fetches that
+JSON directly (one request, no HTML page, no LLM extraction) and converts
+it to a ResolvedJobPosting.
+
+API base URLs come from settings so the adapters can be pointed at a local
+stand-in server serving recorded responses.
+"""
+import html
+import re
+from urllib.parse import urlparse, parse_qs
+
+from config import settings
+from models.job import ResolvedJobPosting
+
+
+# Ashby employmentType → JobAnalysis.employment_type
+ASHBY_EMPLOYMENT_TYPES = {
+    "FullTime": "Full-time",
+    "PartTime": "Part-time",
+    "Intern": "Internship",
+    "Contract": "Contract",
+    "Temporary": "Temporary",
+}
+
+
+async def fetch_json(url: str) -> dict:
+    """
+    Fetch a JSON document from an ATS API through the shared fetcher.
+
+    Raises:
+        ValueError: If the request fails or the body is not JSON
+    """
+    from services.http_fetcher import http_fetcher
+
+    try:
+        return await http_fetcher.get_json(url)
+    except ValueError as e:
+        raise ValueError(f"Failed to fetch ATS posting: {e}")
+
+
+def _html_to_text(fragment: str) -> str:
+    from agents.url_resolver import basic_html_to_text
+
+    if not fragment:
+        return ""
+    if "&lt;" in fragment:
+        fragment = html.unescape(fragment)
+    return basic_html_to_text(fragment)
+
+
+def _compose(
+    role_title: str,
+    company_name: str,
+    location: str,
+    employment_type: str,
+    sections: list[str]
+) -> str:
+    header = "\n".join(h for h in (role_title, company_name, location, employment_type) if h)
+    return "\n\n".join(s for s in [header] + sections if s and s.strip())
+
+
+class ATSAdapter:
+    """Base class: recognize a platform URL and resolve it to a posting."""
+
+    name = ""
+
+    def match(self, url: str) -> dict | None:
+        """Return the identifiers parsed from a matching URL, else None."""
+        raise NotImplementedError
+
+    async def fetch(self, ids: dict) -> ResolvedJobPosting:
+        raise NotImplementedError
+
+
+class GreenhouseAdapter(ATSAdapter):
+    """boards.greenhouse.io/{board}/jobs/{id} (and job-boards / embed URLs)."""
+
+    name = "greenhouse"
+    _path_re = re.compile(r"^/(?P<board>[\w-]+)/jobs/(?P<job_id>\d+)")
+
+    def match(self, url: str) -> dict | None:
+        parsed = urlparse(url)
+        host = parsed.netloc.lower()
+        if not (host.endswith(".greenhouse.io") and ("boards" in host)):
+            return None
+
+        m = self._path_re.match(parsed.path)
+        if m:
+            return m.groupdict()
+
+        # Embedded board: /embed/job_app?for={board}&token={id}
+        query = parse_qs(parsed.query)
+        if parsed.path.startswith("/embed/job_app") and query.get("for") and query.get("token"):
+            return {"board": query["for"][0], "job_id": query["token"][0]}
+        return None
+
+    async def fetch(self, ids: dict) -> ResolvedJobPosting:
+        base = settings.GREENHOUSE_API_BASE_URL.rstrip("/")
+        data = await fetch_json(f"{base}/v1/boards/{ids['board']}/jobs/{ids['job_id']}")
+
+        role_title = data.get("title") or ""
+        company_name = data.get("company_name") or ""
+        location = (data.get("location") or {}).get("name") or ""
+        description = _html_to_text(data.get("content") or "")
+
+        return ResolvedJobPosting(
+            jd_text=_compose(role_title, company_name, location, "", [description]),
+            source=f"ats:{self.name}",
+            role_title=role_title,
+            company_name=company_name,
+            location=location
+        )
+
+
+class LeverAdapter(ATSAdapter):
+    """jobs.lever.co/{company}/{posting_id} (and jobs.eu.lever.co)."""
+
+    name = "lever"
+    _path_re = re.compile(r"^/(?P<company>[\w.-]+)/(?P<posting_id>[0-9a-fA-F-]{36})")
+
+    def match(self, url: str) -> dict | None:
+        parsed = urlparse(url)
+        host = parsed.netloc.lower()
+        if host not in ("jobs.lever.co", "jobs.eu.lever.co"):
+            return None
+        m = self._path_re.match(parsed.path)
+        if not m:
+            return None
+        return {**m.groupdict(), "eu": host == "jobs.eu.lever.co"}
+
+    async def fetch(self, ids: dict) -> ResolvedJobPosting:
+        base = settings.LEVER_API_BASE_URL.rstrip("/")
+        if ids["eu"] and base == "https://api.lever.co":
+            base = "https://api.eu.lever.co"
+        data = await fetch_json(f"{base}/v0/postings/{ids['company']}/{ids['posting_id']}")
+
+        categories = data.get("categories") or {}
+        role_title = data.get("text") or ""
+        location = categories.get("location") or ""
+        employment_type = categories.get("commitment") or ""
+
+        sections = [data.get("descriptionPlain") or _html_to_text(data.get("description") or "")]
+        for item in data.get("lists") or []:
+            content = _html_to_text(f"<ul>{item.get('content') or ''}</ul>")
+            sections.append(f"{item.get('text') or ''}\n{content}".strip())
+        sections.append(data.get("additionalPlain") or _html_to_text(data.get("additional") or ""))
+
+        return ResolvedJobPosting(
+            jd_text=_compose(role_title, "", location, employment_type, sections),
+            source=f"ats:{self.name}",
+            role_title=role_title,
+            employment_type=employment_type,
+            location=location
+        )
+
+
+class AshbyAdapter(ATSAdapter):
+    """jobs.ashbyhq.com/{organization}/{job_id}."""
+
+    name = "ashby"
+    _path_re = re.compile(r"^/(?P<organization>[^/]+)/(?P<job_id>[0-9a-fA-F-]{36})")
+
+    def match(self, url: str) -> dict | None:
+        parsed = urlparse(url)
+        if parsed.netloc.lower() != "jobs.ashbyhq.com":
+            return None
+        m = self._path_re.match(parsed.path)
+        return m.groupdict() if m else None
+
+    async def fetch(self, ids: dict) -> ResolvedJobPosting:
+        # The public posting API serves the whole board; pick the job by id
+        base = settings.ASHBY_API_BASE_URL.rstrip("/")
+        data = await fetch_json(f"{base}/posting-api/job-board/{ids['organization']}")
+
+        job = next(
+            (j for j in data.get("jobs") or [] if str(j.get("id", "")).lower() == ids["job_id"].lower()),
+            None
+        )
+        if job is None:
+            raise ValueError("Posting not found on the Ashby job board")
+
+        role_title = job.get("title") or ""
+        location = "Remote" if job.get("isRemote") and not job.get("location") else (job.get("location") or "")
+        employment_type = ASHBY_EMPLOYMENT_TYPES.get(job.get("employmentType") or "", job.get("employmentType") or "")
+        description = job.get("descriptionPlain") or _html_to_text(job.get("descriptionHtml") or "")
+
+        return ResolvedJobPosting(
+            jd_text=_compose(role_title, "", location, employment_type, [description]),
+            source=f"ats:{self.name}",
+            role_title=role_title,
+            employment_type=employment_type,
+            location=location
+        )
+
+
+class WorkdayAdapter(ATSAdapter):
+    """{tenant}.wd{N}.myworkdayjobs.com/[{locale}/]{site}/job/{location}/{slug}."""
+
+    name = "workday"
+    _host_re = re.compile(r"^(?P<tenant>[\w-]+)\.wd\d+\.myworkdayjobs\.com$")
+    _path_re = re.compile(
+        r"^/(?:[a-z]{2}-[A-Z]{2}/)?(?P<site>[^/]+)(?P<external_path>/job/.+?)/?$"
+    )
+
+    def match(self, url: str) -> dict | None:
+        parsed = urlparse(url)
+        host_match = self._host_re.match(parsed.netloc.lower())
+        if not host_match:
+            return None
+        m = self._path_re.match(parsed.path)
+        if not m:
+            return None
+        return {
+            "origin": f"{parsed.scheme or 'https'}://{parsed.netloc}",
+            "tenant": host_match.group("tenant"),
+            **m.groupdict()
+        }
+
+    async def fetch(self, ids: dict) -> ResolvedJobPosting:
+        # Workday's career site reads postings from the CXS JSON API
+        base = (settings.WORKDAY_API_BASE_URL or ids["origin"]).rstrip("/")
+        data = await fetch_json(f"{base}/wday/cxs/{ids['tenant']}/{ids['site']}{ids['external_path']}")
+
+        info = data.get("jobPostingInfo") or {}
+        role_title = info.get("title") or ""
+        company_name = (data.get("hiringOrganization") or {}).get("name") or ""
+        location = info.get("location") or ""
+        employment_type = info.get("timeType") or ""
+        description = _html_to_text(info.get("jobDescription") or "")
+
+        return ResolvedJobPosting(
+            jd_text=_compose(role_title, company_name, location, employment_type, [description]),
+            source=f"ats:{self.name}",
+            role_title=role_title,
+            employment_type=employment_type,
+            company_name=company_name,
+            location=location
+        )
+
+
+# Registry, checked in order by the URL resolver
+ATS_ADAPTERS: list[ATSAdapter] = [
+    GreenhouseAdapter(),
+    LeverAdapter(),
+    AshbyAdapter(),
+    WorkdayAdapter(),
+]
+
+
+def find_ats_adapter(url: str) -> tuple[ATSAdapter, dict] | None:
+    """Return the adapter handling a URL and the ids parsed from it."""
+    for adapter in ATS_ADAPTERS:
+        ids = adapter.match(url)
+        if ids:
+            return adapter, ids
+    return None
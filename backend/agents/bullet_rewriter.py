@@ -3,11 +3,30 @@
 Rewrites selected bullets for ATS optimization AND company voice matching.
 Preserves meaning, injects keywords only if truthful.
 Transforms writing style to match target company.
+
+Rewrites are memoized per bullet, keyed by the original text, the job
+keywords that bullet may truthfully carry, the voice profile and the prompt
+version, so re-tailoring a CV to similar postings only pays for new bullets.
 """
+import hashlib
+import logging
+
+from config import settings
 from models.cv import MasterCV
 from models.job import CompanyVoiceProfile
-from models.tailoring import MatchingResult, RewriteResult
+from models.tailoring import MatchingResult, RelevantExperience, RewriteResult, RewrittenExperience
+from services.cache import TTLCache, stable_hash
 from services.llm import llm_service
+from services.tracing import record_cache, traced
+
+logger = logging.getLogger(__name__)
+
+
+# Shared across requests: rewritten bullet text by cache key
+_bullet_cache = TTLCache(
+    max_entries=settings.BULLET_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.BULLET_CACHE_TTL_SECONDS
+)
 
 
 def _build_voice_instructions(voice_profile: CompanyVoiceProfile | None) -> str:
@@ -73,7 +92,7 @@ BULLET_REWRITER_PROMPT = """You are a professional resume editor specializing in
 
 Inputs:
 1. Relevant experience JSON (from matching step)
-2. Job keywords list
+2. Per-bullet job keywords (the only keywords that bullet may use)
 3. Original CV experience with dates
 4. Company voice instructions
 
@@ -93,6 +112,7 @@ General Rules:
 - Do NOT change metrics or outcomes.
 - Keep bullets concise but complete (aim for 1-3 lines, prioritize clarity over brevity).
 - If a bullet already matches well, return it unchanged.
+- Return EXACTLY one rewritten bullet per input bullet, in the same order.
 - Preserve exact dates from original CV.
 - The bullet should SOUND LIKE it was written by someone at the target company.
 
@@ -113,7 +133,52 @@ Output JSON:
 Output ONLY valid JSON.
 No commentary."""
 
+# Any edit to the prompt invalidates previously cached rewrites
+BULLET_REWRITER_PROMPT_VERSION = hashlib.sha256(BULLET_REWRITER_PROMPT.encode("utf-8")).hexdigest()[:12]
+
+
+def _normalize_keyword(keyword: str) -> str:
+    """Case- and whitespace-insensitive form of a keyword."""
+    return " ".join(keyword.lower().split())
+
+
+def _bullet_keywords(
+    bullet: str,
+    rel_exp: RelevantExperience,
+    job_keywords: list[str]
+) -> list[str]:
+    """
+    Job keywords a bullet may truthfully carry.
+    
+    A keyword is eligible if it already appears in the bullet or is a skill
+    the matcher attributed to this experience entry.
+    """
+    bullet_text = _normalize_keyword(bullet)
+    experience_skills = {_normalize_keyword(s) for s in rel_exp.matched_skills}
+    
+    eligible = {}
+    for keyword in job_keywords:
+        normalized = _normalize_keyword(keyword)
+        if normalized and (normalized in experience_skills or normalized in bullet_text):
+            eligible.setdefault(normalized, keyword.strip())
+    
+    return [eligible[k] for k in sorted(eligible)]
+
+
+def _voice_fingerprint(voice_profile: CompanyVoiceProfile | None) -> str:
+    """Stable fingerprint of the voice profile (or the default style)."""
+    if not voice_profile:
+        return "default"
+    return stable_hash(voice_profile.model_dump())[:16]
+
+
+def _bullet_cache_key(bullet: str, keywords: list[str], voice_fingerprint: str) -> str:
+    """Cache key for a single bullet rewrite."""
+    normalized_keywords = sorted(_normalize_keyword(k) for k in keywords)
+    return stable_hash(bullet.strip(), normalized_keywords, voice_fingerprint, BULLET_REWRITER_PROMPT_VERSION)
+
 
+@traced("agent.bullet_rewriter")
 async def rewrite_bullets(
     cv: MasterCV,
     matching: MatchingResult,
@@ -123,6 +188,9 @@ async def rewrite_bullets(
     """
     Rewrite bullets for ATS optimization with company voice matching.
     
+    Bullets already rewritten for the same keyword subset and voice are
+    served from cache; only novel bullets are sent to the LLM.
+    
     Args:
         cv: Original Master CV (for dates)
         matching: MatchingResult from matching step
@@ -130,7 +198,7 @@ async def rewrite_bullets(
         voice_profile: Company voice profile for style mirroring
         
     Returns:
-        RewriteResult with optimized, voice-matched bullets
+        RewriteResult with optimized, voice-matched bullets and cache stats
     """
     # Build experience lookup for dates
     date_lookup = {}
@@ -141,51 +209,120 @@ async def rewrite_bullets(
             "end_date": exp.end_date
         }
     
-    # Prepare relevant experience with dates
+    voice_fp = _voice_fingerprint(voice_profile)
+    
+    # Resolve each bullet from cache, collecting the novel ones per entry
+    rewritten_experience: list[RewrittenExperience] = []
+    pending = []  # (entry index, novel bullet positions, cache keys)
     relevant_exp_with_dates = []
+    hits = 0
+    misses = 0
+    
     for rel_exp in matching.relevant_experience:
         key = f"{rel_exp.company}|{rel_exp.role}"
         dates = date_lookup.get(key, {"start_date": "", "end_date": ""})
-        relevant_exp_with_dates.append({
-            "company": rel_exp.company,
-            "role": rel_exp.role,
-            "start_date": dates["start_date"],
-            "end_date": dates["end_date"],
-            "relevance_score": rel_exp.relevance_score,
-            "matched_skills": rel_exp.matched_skills,
-            "relevant_bullets": rel_exp.relevant_bullets
-        })
-    
-    # Build voice instructions
-    voice_instructions = _build_voice_instructions(voice_profile)
+        
+        bullets = []
+        novel_positions = []
+        novel_keys = []
+        novel_bullets = []
+        for position, bullet in enumerate(rel_exp.relevant_bullets):
+            keywords = _bullet_keywords(bullet, rel_exp, job_keywords)
+            cache_key = _bullet_cache_key(bullet, keywords, voice_fp)
+            cached = _bullet_cache.get(cache_key)
+            if cached is not None:
+                hits += 1
+                bullets.append(cached)
+            else:
+                misses += 1
+                bullets.append(bullet)  # Placeholder until the LLM answers
+                novel_positions.append(position)
+                novel_keys.append(cache_key)
+                novel_bullets.append({"text": bullet, "keywords": keywords})
+        
+        rewritten_experience.append(RewrittenExperience(
+            company=rel_exp.company,
+            role=rel_exp.role,
+            start_date=dates["start_date"],
+            end_date=dates["end_date"],
+            bullets=bullets
+        ))
+        
+        if novel_bullets:
+            pending.append((len(rewritten_experience) - 1, novel_positions, novel_keys))
+            relevant_exp_with_dates.append({
+                "company": rel_exp.company,
+                "role": rel_exp.role,
+                "start_date": dates["start_date"],
+                "end_date": dates["end_date"],
+                "relevance_score": rel_exp.relevance_score,
+                "matched_skills": rel_exp.matched_skills,
+                "relevant_bullets": novel_bullets
+            })
     
-    # Create prompt with voice instructions injected
-    system_prompt = BULLET_REWRITER_PROMPT.replace("{voice_instructions}", voice_instructions)
+    total = hits + misses
+    hit_ratio = round(hits / total, 4) if total else 0.0
+    logger.info(f"Bullet cache: {hits}/{total} hits (ratio {hit_ratio})")
+    record_cache(hits=hits, misses=misses)
     
-    user_prompt = f"""Rewrite these resume bullets for ATS optimization AND company voice matching.
+    if pending:
+        # Build voice instructions
+        voice_instructions = _build_voice_instructions(voice_profile)
+        
+        # Create prompt with voice instructions injected
+        system_prompt = BULLET_REWRITER_PROMPT.replace("{voice_instructions}", voice_instructions)
+        
+        user_prompt = f"""Rewrite these resume bullets for ATS optimization AND company voice matching.
 
-RELEVANT EXPERIENCE:
+RELEVANT EXPERIENCE (each bullet lists the job keywords it may use, if truthful):
 {relevant_exp_with_dates}
 
-JOB KEYWORDS TO USE (if truthful):
-{job_keywords}
-
 VOICE PROFILE SUMMARY:
 - Style: {voice_profile.sentence_style if voice_profile else 'balanced'}
 - Ownership: {voice_profile.ownership_level if voice_profile else 'moderate'}
 - Metrics: {voice_profile.metric_emphasis if voice_profile else 'moderate'}
 - Tone: {voice_profile.tone if voice_profile else 'professional'}
 
-Return rewritten experience as JSON. Make bullets SOUND LIKE this company's employees write."""
-    
-    try:
-        result = await llm_service.generate_json(
-            user_prompt=user_prompt,
-            system_prompt=system_prompt,
-            temperature=0.3  # Slightly higher for natural variation
-        )
+Return rewritten experience as JSON with exactly one output bullet per input bullet, in order.
+Make bullets SOUND LIKE this company's employees write."""
         
-        return RewriteResult(**result)
+        try:
+            result = await llm_service.generate_json(
+                user_prompt=user_prompt,
+                system_prompt=system_prompt,
+                temperature=0.3  # Slightly higher for natural variation
+            )
+            
+            llm_rewrite = RewriteResult(**result)
+            
+        except Exception as e:
+            raise ValueError(f"Failed to rewrite bullets: {e}")
         
-    except Exception as e:
-        raise ValueError(f"Failed to rewrite bullets: {e}")
+        # Match LLM entries back to requested entries (by order, then by company/role)
+        by_key = {f"{exp.company}|{exp.role}": exp for exp in llm_rewrite.rewritten_experience}
+        for request_index, (entry_index, positions, cache_keys) in enumerate(pending):
+            entry = rewritten_experience[entry_index]
+            llm_exp = by_key.get(f"{entry.company}|{entry.role}")
+            if llm_exp is None and request_index < len(llm_rewrite.rewritten_experience):
+                llm_exp = llm_rewrite.rewritten_experience[request_index]
+            if llm_exp is None:
+                continue  # Keep original bullets for this entry
+            
+            aligned = len(llm_exp.bullets) == len(positions)
+            for offset, position in enumerate(positions):
+                if offset >= len(llm_exp.bullets):
+                    break
+                new_bullet = llm_exp.bullets[offset].strip()
+                if not new_bullet:
+                    continue
+                entry.bullets[position] = new_bullet
+                # Only cache when the one-to-one mapping is trustworthy
+                if aligned:
+                    _bullet_cache.set(cache_keys[offset], new_bullet)
+    
+    return RewriteResult(
+        rewritten_experience=rewritten_experience,
+        cache_hits=hits,
+        cache_misses=misses,
+        cache_hit_ratio=hit_ratio
+    )
@@ -0,0 +1,202 @@
+"""Recruiter Mode: Local Candidate Ranker.
+
+Scores many Master CVs against one job without any LLM calls, so only the
+top candidates need to go through the (expensive) CV matcher.
+
+All candidates are scored in one vectorized pass: each CV becomes a sparse
+row of job-term hits (COO triplets), and the scores are sparse dot products
+against the job's term weight vector.
+"""
+import math
+import re
+from collections import Counter
+
+import numpy as np
+
+from models.cv import MasterCV
+from models.job import JobAnalysis
+from models.recruiter import CandidateScore
+from services.tracing import traced
+
+
+# Term weights by where the term appears in the job analysis
+MUST_HAVE_WEIGHT = 3.0
+NICE_TO_HAVE_WEIGHT = 1.5
+ATS_KEYWORD_WEIGHT = 1.0
+
+# Share of the final score coming from skill coverage vs. responsibility wording
+SKILL_SCORE_SHARE = 0.75
+LEXICAL_SCORE_SHARE = 0.25
+
+# Longest skill phrase (in tokens) matched against CV text
+MAX_PHRASE_TOKENS = 4
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[.\-/][a-z0-9+#]+)*")
+
+_STOPWORDS = frozenset("""
+a an and are as at be by for from has have in into is it its of on or our that the their this to
+was we were will with you your who what when where which while within across about over under
+able ability work working team teams role strong experience years year using use including etc
+""".split())
+
+
+def _tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _normalize_term(term: str) -> str:
+    return " ".join(_tokenize(term))
+
+
+def _ngrams(tokens: list[str], max_n: int) -> Counter:
+    grams = Counter()
+    for n in range(1, max_n + 1):
+        for i in range(len(tokens) - n + 1):
+            grams[" ".join(tokens[i:i + n])] += 1
+    return grams
+
+
+def build_skill_vocabulary(job: JobAnalysis) -> tuple[list[str], np.ndarray, list[str]]:
+    """
+    Weighted skill/keyword vocabulary of a job.
+
+    Returns:
+        (terms, weights, labels): normalized terms, their weights and their
+        original-case labels. A term listed in several places keeps its
+        highest weight.
+    """
+    weighted: dict[str, tuple[str, float]] = {}
+    groups = [
+        (job.must_have_skills + job.required_skills, MUST_HAVE_WEIGHT),
+        (job.nice_to_have_skills + job.preferred_skills, NICE_TO_HAVE_WEIGHT),
+        (job.keywords_for_ats, ATS_KEYWORD_WEIGHT),
+    ]
+    for terms, weight in groups:
+        for term in terms:
+            normalized = _normalize_term(term)
+            if not normalized:
+                continue
+            if normalized not in weighted or weighted[normalized][1] < weight:
+                weighted[normalized] = (term.strip(), weight)
+
+    terms = list(weighted)
+    weights = np.array([weighted[t][1] for t in terms], dtype=np.float64)
+    labels = [weighted[t][0] for t in terms]
+    return terms, weights, labels
+
+
+def build_lexical_vocabulary(job: JobAnalysis) -> tuple[list[str], np.ndarray]:
+    """Content words of the role title and responsibilities, weighted by frequency."""
+    text = " ".join([job.role_title] + job.responsibilities)
+    counts = Counter(
+        token for token in _tokenize(text)
+        if len(token) > 2 and token not in _STOPWORDS
+    )
+    terms = list(counts)
+    return terms, np.array([1.0 + math.log(counts[t]) for t in terms], dtype=np.float64)
+
+
+def _cv_text(cv: MasterCV) -> str:
+    parts = [cv.summary]
+    for exp in cv.experience:
+        parts.append(exp.role)
+        parts.extend(exp.bullets)
+    parts.extend(cv.skills)
+    return "\n".join(parts)
+
+
+@traced("agent.candidate_ranker")
+def score_candidates(
+    cvs: list[tuple[int, str, MasterCV]],
+    job: JobAnalysis
+) -> list[CandidateScore]:
+    """
+    Score every candidate against the job in one vectorized pass.
+
+    Args:
+        cvs: (index, filename, Master CV) per candidate
+        job: Job analysis JSON
+
+    Returns:
+        CandidateScore list, best first
+    """
+    skill_terms, skill_weights, skill_labels = build_skill_vocabulary(job)
+    lexical_terms, lexical_weights = build_lexical_vocabulary(job)
+    skill_index = {term: col for col, term in enumerate(skill_terms)}
+    lexical_index = {term: col for col, term in enumerate(lexical_terms)}
+
+    n = len(cvs)
+    max_n = min(MAX_PHRASE_TOKENS, max((t.count(" ") + 1 for t in skill_terms), default=1))
+
+    # COO triplets (row, col) of term hits; every hit has value 1
+    skill_rows: list[int] = []
+    skill_cols: list[int] = []
+    lexical_rows: list[int] = []
+    lexical_cols: list[int] = []
+
+    for row, (_, _, cv) in enumerate(cvs):
+        grams = _ngrams(_tokenize(_cv_text(cv)), max_n)
+        listed_skills = {_normalize_term(skill) for skill in cv.skills}
+
+        for term, col in skill_index.items():
+            if term in grams or term in listed_skills:
+                skill_rows.append(row)
+                skill_cols.append(col)
+
+        for term, col in lexical_index.items():
+            if term in grams:
+                lexical_rows.append(row)
+                lexical_cols.append(col)
+
+    skill_rows_arr = np.asarray(skill_rows, dtype=np.int64)
+    skill_cols_arr = np.asarray(skill_cols, dtype=np.int64)
+    lexical_rows_arr = np.asarray(lexical_rows, dtype=np.int64)
+    lexical_cols_arr = np.asarray(lexical_cols, dtype=np.int64)
+
+    # Skill coverage: sparse X @ w, normalized by the total job weight
+    skill_total = skill_weights.sum()
+    skill_scores = np.bincount(
+        skill_rows_arr, weights=skill_weights[skill_cols_arr], minlength=n
+    )
+    skill_scores = skill_scores / skill_total if skill_total > 0 else np.zeros(n)
+
+    # Lexical coverage: terms that every candidate shares say little, so
+    # weight by IDF over the candidate pool
+    document_freq = np.bincount(lexical_cols_arr, minlength=len(lexical_terms))
+    idf = np.log((n + 1) / (document_freq + 1)) + 1.0
+    lexical_vector = lexical_weights * idf
+    lexical_total = lexical_vector.sum()
+    lexical_scores = np.bincount(
+        lexical_rows_arr, weights=lexical_vector[lexical_cols_arr], minlength=n
+    )
+    lexical_scores = lexical_scores / lexical_total if lexical_total > 0 else np.zeros(n)
+
+    if skill_total > 0 and lexical_total > 0:
+        combined = SKILL_SCORE_SHARE * skill_scores + LEXICAL_SCORE_SHARE * lexical_scores
+    else:
+        combined = skill_scores if skill_total > 0 else lexical_scores
+    combined = combined * 100.0
+
+    # Matched skills per candidate, recovered from the COO triplets
+    matched_by_row: list[set[int]] = [set() for _ in range(n)]
+    for row, col in zip(skill_rows, skill_cols):
+        matched_by_row[row].add(col)
+
+    results = []
+    for row in np.argsort(-combined, kind="stable"):
+        index, filename, cv = cvs[row]
+        matched = matched_by_row[row]
+        results.append(CandidateScore(
+            index=index,
+            filename=filename,
+            name=cv.name,
+            score=round(float(combined[row]), 2),
+            skill_score=round(float(skill_scores[row]), 4),
+            lexical_score=round(float(lexical_scores[row]), 4),
+            matched_skills=[skill_labels[col] for col in sorted(matched)],
+            missing_skills=[
+                skill_labels[col] for col in range(len(skill_terms))
+                if col not in matched and skill_weights[col] >= MUST_HAVE_WEIGHT
+            ]
+        ))
+    return results
@@ -6,6 +6,7 @@ Friendly but professional, expresses genuine interest, clear CTA.
 from models.job import JobAnalysis, CompanyIntelligence, HiringContact
 from models.writing import ColdEmail
 from services.llm import llm_service
+from services.tracing import traced
 
 
 # FIXED PROMPT - Job seeker perspective (not recruiter)
@@ -54,6 +55,7 @@ Output:
 - No signature block"""
 
 
+@traced("agent.cold_email")
 async def generate_cold_email(
     candidate_summary: str,
     job: JobAnalysis,
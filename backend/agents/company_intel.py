@@ -8,6 +8,7 @@ Extracts company data from Tavily search results with:
 from models.job import CompanyIntelligence, SourceLink, HiringContact
 from services.llm import llm_service
 from services.tavily import tavily_service
+from services.tracing import traced
 
 
 def _clean_intel_response(intel_result: dict) -> dict:
@@ -117,6 +118,7 @@ FIELD GUIDELINES:
 NEVER HALLUCINATE. If information is not in the search results, leave the field empty."""
 
 
+@traced("agent.company_intel")
 async def get_company_intelligence(company_name: str) -> CompanyIntelligence:
     """
     Research company using Tavily and extract intelligence.
@@ -158,6 +160,7 @@ async def get_company_intelligence(company_name: str) -> CompanyIntelligence:
         raise ValueError(f"Failed to get company intelligence: {e}")
 
 
+@traced("agent.company_intel")
 async def get_company_intelligence_from_text(
     company_name: str,
     search_text: str
@@ -180,6 +183,7 @@ async def get_company_intelligence_from_text(
         raise ValueError(f"Failed to extract company intelligence: {e}")
 
 
+@traced("agent.company_intel")
 async def get_company_intelligence_from_url(company_url: str) -> CompanyIntelligence:
     """
     Research company using deep search from company URL.
@@ -233,6 +237,7 @@ async def get_company_intelligence_from_url(company_url: str) -> CompanyIntellig
         raise ValueError(f"Failed to get company intelligence from URL: {e}")
 
 
+@traced("agent.company_intel")
 async def get_company_intel_with_voice(company_url: str) -> tuple["CompanyIntelligence", "CompanyVoiceProfile"]:
     """
     Research company and extract BOTH intelligence AND voice profile.
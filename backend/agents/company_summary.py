@@ -6,6 +6,7 @@ Factual, neutral, no speculation.
 from models.job import CompanyIntelligence
 from models.writing import CompanySummary
 from services.llm import llm_service
+from services.tracing import traced
 
 
 # LOCKED PROMPT - DO NOT MODIFY
@@ -35,6 +36,7 @@ Output:
 - No explanations."""
 
 
+@traced("agent.company_summary")
 async def generate_company_summary(company: CompanyIntelligence) -> CompanySummary:
     """
     Generate human-readable company summary.
@@ -0,0 +1,198 @@
+"""Main-content extraction for job posting pages.
+
+Splits the page into DOM text blocks while it is tokenized, scores each
+block by text density, link density and job-section vocabulary, and picks
+the contiguous run of blocks with the highest total score (maximum
+subsequence segmentation). Navigation, cookie banners, "similar jobs"
+lists and footers score negative and fall outside the selected region.
+
+When the region clearly looks like a job description (several JD section
+headings, enough text, few links) the URL resolver uses it as-is and
+skips the LLM cleanup call.
+"""
+import re
+
+from agents.url_resolver import HTMLTextConverter, SKIPPED_TAGS, BLOCK_TAGS, HEADING_TAGS
+
+
+# Tags that end the current text block
+BOUNDARY_TAGS = BLOCK_TAGS | HEADING_TAGS | frozenset({"p", "li", "td", "th", "body"})
+
+# Headings and phrases that mark job description sections
+JD_SECTION_RE = re.compile(
+    r"\b(responsibilit\w*|requirements?|qualifications?|what you.ll (?:do|bring|need)|"
+    r"who you are|about (?:the|this) (?:role|job|position|team)|the role|your role|"
+    r"you will|you.ll|must have|nice to have|preferred|bonus points|skills|"
+    r"experience (?:with|in)|years of experience|benefits|perks|compensation|salary)\b",
+    re.IGNORECASE
+)
+
+# Blocks with more linked text than this are navigation-like
+MAX_CONTENT_LINK_DENSITY = 0.33
+
+# A block this short (in words) is only content if it is a heading or list item
+MIN_CONTENT_WORDS = 8
+
+# Weight multiplier for blocks containing JD vocabulary
+JD_KEYWORD_BOOST = 1.5
+
+
+class TextBlock:
+    """Text of one DOM block plus the features used to score it."""
+
+    __slots__ = ("kind", "text", "words", "link_words")
+
+    def __init__(self, kind: str, text: str, words: int, link_words: int):
+        self.kind = kind  # "heading" | "item" | "text"
+        self.text = text
+        self.words = words
+        self.link_words = link_words
+
+    @property
+    def link_density(self) -> float:
+        return self.link_words / self.words if self.words else 0.0
+
+    def is_jd_section(self) -> bool:
+        return bool(JD_SECTION_RE.search(self.text))
+
+
+class MainContent:
+    """Selected main-content region of a page."""
+
+    def __init__(self, text: str, confidence: float, words: int, total_words: int, jd_sections: int):
+        self.text = text
+        self.confidence = confidence
+        self.words = words
+        self.total_words = total_words
+        self.jd_sections = jd_sections
+
+
+class MainContentExtractor(HTMLTextConverter):
+    """
+    HTMLTextConverter that also segments the page into text blocks.
+
+    Feed it like the converter; `text()` still returns the full page text
+    and `main_content()` returns the selected region.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.blocks: list[TextBlock] = []
+        self._block_parts: list[str] = []
+        self._block_link_words = 0
+        self._block_kind = "text"
+        self._link_depth = 0
+
+    def _flush(self, next_kind: str = "text") -> None:
+        lines = [" ".join(line.split()) for line in "".join(self._block_parts).split("\n")]
+        text = "\n".join(line for line in lines if line)
+        if text:
+            words = len(text.split())
+            self.blocks.append(TextBlock(self._block_kind, text, words, min(self._block_link_words, words)))
+        self._block_parts = []
+        self._block_link_words = 0
+        self._block_kind = next_kind
+
+    def handle_starttag(self, tag, attrs):
+        skipped = self._skip_depth or tag in SKIPPED_TAGS
+        super().handle_starttag(tag, attrs)
+        if skipped:
+            return
+        if tag in BOUNDARY_TAGS:
+            self._flush("heading" if tag in HEADING_TAGS else "item" if tag == "li" else "text")
+        elif tag == "br":
+            self._block_parts.append("\n")
+        elif tag == "a":
+            self._link_depth += 1
+
+    def handle_endtag(self, tag):
+        skipped = self._skip_depth or tag in SKIPPED_TAGS
+        super().handle_endtag(tag)
+        if skipped:
+            return
+        if tag in BOUNDARY_TAGS:
+            self._flush()
+        elif tag == "a" and self._link_depth:
+            self._link_depth -= 1
+
+    def handle_data(self, data):
+        super().handle_data(data)
+        if self._skip_depth:
+            return
+        self._block_parts.append(data)
+        if self._link_depth:
+            self._block_link_words += len(data.split())
+
+    def close(self):
+        super().close()
+        self._flush()
+
+    def main_content(self) -> MainContent:
+        """Select the highest-scoring contiguous run of blocks."""
+        return select_main_content(self.blocks)
+
+
+def _block_score(block: TextBlock) -> float:
+    """Positive for content-like blocks, negative for boilerplate."""
+    link_density = block.link_density
+    if link_density > MAX_CONTENT_LINK_DENSITY:
+        return -(1.0 + block.words * link_density)
+
+    if block.kind == "heading":
+        return 5.0 if block.is_jd_section() else 0.5
+    if block.words < MIN_CONTENT_WORDS and block.kind != "item":
+        # Short stray text: buttons, labels, breadcrumbs
+        return -1.0
+
+    score = block.words * (1.0 - link_density)
+    if block.is_jd_section():
+        score *= JD_KEYWORD_BOOST
+    return score
+
+
+def select_main_content(blocks: list[TextBlock]) -> MainContent:
+    """
+    Pick the main-content region from scored blocks.
+
+    Uses the maximum-sum contiguous subsequence of block scores, so a run
+    of content survives short boilerplate interruptions but long link
+    lists and footers end the region.
+    """
+    total_words = sum(block.words for block in blocks)
+    if not blocks:
+        return MainContent("", 0.0, 0, 0, 0)
+
+    best_sum, best_start, best_end = float("-inf"), 0, -1
+    run_sum, run_start = 0.0, 0
+    for i, block in enumerate(blocks):
+        score = _block_score(block)
+        if run_sum <= 0:
+            run_sum, run_start = score, i
+        else:
+            run_sum += score
+        if run_sum > best_sum:
+            best_sum, best_start, best_end = run_sum, run_start, i
+
+    region = blocks[best_start:best_end + 1]
+    lines = []
+    for block in region:
+        if block.kind == "item":
+            lines.append("• " + block.text)
+        else:
+            lines.append(block.text)
+
+    words = sum(block.words for block in region)
+    link_words = sum(block.link_words for block in region)
+    jd_sections = sum(1 for block in region if block.kind == "heading" and block.is_jd_section())
+    if not jd_sections:
+        # Some pages use bold paragraphs rather than headings for sections
+        jd_sections = sum(1 for block in region if block.words <= 6 and block.is_jd_section())
+
+    # Confidence that the region is the complete JD: section headings,
+    # enough text and few links
+    section_signal = min(jd_sections / 3.0, 1.0)
+    length_signal = min(words / 250.0, 1.0)
+    link_signal = 1.0 - (link_words / words if words else 1.0)
+    confidence = round(0.5 * section_signal + 0.3 * length_signal + 0.2 * link_signal, 3)
+
+    return MainContent("\n".join(lines), confidence, words, total_words, jd_sections)
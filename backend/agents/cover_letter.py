@@ -8,6 +8,7 @@ Generates personalized cover letters using:
 from models.job import JobAnalysis, CompanyIntelligence
 from models.writing import CoverLetter
 from services.llm import llm_service
+from services.tracing import traced
 
 
 # Enhanced prompt with company culture integration
@@ -47,6 +48,7 @@ RULES:
 OUTPUT: Plain text cover letter only. No explanations."""
 
 
+@traced("agent.cover_letter")
 async def generate_cover_letter(
     resume_markdown: str,
     job: JobAnalysis,
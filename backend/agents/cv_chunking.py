@@ -0,0 +1,144 @@
+"""Chunked structuring for long CVs.
+
+A 3-5 page CV produces one large JSON output whose generation time
+dominates structuring and which can be truncated. Chunked mode splits the
+work into independent pieces — groups of experience blocks, or line-aligned
+text windows when the layout is not recognized — structures them
+concurrently, and merges the partial results into one MasterCV.
+"""
+import asyncio
+from typing import Awaitable, Callable
+
+from models.cv import MasterCV, Experience, Education
+from agents.cv_sections import CVSections, DATE_RANGE_RE, heading_kind
+from services.llm import estimate_tokens
+
+
+def split_parts(parts: dict, sections: CVSections, max_tokens: int) -> list[dict]:
+    """
+    Split a pre-structurer parts selection into chunks of at most ~max_tokens.
+
+    Header, summary and skills travel together in one chunk; experience and
+    education blocks are grouped in document order.
+    """
+    def empty() -> dict:
+        return {"header": False, "summary": False, "skills": False, "experience": [], "education": []}
+
+    chunks = []
+    if parts["header"] or parts["summary"] or parts["skills"]:
+        chunk = empty()
+        chunk.update(header=parts["header"], summary=parts["summary"], skills=parts["skills"])
+        chunks.append(chunk)
+
+    for kind, blocks in (("experience", sections.experience), ("education", sections.education)):
+        current, size = empty(), 0
+        for i in parts[kind]:
+            tokens = estimate_tokens(blocks[i])
+            if current[kind] and size + tokens > max_tokens:
+                chunks.append(current)
+                current, size = empty(), 0
+            current[kind].append(i)
+            size += tokens
+        if current[kind]:
+            chunks.append(current)
+    return chunks
+
+
+def split_text_windows(raw_text: str, max_tokens: int) -> list[str]:
+    """
+    Split raw CV text into line-aligned windows of at most ~max_tokens.
+
+    A window preferably ends just before a section heading or a dated
+    entry line in its second half, so entries are rarely cut in two.
+    """
+    lines = [line for line in raw_text.splitlines() if line.strip()]
+    windows: list[str] = []
+    start = 0
+    while start < len(lines):
+        size, end, cut = 0, start, None
+        while end < len(lines) and (end == start or size + estimate_tokens(lines[end]) <= max_tokens):
+            if end > start and size >= max_tokens // 2 and (
+                heading_kind(lines[end]) or DATE_RANGE_RE.search(lines[end])
+            ):
+                cut = end
+            size += estimate_tokens(lines[end]) + 1
+            end += 1
+        if end < len(lines) and cut is not None:
+            # Keep the entry header lines just above a dated line together with it
+            end = cut if heading_kind(lines[cut]) else max(start + 1, cut - 2)
+        windows.append("\n".join(lines[start:end]))
+        start = end
+    return windows
+
+
+def _key(*values: str) -> tuple[str, ...]:
+    return tuple(" ".join(v.lower().split()) for v in values)
+
+
+def _union(items: list[str], more: list[str]) -> list[str]:
+    seen = {_key(item) for item in items}
+    merged = list(items)
+    for item in more:
+        if _key(item) not in seen:
+            seen.add(_key(item))
+            merged.append(item)
+    return merged
+
+
+def merge_structured(parts: list[MasterCV]) -> MasterCV:
+    """
+    Merge partial CVs parsed from consecutive windows, in order.
+
+    Scalar fields take the first non-empty value. Experience entries are
+    deduplicated by company, role and start date (bullets are unioned);
+    an entry without company and role continues the previous entry, which
+    happens when a window boundary falls inside it. Skills and education
+    are deduplicated case-insensitively.
+    """
+    merged = MasterCV()
+    experience: dict[tuple, Experience] = {}
+    education: dict[tuple, Education] = {}
+
+    for part in parts:
+        for field in ("name", "email", "phone", "location", "summary"):
+            if not getattr(merged, field) and getattr(part, field):
+                setattr(merged, field, getattr(part, field))
+        merged.skills = _union(merged.skills, part.skills)
+
+        for entry in part.experience:
+            if not entry.company and not entry.role and merged.experience:
+                previous = merged.experience[-1]
+                previous.bullets = _union(previous.bullets, entry.bullets)
+                continue
+            key = _key(entry.company, entry.role, entry.start_date)
+            existing = experience.get(key)
+            if existing is None:
+                entry = entry.model_copy(deep=True)
+                experience[key] = entry
+                merged.experience.append(entry)
+            else:
+                existing.bullets = _union(existing.bullets, entry.bullets)
+                existing.end_date = existing.end_date or entry.end_date
+
+        for entry in part.education:
+            key = _key(entry.institution, entry.degree)
+            if key not in education:
+                education[key] = entry.model_copy(deep=True)
+                merged.education.append(education[key])
+
+    return merged
+
+
+async def structure_chunks(
+    texts: list[str],
+    structure: Callable[[str], Awaitable[MasterCV]],
+    max_concurrency: int
+) -> list[MasterCV]:
+    """Structure chunks concurrently, at most max_concurrency at a time, in input order."""
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run(text: str) -> MasterCV:
+        async with semaphore:
+            return await structure(text)
+
+    return list(await asyncio.gather(*(run(text) for text in texts)))
@@ -9,6 +9,7 @@ from models.cv import MasterCV
 from models.job import JobAnalysis
 from models.tailoring import MatchingResult
 from services.llm import llm_service
+from services.tracing import traced
 
 
 # LOCKED PROMPT - DO NOT MODIFY
@@ -51,6 +52,7 @@ Rules:
 - No explanations."""
 
 
+@traced("agent.cv_matcher")
 async def analyze_cv_job_match(cv: MasterCV, job: JobAnalysis) -> MatchingResult:
     """
     Analyze CV against job requirements.
@@ -0,0 +1,381 @@
+"""Rule-based CV pre-structurer.
+
+Parses the trivially parseable parts of a resume locally: contact details
+(email, phone, URLs), the summary, list-style skills, and experience and
+education entries with a clear date range, role and company. Every section
+gets a confidence score; only sections below the threshold are sent to the
+LLM structurer, so a well-formatted resume needs a much smaller prompt or
+none at all.
+
+Runs on top of the section splitter in agents.cv_sections.
+"""
+import re
+
+from models.cv import MasterCV, Experience, Education
+from agents.cv_sections import CVSections, DATE_RANGE_RE, BULLET_RE, split_cv_sections, align_entries
+from agents.cv_validator import normalize_date
+
+
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE_RE = re.compile(r"(?<![\w/])\+?\(?\d[\d\s().-]{6,}\d(?![\w/])")
+URL_RE = re.compile(r"(?:https?://|www\.)\S+|\b[\w-]+\.(?:com|io|dev|me|org|net)/\S*", re.IGNORECASE)
+# "San Francisco, CA", "London, United Kingdom", "Remote"
+LOCATION_RE = re.compile(r"^(?:[A-Z][\w.'-]*(?: [A-Z][\w.'-]*)*, ?[A-Z][\w.'-]*(?: [A-Z][\w.'-]*)*|Remote)$")
+NAME_RE = re.compile(r"^[A-Z][\w'.-]*(?: [A-Z][\w'.-]*){1,3}$")
+
+ROLE_RE = re.compile(
+    r"\b(engineer|developer|programmer|manager|analyst|designer|intern|lead|director|consultant|"
+    r"scientist|specialist|architect|officer|head|vp|vice president|president|associate|"
+    r"coordinator|administrator|founder|co-founder|cto|ceo|cfo|researcher|assistant|"
+    r"technician|strategist|owner|partner|advisor|representative|executive|editor|writer|"
+    r"teacher|instructor|accountant|recruiter|product|staff|principal|senior|junior)\b",
+    re.IGNORECASE
+)
+INSTITUTION_RE = re.compile(
+    r"\b(university|college|institute|school|academy|polytechnic|universidad|universit[éä]t|hochschule)\b",
+    re.IGNORECASE
+)
+DEGREE_RE = re.compile(
+    r"\b(bachelor|master|doctor|ph\.? ?d|mba|b\.? ?s\.? ?c?|m\.? ?s\.? ?c?|b\.? ?a|m\.? ?a|b\.? ?eng|m\.? ?eng|"
+    r"b\.? ?tech|m\.? ?tech|associate|diploma|certificate|degree|a-levels|high school)\b",
+    re.IGNORECASE
+)
+YEAR_RE = re.compile(r"\b(?:(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?\s*)?(?:19|20)\d{2}\b",
+                     re.IGNORECASE)
+
+# Splits "Role | Company", "Company — Role", "Role at Company"
+FRAGMENT_SPLIT_RE = re.compile(r"\s+[|–—@•·]\s+|\s+at\s+|\t|\s{2,}")
+HEADER_SPLIT_RE = re.compile(r"\s*[|•·]\s*|\t|\s{2,}")
+SKILL_SPLIT_RE = re.compile(r"\s*[,;|•·]\s*")
+
+# Header prose longer than this is a summary without a heading
+MAX_HEADER_FRAGMENT_WORDS = 12
+MAX_SKILL_WORDS = 6
+
+HIGH_CONFIDENCE = 0.95
+MEDIUM_CONFIDENCE = 0.7
+LOW_CONFIDENCE = 0.4
+
+
+def _date(text: str) -> str:
+    return normalize_date(text.replace(".", "").strip())
+
+
+def _strip_bullet(line: str) -> str:
+    return BULLET_RE.sub("", line, count=1).strip()
+
+
+def _fragments(lines: list[str]) -> list[str]:
+    fragments = []
+    for line in lines:
+        fragments.extend(f.strip(" ,") for f in FRAGMENT_SPLIT_RE.split(line) if f.strip(" ,"))
+    return fragments
+
+
+def _bullets(lines: list[str]) -> tuple[list[str], bool]:
+    """Bullet texts with wrapped continuation lines joined; False if no bullet glyphs."""
+    bullets: list[str] = []
+    for line in lines:
+        if BULLET_RE.match(line):
+            bullets.append(_strip_bullet(line))
+        elif bullets:
+            bullets[-1] = f"{bullets[-1]} {line}"
+        else:
+            return [], False
+    return bullets, bool(bullets)
+
+
+def _starts_with_bare_date(block: str) -> bool:
+    first = block.split("\n", 1)[0]
+    match = DATE_RANGE_RE.search(first)
+    return bool(match) and not (first[:match.start()] + first[match.end():]).strip(" |–—-,()")
+
+
+def parse_header(header: str, has_summary_section: bool) -> tuple[dict, float]:
+    """Name, email, phone and location from the header lines."""
+    fields = {"name": "", "email": "", "phone": "", "location": "", "summary": ""}
+    if not header.strip():
+        # Nothing to parse (e.g. a partial re-upload without the header)
+        return fields, HIGH_CONFIDENCE
+    leftovers = []
+    for line in header.splitlines():
+        for token in HEADER_SPLIT_RE.split(line):
+            token = token.strip(" ,")
+            if not token:
+                continue
+            email = EMAIL_RE.search(token)
+            if email:
+                fields["email"] = fields["email"] or email.group(0)
+                continue
+            if URL_RE.search(token):
+                continue
+            phone = PHONE_RE.search(token)
+            if phone and sum(c.isdigit() for c in phone.group(0)) >= 7:
+                fields["phone"] = fields["phone"] or phone.group(0).strip()
+                continue
+            if not fields["name"] and NAME_RE.match(token) and not ROLE_RE.search(token):
+                fields["name"] = token
+                continue
+            if not fields["location"] and LOCATION_RE.match(token):
+                fields["location"] = token
+                continue
+            leftovers.append(token)
+
+    prose = [t for t in leftovers if len(t.split()) > MAX_HEADER_FRAGMENT_WORDS]
+    if prose and has_summary_section:
+        # Prose in the header next to a real summary: unclear what it is
+        return fields, LOW_CONFIDENCE
+    if prose:
+        fields["summary"] = " ".join(prose)
+        return fields, MEDIUM_CONFIDENCE
+    if not fields["name"] or not (fields["email"] or fields["phone"]):
+        return fields, LOW_CONFIDENCE
+    return fields, HIGH_CONFIDENCE
+
+
+def parse_summary(summary: str) -> tuple[str, float]:
+    return " ".join(_strip_bullet(line) for line in summary.splitlines()), HIGH_CONFIDENCE
+
+
+def parse_skills(skills: str) -> tuple[list[str], float]:
+    """List-style skills, with "Category:" labels removed."""
+    items = []
+    for line in skills.splitlines():
+        line = _strip_bullet(line)
+        label, sep, rest = line.partition(":")
+        if sep and len(label.split()) <= 4:
+            line = rest
+        items.extend(item.strip(" .") for item in SKILL_SPLIT_RE.split(line) if item.strip(" ."))
+    if not items:
+        return [], LOW_CONFIDENCE
+    if any(len(item.split()) > MAX_SKILL_WORDS for item in items):
+        # Prose skills section
+        return items, LOW_CONFIDENCE
+    return list(dict.fromkeys(items)), HIGH_CONFIDENCE
+
+
+def parse_experience_block(block: str) -> tuple[Experience, float]:
+    """One experience entry anchored on its date range."""
+    lines = block.splitlines()
+    date_index = next(
+        (i for i, line in enumerate(lines) if not BULLET_RE.match(line) and DATE_RANGE_RE.search(line)),
+        None
+    )
+    if date_index is None:
+        return Experience(), LOW_CONFIDENCE
+
+    date_line = lines[date_index]
+    match = DATE_RANGE_RE.search(date_line)
+    start_date, end_date = _date(match.group(1)), _date(match.group(2))
+
+    header_lines = lines[:date_index]
+    rest_of_date_line = (date_line[:match.start()] + " " + date_line[match.end():]).strip(" |–—-,()")
+    if rest_of_date_line:
+        header_lines = header_lines + [rest_of_date_line]
+
+    body = lines[date_index + 1:]
+    # Role or location lines between the date and the first bullet
+    while body and not BULLET_RE.match(body[0]) and len(body[0].split()) <= MAX_HEADER_FRAGMENT_WORDS:
+        header_lines.append(body.pop(0))
+
+    fragments = [f for f in _fragments(header_lines) if not LOCATION_RE.match(f)]
+    confidence = HIGH_CONFIDENCE
+    role = company = ""
+    at_line = next((line for line in header_lines if re.search(r"\s+at\s+", line)), None)
+    if at_line:
+        role, _, company = (part.strip(" ,") for part in re.split(r"\s+(at)\s+", at_line, maxsplit=1))
+    else:
+        roles = [f for f in fragments if ROLE_RE.search(f)]
+        others = [f for f in fragments if not ROLE_RE.search(f)]
+        if len(roles) == 1 and len(others) == 1:
+            role, company = roles[0], others[0]
+        elif len(fragments) == 2:
+            # Conventional order: company first, then role
+            company, role = fragments
+            confidence = MEDIUM_CONFIDENCE
+        else:
+            confidence = LOW_CONFIDENCE
+            role = roles[0] if roles else ""
+            company = others[0] if others else ""
+
+    bullets, has_glyphs = _bullets(body)
+    if not has_glyphs:
+        confidence = min(confidence, LOW_CONFIDENCE)
+    if not role or not company:
+        confidence = min(confidence, LOW_CONFIDENCE)
+
+    return Experience(
+        company=company,
+        role=role,
+        start_date=start_date,
+        end_date=end_date,
+        bullets=bullets
+    ), confidence
+
+
+def parse_education_block(block: str) -> tuple[Education, float]:
+    """Institution, degree and dates of one education entry."""
+    lines = [_strip_bullet(line) for line in block.splitlines()]
+    start_date = end_date = ""
+    fragments = []
+    for line in lines:
+        match = DATE_RANGE_RE.search(line)
+        if match:
+            start_date, end_date = _date(match.group(1)), _date(match.group(2))
+            line = (line[:match.start()] + " " + line[match.end():]).strip(" |–—-,()")
+        else:
+            years = YEAR_RE.findall(line)
+            if years and not end_date:
+                end_date = _date(years[-1])
+                line = YEAR_RE.sub("", line).strip(" |–—-,()")
+        if line:
+            fragments.extend(_fragments([line]))
+
+    fragments = [f for f in fragments if not LOCATION_RE.match(f)]
+    institutions = [f for f in fragments if INSTITUTION_RE.search(f)]
+    degrees = [f for f in fragments if DEGREE_RE.search(f) and not INSTITUTION_RE.search(f)]
+
+    confidence = HIGH_CONFIDENCE
+    if len(institutions) != 1 or len(degrees) > 1:
+        confidence = LOW_CONFIDENCE
+    elif not degrees:
+        confidence = MEDIUM_CONFIDENCE
+
+    return Education(
+        institution=institutions[0] if institutions else "",
+        degree=degrees[0] if degrees else "",
+        start_date=start_date,
+        end_date=end_date
+    ), confidence
+
+
+class PreStructuredCV:
+    """
+    Partial MasterCV from local parsing, with confidence per section.
+
+    Confidence keys: "header", "summary", "skills", plus one value per
+    block in "experience" and "education".
+    """
+
+    def __init__(self, sections: CVSections):
+        self.sections = sections
+        self.cv = MasterCV()
+        self.confidence: dict = {}
+        self._parse()
+
+    def _parse(self) -> None:
+        sections = self.sections
+        has_summary = "summary" in sections.headings
+
+        header, self.confidence["header"] = parse_header(sections.header, has_summary)
+        self.cv.name = header["name"]
+        self.cv.email = header["email"]
+        self.cv.phone = header["phone"]
+        self.cv.location = header["location"]
+
+        if has_summary:
+            self.cv.summary, self.confidence["summary"] = parse_summary(sections.summary)
+        else:
+            self.cv.summary, self.confidence["summary"] = header["summary"], self.confidence["header"]
+
+        if sections.skills:
+            self.cv.skills, self.confidence["skills"] = parse_skills(sections.skills)
+        else:
+            self.confidence["skills"] = HIGH_CONFIDENCE
+
+        parsed_experience = [parse_experience_block(block) for block in sections.experience]
+        self.cv.experience = [entry for entry, _ in parsed_experience]
+        self.confidence["experience"] = [score for _, score in parsed_experience]
+        for i, block in enumerate(sections.experience[1:], start=1):
+            if _starts_with_bare_date(block):
+                # The entry's header was not recognized, so it probably
+                # ended up at the bottom of the previous block
+                self.confidence["experience"][i - 1] = LOW_CONFIDENCE
+                self.confidence["experience"][i] = LOW_CONFIDENCE
+
+        parsed_education = [parse_education_block(block) for block in sections.education]
+        self.cv.education = [entry for entry, _ in parsed_education]
+        self.confidence["education"] = [score for _, score in parsed_education]
+
+    def low_confidence(self, threshold: float) -> dict:
+        """Which parts need the LLM: header/summary/skills flags plus block indices."""
+        confidence = self.confidence
+        return {
+            "header": confidence["header"] < threshold,
+            "summary": confidence["summary"] < threshold,
+            "skills": confidence["skills"] < threshold,
+            "experience": [i for i, score in enumerate(confidence["experience"]) if score < threshold],
+            "education": [i for i, score in enumerate(confidence["education"]) if score < threshold],
+        }
+
+    @staticmethod
+    def needs_llm(parts: dict) -> bool:
+        return any(parts[key] for key in ("header", "summary", "skills", "experience", "education"))
+
+    def render(self, parts: dict) -> str:
+        """Raw text of the selected parts, with their headings, for the LLM."""
+        sections = self.sections
+        headings = sections.headings
+        text = []
+        if parts["header"] and sections.header:
+            text.append(sections.header)
+        if parts["summary"] and sections.summary:
+            text.append(f"{headings.get('summary', 'Summary')}\n{sections.summary}")
+        if parts["experience"]:
+            blocks = [sections.experience[i] for i in parts["experience"]]
+            text.append(f"{headings.get('experience', 'Experience')}\n" + "\n".join(blocks))
+        if parts["education"]:
+            blocks = [sections.education[i] for i in parts["education"]]
+            text.append(f"{headings.get('education', 'Education')}\n" + "\n".join(blocks))
+        if parts["skills"] and sections.skills:
+            text.append(f"{headings.get('skills', 'Skills')}\n{sections.skills}")
+        return "\n\n".join(text)
+
+    def merge(self, parsed: MasterCV, parts: dict, base: MasterCV | None = None) -> MasterCV | None:
+        """
+        Fill the low-confidence parts from the LLM's parse of `render(parts)`.
+
+        `base` is the CV to fill (default: the locally parsed CV), so chunks
+        can be merged one after another.
+
+        Returns None if the LLM entries cannot be paired with the blocks
+        they were parsed from.
+        """
+        sections = self.sections
+        experience = align_entries(
+            [sections.experience[i] for i in parts["experience"]], parsed.experience, ("company", "role")
+        )
+        education = align_entries(
+            [sections.education[i] for i in parts["education"]], parsed.education, ("institution", "degree")
+        )
+        if experience is None or education is None:
+            return None
+
+        cv = (base or self.cv).model_copy(deep=True)
+        if parts["header"]:
+            cv.name = parsed.name or cv.name
+            cv.email = parsed.email or cv.email
+            cv.phone = parsed.phone or cv.phone
+            cv.location = parsed.location or cv.location
+        if parts["summary"]:
+            cv.summary = parsed.summary
+        if parts["skills"]:
+            cv.skills = parsed.skills
+        for i, entry in zip(parts["experience"], experience):
+            cv.experience[i] = entry
+        for i, entry in zip(parts["education"], education):
+            cv.education[i] = entry
+        return cv
+
+
+def pre_structure_cv(raw_text: str) -> PreStructuredCV:
+    """
+    Parse a resume locally into a partial MasterCV with per-section confidence.
+
+    Args:
+        raw_text: Plain text extracted from resume PDF
+
+    Returns:
+        PreStructuredCV; check `sections.recognized` before trusting it
+    """
+    return PreStructuredCV(split_cv_sections(raw_text))
@@ -0,0 +1,202 @@
+"""CV section splitter and fingerprints.
+
+Splits raw resume text (as returned by extract_text_from_pdf) into its
+header, summary, skills and other sections, and splits the experience and
+education sections into one block per entry. Each part gets a content
+hash, so a re-uploaded CV can be diffed against the previous upload
+section by section.
+
+Purely heuristic and deterministic: no LLM calls.
+"""
+import hashlib
+import re
+
+
+# Section headings → section kind; a heading is a short line matching one of these
+SECTION_HEADINGS = [
+    ("summary", re.compile(
+        r"^(professional |career |executive )?(summary|profile|objective)$|^about( me)?$", re.IGNORECASE
+    )),
+    ("experience", re.compile(
+        r"^((professional|work|relevant|industry) )?(experience|employment( history)?|work history|career history)$",
+        re.IGNORECASE
+    )),
+    ("education", re.compile(
+        r"^(education|academic background|education (and|&) (training|certifications?)|qualifications)$",
+        re.IGNORECASE
+    )),
+    ("skills", re.compile(
+        r"^((technical|core|key|professional) )?(skills|competencies|technologies|tech stack)"
+        r"( (and|&) (tools|technologies|interests))?$",
+        re.IGNORECASE
+    )),
+    ("other", re.compile(
+        r"^(projects?|personal projects|certifications?|licenses( (and|&) certifications)?|awards?|honou?rs"
+        r"( (and|&) awards)?|publications?|languages?|interests|hobbies|volunteer(ing| experience)?|"
+        r"references|activities|achievements)$",
+        re.IGNORECASE
+    )),
+]
+
+BULLET_RE = re.compile(r"^[•●▪■◦‣∙·\-–—*>➢✓]\s*")
+
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+# Group 1: start date, group 2: end date
+DATE_RANGE_RE = re.compile(
+    rf"((?:{_MONTH}\s*)?\d{{4}}|\d{{1,2}}/\d{{2,4}})\s*(?:-|–|—|to)\s*"
+    rf"((?:{_MONTH}\s*)?\d{{4}}|\d{{1,2}}/\d{{2,4}}|present|current|now|today)",
+    re.IGNORECASE
+)
+SINGLE_DATE_RE = re.compile(rf"\b(?:{_MONTH}\s*)?(?:19|20)\d{{2}}\b", re.IGNORECASE)
+
+# Header lines of an entry (company, role) sit just above its date line
+MAX_ENTRY_HEADER_LINES = 2
+MAX_ENTRY_HEADER_WORDS = 10
+
+
+def fingerprint_text(text: str) -> str:
+    """Hash of the text with whitespace differences ignored."""
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()[:16]
+
+
+def heading_kind(line: str) -> str | None:
+    candidate = line.strip().rstrip(":").strip()
+    if not candidate or len(candidate.split()) > 5:
+        return None
+    for kind, pattern in SECTION_HEADINGS:
+        if pattern.match(candidate):
+            return kind
+    return None
+
+
+def _is_bullet(line: str) -> bool:
+    return bool(BULLET_RE.match(line))
+
+
+def _is_entry_header(line: str) -> bool:
+    return (
+        not _is_bullet(line)
+        and len(line.split()) <= MAX_ENTRY_HEADER_WORDS
+        and not line.rstrip().endswith((".", ","))
+    )
+
+
+def split_entries(lines: list[str], date_re: re.Pattern = DATE_RANGE_RE) -> list[str]:
+    """
+    Split an experience or education section into one text block per entry.
+
+    Each entry is anchored on its date line; the block starts at the entry
+    header lines (company, role) directly above that date.
+    """
+    anchors = [i for i, line in enumerate(lines) if not _is_bullet(line) and date_re.search(line)]
+    if len(anchors) <= 1:
+        return ["\n".join(lines)] if lines else []
+
+    starts = []
+    previous_start = 0
+    for anchor in anchors:
+        start = anchor
+        while (
+            start > previous_start
+            and anchor - start < MAX_ENTRY_HEADER_LINES
+            and _is_entry_header(lines[start - 1])
+        ):
+            start -= 1
+        if not starts:
+            start = 0
+        starts.append(start)
+        previous_start = anchor + 1
+
+    bounds = starts + [len(lines)]
+    return ["\n".join(lines[bounds[i]:bounds[i + 1]]) for i in range(len(starts)) if bounds[i] < bounds[i + 1]]
+
+
+class CVSections:
+    """Raw CV text split into sections, with per-section fingerprints."""
+
+    def __init__(self, raw_text: str):
+        self.raw_text = raw_text
+        self.header = ""
+        self.summary = ""
+        self.skills = ""
+        self.other = ""
+        self.experience: list[str] = []
+        self.education: list[str] = []
+        self.headings: dict[str, str] = {}  # kind → heading as written in the CV
+
+        self._split()
+
+    def _split(self) -> None:
+        lines = [line.strip() for line in self.raw_text.splitlines() if line.strip()]
+        parts: dict[str, list[str]] = {"header": []}
+        current = "header"
+        for line in lines:
+            kind = heading_kind(line)
+            if kind:
+                current = kind
+                self.headings.setdefault(kind, line)
+                parts.setdefault(kind, [])
+                continue
+            parts.setdefault(current, []).append(line)
+
+        self.header = "\n".join(parts.get("header", []))
+        self.summary = "\n".join(parts.get("summary", []))
+        self.skills = "\n".join(parts.get("skills", []))
+        self.other = "\n".join(parts.get("other", []))
+        self.experience = split_entries(parts.get("experience", []))
+        self.education = split_entries(parts.get("education", []), SINGLE_DATE_RE)
+
+    @property
+    def recognized(self) -> bool:
+        """True when the layout was understood well enough to diff by section."""
+        return "experience" in self.headings and bool(self.experience)
+
+    @property
+    def document_hash(self) -> str:
+        return fingerprint_text(self.raw_text)
+
+    def fingerprint(self) -> dict:
+        """Section hashes; experience and education hold one hash per entry block."""
+        return {
+            "header": fingerprint_text(self.header),
+            "summary": fingerprint_text(self.summary),
+            "skills": fingerprint_text(self.skills),
+            "other": fingerprint_text(self.other),
+            "experience": [fingerprint_text(block) for block in self.experience],
+            "education": [fingerprint_text(block) for block in self.education],
+        }
+
+
+def _norm(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def align_entries(blocks: list[str], entries: list, fields: tuple[str, ...]) -> list | None:
+    """
+    Pair each text block with the structured entry parsed from it.
+
+    An entry belongs to the block that contains the most of its identifying
+    fields (company, role, ...). Returns entries in block order, or None if
+    the pairing is not one-to-one.
+    """
+    if len(blocks) != len(entries):
+        return None
+    normalized_blocks = [_norm(block) for block in blocks]
+    aligned: list = [None] * len(blocks)
+    for entry in entries:
+        best, best_score = None, 0
+        for i, block in enumerate(normalized_blocks):
+            if aligned[i] is not None:
+                continue
+            score = sum(1 for field in fields if getattr(entry, field) and _norm(getattr(entry, field)) in block)
+            if score > best_score:
+                best, best_score = i, score
+        if best is None:
+            return None
+        aligned[best] = entry
+    return aligned
+
+
+def split_cv_sections(raw_text: str) -> CVSections:
+    """Split raw resume text into fingerprinted sections."""
+    return CVSections(raw_text)
@@ -2,9 +2,36 @@
 
 Converts raw resume text into canonical structured JSON.
 No guessing, no filling gaps, no hallucination.
+
+Well-formatted resumes are mostly parsed locally by the rule-based
+pre-structurer; only sections it is not confident about go to the LLM.
+Long inputs are structured in chunks, concurrently, and merged.
+
+Per-user structuring keeps the last structured CV with a section-level
+fingerprint of its raw text. A re-uploaded CV is diffed section by section
+and only the changed parts are sent to the LLM; an identical CV skips the
+LLM entirely.
 """
-from models.cv import MasterCV
-from services.llm import llm_service
+import hashlib
+import logging
+
+from config import settings
+from models.cv import MasterCV, Experience, Education
+from agents.cv_sections import CVSections, split_cv_sections, align_entries
+from agents.cv_prestructurer import PreStructuredCV, pre_structure_cv
+from agents.cv_chunking import split_parts, split_text_windows, merge_structured, structure_chunks
+from services.cache import TTLCache
+from services.llm import llm_service, estimate_tokens
+from services.tracing import record_cache, traced
+
+logger = logging.getLogger(__name__)
+
+
+# Last structured CV per user
+_cv_states = TTLCache(
+    max_entries=settings.CV_STATE_MAX_ENTRIES,
+    ttl_seconds=settings.CV_STATE_TTL_SECONDS
+)
 
 
 # LOCKED PROMPT - DO NOT MODIFY
@@ -53,11 +80,68 @@ Use this exact JSON schema:
   ]
 }"""
 
+# Part of cache keys for structured CVs: bump when the local parsing rules change
+CV_STRUCTURER_VERSION = hashlib.sha256(CV_STRUCTURING_PROMPT.encode("utf-8")).hexdigest()[:12] + ".1"
+
+
+async def _structure_with_llm(raw_text: str) -> MasterCV:
+    """One LLM structuring call on (part of) the resume text."""
+    # Call LLM to structure the CV
+    result = await llm_service.generate_json(
+        user_prompt=f"Parse this resume:\n\n{raw_text}",
+        system_prompt=CV_STRUCTURING_PROMPT,
+        temperature=0.1  # Low temperature for consistency
+    )
+    
+    # Validate against schema
+    return MasterCV(**result)
+
+
+def _chunked(text: str) -> bool:
+    return settings.CV_CHUNKED_ENABLED and estimate_tokens(text) > settings.CV_CHUNKED_MIN_TOKENS
+
+
+async def _structure_text(raw_text: str) -> MasterCV:
+    """LLM structuring of free text: one call, or text windows for long CVs."""
+    if not _chunked(raw_text):
+        return await _structure_with_llm(raw_text)
+    
+    windows = split_text_windows(raw_text, settings.CV_CHUNK_MAX_TOKENS)
+    logger.info(f"Chunked CV structuring: {len(windows)} text windows")
+    parsed = await structure_chunks(windows, _structure_with_llm, settings.CV_CHUNK_CONCURRENCY)
+    return merge_structured(parsed)
+
+
+async def _structure_parts(pre: PreStructuredCV, parts: dict) -> MasterCV | None:
+    """LLM structuring of the selected sections, chunked by block for long CVs."""
+    partial_text = pre.render(parts)
+    if not _chunked(partial_text):
+        return pre.merge(await _structure_with_llm(partial_text), parts)
+    
+    chunks = split_parts(parts, pre.sections, settings.CV_CHUNK_MAX_TOKENS)
+    logger.info(f"Chunked CV structuring: {len(chunks)} section chunks")
+    parsed = await structure_chunks(
+        [pre.render(chunk) for chunk in chunks], _structure_with_llm, settings.CV_CHUNK_CONCURRENCY
+    )
+    cv = pre.cv
+    for chunk, chunk_cv in zip(chunks, parsed):
+        cv = pre.merge(chunk_cv, chunk, base=cv)
+        if cv is None:
+            return None
+    return cv
+
 
+@traced("agent.cv_structurer")
 async def structure_cv(raw_text: str) -> MasterCV:
     """
     Convert raw resume text to structured MasterCV JSON.
     
+    Sections the rule-based pre-structurer parses with high confidence are
+    taken as-is; the rest (or the whole text, when the layout is not
+    recognized) is structured by the LLM and merged in. Above
+    CV_CHUNKED_MIN_TOKENS the LLM work is split into chunks structured
+    concurrently.
+    
     Args:
         raw_text: Plain text extracted from resume PDF
         
@@ -71,17 +155,213 @@ async def structure_cv(raw_text: str) -> MasterCV:
         raise ValueError("Empty resume text provided")
     
     try:
-        # Call LLM to structure the CV
-        result = await llm_service.generate_json(
-            user_prompt=f"Parse this resume:\n\n{raw_text}",
-            system_prompt=CV_STRUCTURING_PROMPT,
-            temperature=0.1  # Low temperature for consistency
-        )
+        if not settings.CV_PRESTRUCTURE_ENABLED:
+            return await _structure_text(raw_text)
         
-        # Validate against schema
-        cv = MasterCV(**result)
+        pre = pre_structure_cv(raw_text)
+        if not pre.sections.recognized:
+            return await _structure_text(raw_text)
         
+        parts = pre.low_confidence(settings.CV_PRESTRUCTURE_MIN_CONFIDENCE)
+        if not pre.needs_llm(parts):
+            logger.info("CV structured locally, no LLM call")
+            return pre.cv
+        
+        partial_text = pre.render(parts)
+        cv = await _structure_parts(pre, parts)
+        if cv is None:
+            # LLM entries did not line up with the blocks sent: full pass
+            return await _structure_text(raw_text)
+        
+        logger.info(
+            f"CV pre-structured: LLM saw {len(partial_text)}/{len(raw_text)} chars "
+            f"({len(parts['experience'])}/{len(pre.cv.experience)} experience, "
+            f"{len(parts['education'])}/{len(pre.cv.education)} education blocks)"
+        )
         return cv
         
     except Exception as e:
         raise ValueError(f"Failed to structure CV: {e}")
+
+
+class CVStructureState:
+    """Last structured CV of a user plus the fingerprints it was built from."""
+
+    def __init__(
+        self,
+        document_hash: str,
+        fingerprint: dict,
+        cv: MasterCV,
+        experience: dict[str, Experience] | None,
+        education: dict[str, Education] | None
+    ):
+        self.document_hash = document_hash
+        self.fingerprint = fingerprint
+        self.cv = cv
+        # Structured entry by block hash; None when blocks and entries did not line up
+        self.experience = experience
+        self.education = education
+
+
+def _entry_maps(sections: CVSections, cv: MasterCV) -> tuple[dict | None, dict | None]:
+    fingerprint = sections.fingerprint()
+    experience = align_entries(sections.experience, cv.experience, ("company", "role"))
+    education = align_entries(sections.education, cv.education, ("institution", "degree"))
+    return (
+        dict(zip(fingerprint["experience"], experience)) if experience is not None else None,
+        dict(zip(fingerprint["education"], education)) if education is not None else None,
+    )
+
+
+def _save_state(user_id: str, sections: CVSections, cv: MasterCV) -> None:
+    experience, education = _entry_maps(sections, cv)
+    _cv_states.set(user_id, CVStructureState(
+        document_hash=sections.document_hash,
+        fingerprint=sections.fingerprint(),
+        cv=cv.model_copy(deep=True),
+        experience=experience,
+        education=education
+    ))
+
+
+async def _restructure_changed(
+    sections: CVSections,
+    state: CVStructureState
+) -> MasterCV | None:
+    """
+    Re-structure only the sections that changed since the user's last upload.
+
+    Returns the merged CV, or None when the diff cannot be applied safely
+    (the caller then falls back to a full structuring call).
+    """
+    fingerprint = sections.fingerprint()
+    previous = state.fingerprint
+    changed_header = fingerprint["header"] != previous["header"]
+    # Without a summary heading, the summary is part of the header text
+    changed_summary = fingerprint["summary"] != previous["summary"] or (
+        changed_header and "summary" not in sections.headings
+    )
+    changed_skills = fingerprint["skills"] != previous["skills"]
+    new_experience = [
+        block for block, h in zip(sections.experience, fingerprint["experience"])
+        if h not in state.experience
+    ]
+    new_education = [
+        block for block, h in zip(sections.education, fingerprint["education"])
+        if h not in state.education
+    ]
+
+    partial = []
+    if changed_header:
+        partial.append(sections.header)
+    if changed_summary and sections.summary:
+        partial.append(f"{sections.headings.get('summary', 'Summary')}\n{sections.summary}")
+    if new_experience:
+        partial.append(f"{sections.headings['experience']}\n" + "\n".join(new_experience))
+    if new_education:
+        partial.append(f"{sections.headings.get('education', 'Education')}\n" + "\n".join(new_education))
+    if changed_skills and sections.skills:
+        partial.append(f"{sections.headings.get('skills', 'Skills')}\n{sections.skills}")
+
+    cv = state.cv.model_copy(deep=True)
+    if partial:
+        parsed = await structure_cv("\n\n".join(partial))
+        experience = align_entries(new_experience, parsed.experience, ("company", "role"))
+        education = align_entries(new_education, parsed.education, ("institution", "degree"))
+        if experience is None or education is None:
+            return None
+        fresh_experience = dict(zip((b for b in fingerprint["experience"] if b not in state.experience), experience))
+        fresh_education = dict(zip((b for b in fingerprint["education"] if b not in state.education), education))
+        if changed_header:
+            cv.name, cv.email, cv.phone, cv.location = parsed.name, parsed.email, parsed.phone, parsed.location
+        if changed_summary:
+            cv.summary = parsed.summary
+        if changed_skills:
+            cv.skills = parsed.skills
+    else:
+        fresh_experience, fresh_education = {}, {}
+        if changed_summary:
+            cv.summary = ""
+        if changed_skills:
+            cv.skills = []
+
+    # Entries follow the new document order; removed blocks drop out
+    known_experience = {**state.experience, **fresh_experience}
+    known_education = {**state.education, **fresh_education}
+    cv.experience = [known_experience[h].model_copy(deep=True) for h in fingerprint["experience"]]
+    cv.education = [known_education[h].model_copy(deep=True) for h in fingerprint["education"]]
+
+    logger.info(
+        f"Incremental CV structuring: {len(new_experience)}/{len(sections.experience)} experience, "
+        f"{len(new_education)}/{len(sections.education)} education blocks re-structured"
+    )
+    return cv
+
+
+@traced("agent.cv_structurer")
+async def structure_cv_for_user(raw_text: str, user_id: str | None) -> MasterCV:
+    """
+    Structure a user's CV, reusing their previous upload where it is unchanged.
+    
+    - Identical text: the cached CV is returned without an LLM call
+    - Changed text with a recognized layout: only changed header, summary,
+      skills, experience and education blocks are re-structured and merged
+      into the cached CV
+    - Otherwise (first upload, anonymous user, unrecognized layout):
+      full structuring
+    
+    Args:
+        raw_text: Plain text extracted from resume PDF
+        user_id: Authenticated user id, or None for anonymous uploads
+        
+    Returns:
+        MasterCV object with structured data
+        
+    Raises:
+        ValueError: If structuring fails
+    """
+    if not user_id or not settings.CV_STATE_ENABLED:
+        return await structure_cv(raw_text)
+
+    sections = split_cv_sections(raw_text)
+    state = _cv_states.get(user_id)
+
+    if state is not None and state.document_hash == sections.document_hash:
+        logger.info("CV unchanged since last upload, skipping structuring")
+        record_cache(hits=1)
+        return state.cv.model_copy(deep=True)
+    record_cache(misses=1)
+
+    cv = None
+    if (
+        state is not None
+        and sections.recognized
+        and state.experience is not None
+        and state.education is not None
+    ):
+        cv = await _restructure_changed(sections, state)
+
+    if cv is None:
+        cv = await structure_cv(raw_text)
+
+    _remember(user_id, sections, cv)
+    return cv
+
+
+def _remember(user_id: str, sections: CVSections, cv: MasterCV) -> None:
+    if sections.recognized:
+        _save_state(user_id, sections, cv)
+    else:
+        # Still lets an identical re-upload skip the LLM
+        _cv_states.set(user_id, CVStructureState(
+            sections.document_hash, sections.fingerprint(), cv.model_copy(deep=True), None, None
+        ))
+
+
+def remember_cv_for_user(raw_text: str, user_id: str | None, cv: MasterCV) -> None:
+    """
+    Record a CV structured elsewhere (e.g. served from the PDF cache) as the
+    user's last upload, so their next re-upload is diffed against it.
+    """
+    if user_id and settings.CV_STATE_ENABLED:
+        _remember(user_id, split_cv_sections(raw_text), cv)
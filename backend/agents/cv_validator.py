@@ -5,6 +5,7 @@ Does NOT rewrite content - only fixes consistency.
 """
 import re
 from models.cv import MasterCV, Experience, Education
+from services.tracing import traced
 
 
 def normalize_date(date_str: str) -> str:
@@ -91,6 +92,7 @@ def validate_education(edu: Education) -> Education:
     )
 
 
+@traced("agent.cv_validator")
 def validate_cv(cv: MasterCV) -> MasterCV:
     """
     Validate and normalize MasterCV structure.
@@ -0,0 +1,276 @@
+"""Incremental Tailoring.
+
+Re-tailors a CV after the user changes confirmed skills without re-running
+the whole Phase 3 pipeline. The baseline match (CV without confirmed skills)
+is computed once per analysis session; confirmed skills are then applied
+locally, and only experience entries whose evidence changed are re-written.
+When no experience changed, the Skills section of the previous resume is
+patched in place and re-fitted to the page budget instead of regenerating
+the resume.
+"""
+import logging
+import re
+
+from config import settings
+from models.cv import MasterCV
+from models.job import JobAnalysis, CompanyIntelligence, CompanyVoiceProfile
+from models.tailoring import MatchingResult, RewriteResult, TailoredResume, TailoringState
+from agents.cv_matcher import analyze_cv_job_match
+from agents.bullet_rewriter import rewrite_bullets
+from agents.resume_generator import fit_page_budget, generate_ats_resume, prioritize_skills
+from services.cache import TTLCache, content_hash, stable_hash
+
+logger = logging.getLogger(__name__)
+
+
+# Tailoring state by analysis session fingerprint
+_tailoring_states = TTLCache(
+    max_entries=settings.TAILORING_STATE_MAX_ENTRIES,
+    ttl_seconds=settings.TAILORING_STATE_TTL_SECONDS
+)
+
+
+def analysis_fingerprint(
+    master_cv: MasterCV,
+    job_analysis: JobAnalysis,
+    company_intel: CompanyIntelligence,
+    voice_profile: CompanyVoiceProfile | None = None
+) -> str:
+    """Identify an analysis session by the step 1 outputs it was built from."""
+    return stable_hash(
+        master_cv.model_dump(),
+        job_analysis.model_dump(),
+        company_intel.model_dump(),
+        voice_profile.model_dump() if voice_profile else None
+    )
+
+
+def get_tailoring_state(fingerprint: str) -> TailoringState | None:
+    """Load the tailoring state saved for an analysis session."""
+    return _tailoring_states.get(fingerprint)
+
+
+def save_tailoring_state(fingerprint: str, state: TailoringState) -> None:
+    """Persist the tailoring state for an analysis session."""
+    _tailoring_states.set(fingerprint, state)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def add_confirmed_skills(cv: MasterCV, confirmed_skills: list[str]) -> MasterCV:
+    """Return a copy of the CV with user-confirmed skills appended."""
+    enhanced_cv = cv.model_copy(deep=True)
+    for skill in confirmed_skills:
+        if skill not in enhanced_cv.skills:
+            enhanced_cv.skills.append(skill)
+    return enhanced_cv
+
+
+def apply_confirmed_skills(
+    cv: MasterCV,
+    baseline: MatchingResult,
+    confirmed_skills: list[str]
+) -> tuple[MatchingResult, set[str]]:
+    """
+    Apply confirmed skills to a baseline match without calling the LLM.
+
+    Confirmed skills become matched skills and stop being missing keywords.
+    An experience entry is affected when one of its original bullets
+    mentions a confirmed skill; the skill is then attributed to that entry.
+
+    Returns:
+        Tuple of (updated MatchingResult, "company|role" keys of affected entries)
+    """
+    matching = baseline.model_copy(deep=True)
+    if not confirmed_skills:
+        return matching, set()
+
+    confirmed = {_normalize(skill): skill for skill in confirmed_skills if skill.strip()}
+
+    matched = {_normalize(skill) for skill in matching.matched_skills}
+    for normalized, skill in confirmed.items():
+        if normalized not in matched:
+            matching.matched_skills.append(skill)
+            matched.add(normalized)
+
+    matching.missing_keywords = [
+        keyword for keyword in matching.missing_keywords
+        if _normalize(keyword) not in confirmed
+    ]
+
+    bullets_by_key = {
+        f"{exp.company}|{exp.role}": _normalize(" ".join(exp.bullets))
+        for exp in cv.experience
+    }
+
+    affected = set()
+    for rel_exp in matching.relevant_experience:
+        key = f"{rel_exp.company}|{rel_exp.role}"
+        evidence = bullets_by_key.get(key, "")
+        exp_skills = {_normalize(skill) for skill in rel_exp.matched_skills}
+        for normalized, skill in confirmed.items():
+            if normalized not in exp_skills and normalized in evidence:
+                rel_exp.matched_skills.append(skill)
+                exp_skills.add(normalized)
+                affected.add(key)
+
+    return matching, affected
+
+
+def patch_skills_section(resume_markdown: str, skills: list[str]) -> str | None:
+    """
+    Replace the body of the "## Skills" section of a generated resume.
+
+    Returns None if the resume has no recognizable Skills section.
+    """
+    match = re.search(r"^##\s*Skills\s*$", resume_markdown, flags=re.MULTILINE | re.IGNORECASE)
+    if not match:
+        return None
+
+    next_heading = re.search(r"^#{1,2}\s", resume_markdown[match.end():], flags=re.MULTILINE)
+    section_end = match.end() + next_heading.start() if next_heading else len(resume_markdown)
+
+    skills_body = "\n" + ", ".join(skills) + "\n\n"
+    patched = resume_markdown[:match.end()] + skills_body + resume_markdown[section_end:].lstrip("\n")
+    return patched.strip()
+
+
+def resume_content_key(resume_markdown: str) -> str:
+    """Hash of a generated resume ignoring its Skills section (what toggling a skill changes)."""
+    without_skills = patch_skills_section(resume_markdown, [])
+    return content_hash((without_skills if without_skills is not None else resume_markdown).encode("utf-8"))
+
+
+async def tailor_baseline(
+    master_cv: MasterCV,
+    job_analysis: JobAnalysis,
+    voice_profile: CompanyVoiceProfile | None
+) -> TailoringState:
+    """
+    Match and rewrite the CV with no confirmed skills.
+    
+    Used speculatively after step 1: the result seeds tailor_incremental,
+    which re-writes only the entries the user's confirmed skills affect.
+    """
+    baseline = await analyze_cv_job_match(master_cv, job_analysis)
+    rewritten = await rewrite_bullets(
+        master_cv,
+        baseline,
+        job_analysis.keywords_for_ats,
+        voice_profile
+    )
+    return TailoringState(
+        baseline_matching=baseline,
+        matching=baseline,
+        rewritten=rewritten
+    )
+
+
+async def tailor_incremental(
+    master_cv: MasterCV,
+    job_analysis: JobAnalysis,
+    company_intel: CompanyIntelligence,
+    voice_profile: CompanyVoiceProfile | None,
+    confirmed_skills: list[str],
+    state: TailoringState | None = None
+) -> tuple[TailoredResume, TailoringState]:
+    """
+    Tailor the resume, reusing a previous run's intermediates where possible.
+
+    Args:
+        master_cv: Master CV from step 1 (without confirmed skills)
+        job_analysis: Job analysis from step 1
+        company_intel: Company intelligence from step 1
+        voice_profile: Company voice profile for bullet rewriting
+        confirmed_skills: Skills the user confirmed they have
+        state: Tailoring state from a previous run of this session, if any
+
+    Returns:
+        Tuple of (TailoredResume, updated TailoringState)
+    """
+    enhanced_cv = add_confirmed_skills(master_cv, confirmed_skills)
+    job_keywords = job_analysis.keywords_for_ats
+
+    # Baseline match is independent of confirmed skills: compute it once
+    if state is None:
+        baseline = await analyze_cv_job_match(master_cv, job_analysis)
+    else:
+        baseline = state.baseline_matching
+
+    matching, affected = apply_confirmed_skills(master_cv, baseline, confirmed_skills)
+
+    # Reuse rewritten entries whose match input is unchanged since the last run
+    previous_inputs = {}
+    previous_rewrites = {}
+    if state is not None:
+        previous_inputs = {
+            f"{exp.company}|{exp.role}": exp for exp in state.matching.relevant_experience
+        }
+        previous_rewrites = {
+            f"{exp.company}|{exp.role}": exp for exp in state.rewritten.rewritten_experience
+        }
+
+    stale = [
+        rel_exp for rel_exp in matching.relevant_experience
+        if previous_inputs.get(f"{rel_exp.company}|{rel_exp.role}") != rel_exp
+        or f"{rel_exp.company}|{rel_exp.role}" not in previous_rewrites
+    ]
+
+    fresh_rewrites = {}
+    if stale:
+        partial = await rewrite_bullets(
+            enhanced_cv,
+            MatchingResult(relevant_experience=stale),
+            job_keywords,
+            voice_profile
+        )
+        fresh_rewrites = {
+            f"{exp.company}|{exp.role}": exp for exp in partial.rewritten_experience
+        }
+
+    rewritten = RewriteResult(rewritten_experience=[
+        fresh_rewrites.get(key) or previous_rewrites[key]
+        for key in (f"{exp.company}|{exp.role}" for exp in matching.relevant_experience)
+        if key in fresh_rewrites or key in previous_rewrites
+    ])
+
+    logger.info(
+        f"Incremental tailoring: {len(stale)}/{len(matching.relevant_experience)} "
+        f"experience entries re-written ({len(affected)} affected by confirmed skills)"
+    )
+
+    # Experience unchanged: only the Skills section needs updating
+    resume = None
+    if state is not None and state.resume is not None and rewritten == state.rewritten:
+        skills = prioritize_skills(matching.matched_skills, enhanced_cv.skills)
+        patched = patch_skills_section(state.resume.resume_markdown, skills)
+        if patched is not None:
+            # A longer Skills line can push the resume past the page budget
+            fit = fit_page_budget(patched, job_keywords + matching.matched_skills)
+            resume = state.resume.model_copy(update={
+                "resume_markdown": fit.markdown,
+                "matched_skills": matching.matched_skills,
+                "estimated_pages": fit.pages,
+                "trimmed_bullets": state.resume.trimmed_bullets + fit.dropped_bullets
+            })
+
+    if resume is None:
+        resume = await generate_ats_resume(
+            enhanced_cv,
+            rewritten,
+            matching.matched_skills,
+            job_keywords,
+            company_intel
+        )
+
+    new_state = TailoringState(
+        baseline_matching=baseline,
+        matching=matching,
+        rewritten=rewritten,
+        resume=resume,
+        confirmed_skills=list(confirmed_skills)
+    )
+
+    return resume, new_state
@@ -4,9 +4,33 @@ Converts raw JD text into structured hiring intelligence with:
 - Must-have vs nice-to-have skill separation
 - Unclear skills for user clarification
 - Years of experience extraction
+
+Analyses are shared across users through the JD analysis cache: the same
+posting pasted again, or a near-duplicate of it (tracking footer, reordered
+bullets, whitespace), reuses the stored analysis instead of an LLM call.
+
+Only the sections that affect the analysis are sent to the LLM (benefits,
+legal and company boilerplate are dropped by the JD segmenter); very long
+postings are analyzed in chunks and the partial analyses merged.
 """
+import asyncio
+import hashlib
+import logging
+import time
+
+from config import settings
 from models.job import JobAnalysis
-from services.llm import llm_service
+from services.cache import stable_hash
+from services.jd_cache import jd_analysis_cache, normalize_jd_text, JDCacheHit
+from services.llm import llm_service, estimate_tokens, meter_tokens
+from agents.jd_segmenter import SegmentedJD, merge_partial_analyses
+from services.tracing import record_cache, traced
+
+
+logger = logging.getLogger(__name__)
+
+# Concurrent analyses of the same normalized text share one LLM call
+_analysis_inflight: dict[str, asyncio.Task] = {}
 
 
 # Enhanced prompt with better skill categorization
@@ -81,30 +105,143 @@ ALSO populate required_skills and preferred_skills (for backward compatibility):
 - required_skills = same as must_have_skills
 - preferred_skills = same as nice_to_have_skills"""
 
+# Part of every cache key, so editing the prompt invalidates stale analyses
+JD_ANALYSIS_PROMPT_VERSION = hashlib.sha256(JD_ANALYSIS_PROMPT.encode("utf-8")).hexdigest()[:12]
+
+
+async def _analyze_chunk(jd_text: str) -> dict:
+    """One LLM analysis call."""
+    result = await llm_service.generate_json(
+        user_prompt=f"Analyze this job description and categorize skills carefully:\n\n{jd_text}",
+        system_prompt=JD_ANALYSIS_PROMPT,
+        temperature=0.1
+    )
+    
+    # Ensure backward compatibility
+    if not result.get("required_skills") and result.get("must_have_skills"):
+        result["required_skills"] = result["must_have_skills"]
+    if not result.get("preferred_skills") and result.get("nice_to_have_skills"):
+        result["preferred_skills"] = result["nice_to_have_skills"]
+    return result
+
 
-async def analyze_job_description(jd_text: str) -> JobAnalysis:
+async def _analyze_uncached(jd_text: str) -> dict:
     """
-    Analyze job description and extract structured data.
+    Analyze the relevant sections of a JD, before hints are applied.
     
-    Enhanced with must-have vs nice-to-have skill separation.
+    Postings whose relevant text exceeds JD_MAP_REDUCE_MIN_TOKENS are
+    analyzed chunk by chunk in parallel (map) and merged (reduce).
+    """
+    started = time.perf_counter()
+    chunks = [jd_text]
+    dropped: list[str] = []
+    
+    with meter_tokens() as meter:
+        if settings.JD_SEGMENTATION_ENABLED:
+            segmented = SegmentedJD(jd_text)
+            dropped = segmented.dropped_kinds
+            relevant = segmented.relevant_text()
+            if estimate_tokens(relevant) > settings.JD_MAP_REDUCE_MIN_TOKENS:
+                chunks = segmented.chunks(settings.JD_CHUNK_MAX_TOKENS)
+            else:
+                chunks = [relevant]
+        
+        partials = await asyncio.gather(*(_analyze_chunk(chunk) for chunk in chunks))
+        result = partials[0] if len(partials) == 1 else merge_partial_analyses(list(partials))
+    
+    logger.info(
+        f"JD analysis: ~{estimate_tokens(jd_text)} -> ~{sum(estimate_tokens(c) for c in chunks)} "
+        f"input tokens (dropped: {', '.join(dropped) or 'none'}), {len(chunks)} call(s), "
+        f"{meter.prompt_tokens} prompt + {meter.completion_tokens} completion tokens, "
+        f"{(time.perf_counter() - started) * 1000:.0f} ms"
+    )
+    
+    # Validate before caching so a malformed response is never shared
+    return JobAnalysis(**result).model_dump()
+
+
+async def _analyze_and_store(key: str, jd_text: str, normalized: str, signature) -> JDCacheHit:
+    try:
+        analysis = await _analyze_uncached(jd_text)
+        entry = jd_analysis_cache.store(key, signature, analysis, len(normalized.split()))
+        return JDCacheHit(entry, "analyzed", 1.0)
+    finally:
+        _analysis_inflight.pop(key, None)
+
+
+@traced("agent.jd_analyzer")
+async def analyze_job_description_with_provenance(
+    jd_text: str,
+    hints: dict[str, str] | None = None
+) -> tuple[JobAnalysis, dict]:
+    """
+    Analyze a job description, reusing cached analyses of the same posting.
+    
+    Args:
+        jd_text: Job description text
+        hints: Fields already known from the posting's structured data;
+            applied on top of cached and fresh analyses alike
+    
+    Returns:
+        Tuple of (JobAnalysis, provenance). Provenance records whether the
+        analysis was an exact or near-duplicate cache hit or a fresh LLM
+        call, the similarity to the cached posting and its reuse counts.
+    
+    Raises:
+        ValueError: If the text is empty or the analysis fails
     """
     if not jd_text.strip():
         raise ValueError("Empty job description provided")
     
     try:
-        result = await llm_service.generate_json(
-            user_prompt=f"Analyze this job description and categorize skills carefully:\n\n{jd_text}",
-            system_prompt=JD_ANALYSIS_PROMPT,
-            temperature=0.1
-        )
+        hit = None
+        if settings.JD_CACHE_ENABLED:
+            normalized = normalize_jd_text(jd_text)
+            key = stable_hash(JD_ANALYSIS_PROMPT_VERSION, normalized)
+            signature = jd_analysis_cache.hasher.signature(normalized)
+            hit = jd_analysis_cache.lookup(key, signature)
+            if hit is None:
+                task = _analysis_inflight.get(key)
+                if task is None:
+                    task = asyncio.create_task(_analyze_and_store(key, jd_text, normalized, signature))
+                    _analysis_inflight[key] = task
+                hit = await asyncio.shield(task)
+            fresh = hit.match == "analyzed"
+            record_cache(hits=int(not fresh), misses=int(fresh))
+            result = dict(hit.analysis)
+        else:
+            result = await _analyze_uncached(jd_text)
         
-        # Ensure backward compatibility
-        if not result.get("required_skills") and result.get("must_have_skills"):
-            result["required_skills"] = result["must_have_skills"]
-        if not result.get("preferred_skills") and result.get("nice_to_have_skills"):
-            result["preferred_skills"] = result["nice_to_have_skills"]
+        if hints:
+            result.update(hints)
         
-        return JobAnalysis(**result)
+        # A fresh model per caller, so the cached dict is never mutated
+        job = JobAnalysis(**result)
         
     except Exception as e:
         raise ValueError(f"Failed to analyze job description: {e}")
+    
+    provenance = hit.provenance() if hit else {"match": "uncached"}
+    if hit and hit.match != "analyzed":
+        logger.info(
+            f"JD analysis cache {hit.match} hit (similarity {provenance['similarity']}, "
+            f"entry {provenance['key']}, {hit.entry.exact_hits + hit.entry.near_hits} reuses)"
+        )
+    return job, provenance
+
+
+@traced("agent.jd_analyzer")
+async def analyze_job_description(jd_text: str, hints: dict[str, str] | None = None) -> JobAnalysis:
+    """
+    Analyze job description and extract structured data.
+    
+    Enhanced with must-have vs nice-to-have skill separation.
+    
+    Args:
+        jd_text: Job description text
+        hints: Fields already known from the posting's structured data
+            (see ResolvedJobPosting.analysis_hints); they take precedence
+            over the LLM's reading of the text
+    """
+    job, _ = await analyze_job_description_with_provenance(jd_text, hints)
+    return job
@@ -0,0 +1,298 @@
+"""Job description segmenter.
+
+Splits JD text into sections by their headings and classifies each one
+(responsibilities, requirements, nice-to-have, benefits, about-us, legal).
+Benefits, EEO/legal boilerplate and most of the company blurb do not affect
+JobAnalysis, so only the relevant sections are sent to the analyzer; long
+postings are split into several analysis chunks (map) whose partial
+analyses are merged (reduce).
+
+Purely local and deterministic: no LLM calls.
+"""
+import re
+
+from services.llm import estimate_tokens
+
+
+# Checked in order: the first matching pattern classifies a heading
+SECTION_PATTERNS = [
+    ("legal", re.compile(
+        r"equal (employment )?opportunit|\beeo\b|affirmative action|accommodation|privacy|e-verify|"
+        r"disclaimer|\blegal\b|pay transparency|fraud|recruitment agencies", re.IGNORECASE
+    )),
+    ("benefits", re.compile(
+        r"benefits|perks|what we offer|we offer|compensation|salary|pay range|total rewards|"
+        r"why (join|work)|what.s in it for you", re.IGNORECASE
+    )),
+    ("nice_to_have", re.compile(
+        r"nice[- ]to[- ]have|preferred|bonus|\bplus\b|desired|ideally|good to have|extra credit", re.IGNORECASE
+    )),
+    ("responsibilities", re.compile(
+        r"responsibilit|what you.ll (do|work on|own)|what you will (do|work on)|(the|your) role|day[- ]to[- ]day|"
+        r"duties|you will|in this role|about the (role|job|position|opportunity)|the job|the opportunity|"
+        r"your (impact|mission)|key accountabilities", re.IGNORECASE
+    )),
+    ("requirements", re.compile(
+        r"requirements?|qualifications|what you.ll (need|bring)|what you (need|bring)|who you are|"
+        r"must[- ]have|skills|experience|about you|you have|you are|looking for|minimum|essential",
+        re.IGNORECASE
+    )),
+    ("about_us", re.compile(
+        r"^about\b|who we are|our (company|mission|story|culture|team|values)|company overview|life at|"
+        r"why us\b", re.IGNORECASE
+    )),
+]
+
+# EEO/legal sentences that often appear without their own heading
+LEGAL_LINE_RE = re.compile(
+    r"equal opportunity employer|without regard to (race|age|sex|gender)|regardless of (race|age|gender)|"
+    r"reasonable accommodation|protected (veteran|characteristic|class)|e-verify|applicant privacy",
+    re.IGNORECASE
+)
+
+RELEVANT_KINDS = frozenset({"intro", "responsibilities", "requirements", "nice_to_have", "other"})
+CORE_KINDS = frozenset({"responsibilities", "requirements", "nice_to_have"})
+
+# The company blurb is mostly irrelevant but names the industry
+ABOUT_US_MAX_CHARS = 400
+
+MAX_HEADING_WORDS = 8
+
+
+class JDSegment:
+    """One section of a job description."""
+
+    __slots__ = ("kind", "heading", "text")
+
+    def __init__(self, kind: str, heading: str, text: str):
+        self.kind = kind
+        self.heading = heading
+        self.text = text
+
+    def render(self) -> str:
+        return f"{self.heading}\n{self.text}" if self.heading else self.text
+
+
+def _has_heading_markup(line: str, bare: str) -> bool:
+    """Markdown heading, whole-line bold, trailing colon or ALL CAPS."""
+    bold = line.startswith("**") and line.rstrip(":").endswith("**")
+    return line.startswith("#") or bold or line.endswith(":") or (bare.isupper() and len(bare) > 3)
+
+
+def _bare(line: str) -> str | None:
+    """Heading text without markup, or None if the line cannot be a heading."""
+    line = line.strip()
+    if not line or line.startswith(("•", "- ", "* ", "–")):
+        return None
+    bare = line.strip("#*: ").strip()
+    if not bare or len(bare.split()) > MAX_HEADING_WORDS or bare.endswith((".", "!", "?", ",", ";")):
+        return None
+    return bare
+
+
+def _is_title_case(bare: str) -> bool:
+    """Every word capitalized, apart from short function words."""
+    minor = {"and", "or", "of", "the", "a", "an", "to", "in", "for", "with", "at", "on", "we", "you"}
+    words = [w for w in bare.split() if w[:1].isalpha()]
+    return bool(words) and all(w[0].isupper() or w.lower() in minor for w in words)
+
+
+def _is_short_title(line: str) -> bool:
+    bare = _bare(line)
+    return bare is not None and _is_title_case(bare)
+
+
+def classify_heading(line: str, implicit: bool = False) -> str | None:
+    """
+    Section kind of a heading line, "other" for unknown headings, None if not a heading.
+
+    Args:
+        line: Stripped JD line
+        implicit: Accept a known section name without heading markup (plain
+            title case); the caller checks it is followed by content and not
+            part of a list of short title-case lines
+    """
+    line = line.strip()
+    bare = _bare(line)
+    if bare is None:
+        return None
+    explicit = _has_heading_markup(line, bare)
+    if not explicit and not (implicit and _is_title_case(bare)):
+        return None
+    for kind, pattern in SECTION_PATTERNS:
+        if pattern.search(bare):
+            return kind
+    # Unknown section: only trust explicit heading markup
+    return "other" if explicit else None
+
+
+def segment_jd(jd_text: str) -> list[JDSegment]:
+    """
+    Split a JD into classified sections; text before the first heading is "intro".
+
+    Short requirement bullets ("Benefits administration", "3+ years payroll
+    experience") are content, not headings. A heading with no content under
+    it keeps its own text as a line of the section.
+    """
+    segments: list[JDSegment] = []
+    kind, heading, lines = "intro", "", []
+    legal_lines: list[str] = []
+    all_lines = [raw.strip() for raw in jd_text.splitlines() if raw.strip()]
+
+    def flush():
+        if lines:
+            segments.append(JDSegment(kind, heading, "\n".join(lines)))
+        elif heading:
+            # Nothing under it: keep the line itself, in a section that is sent to the analyzer
+            segments.append(JDSegment(kind if kind in RELEVANT_KINDS else "other", "", heading))
+
+    for i, line in enumerate(all_lines):
+        next_line = all_lines[i + 1] if i + 1 < len(all_lines) else ""
+        previous = all_lines[i - 1] if i else ""
+        # A plain title-case line is a heading only between content lines, not inside a list of them
+        implicit = bool(next_line) and not _is_short_title(next_line) and not _is_short_title(previous)
+        heading_kind = classify_heading(line, implicit=implicit)
+        if heading_kind:
+            flush()
+            kind, heading, lines = heading_kind, line, []
+            continue
+        if kind != "legal" and LEGAL_LINE_RE.search(line):
+            legal_lines.append(line)
+            continue
+        lines.append(line)
+    flush()
+
+    if legal_lines:
+        segments.append(JDSegment("legal", "", "\n".join(legal_lines)))
+    return segments
+
+
+class SegmentedJD:
+    """Relevant sections of a JD, ready to analyze in one or more chunks."""
+
+    def __init__(self, jd_text: str):
+        self.jd_text = jd_text
+        self.segments = segment_jd(jd_text)
+        kinds = {segment.kind for segment in self.segments}
+        # Without recognizable requirement/responsibility sections the
+        # classification is not trustworthy: analyze the full text
+        self.segmented = bool(kinds & CORE_KINDS)
+
+        # A "dropped" section between requirement sections is more likely a
+        # misread heading inside them than real boilerplate: keep it
+        core = [i for i, s in enumerate(self.segments) if s.kind in CORE_KINDS]
+        self.kept = [
+            s.kind in RELEVANT_KINDS or (core and core[0] < i < core[-1])
+            for i, s in enumerate(self.segments)
+        ]
+
+        if self.segmented:
+            self.intro = "\n".join(s.render() for s in self.segments if s.kind == "intro")
+            about = " ".join(
+                s.text for s, kept in zip(self.segments, self.kept) if s.kind == "about_us" and not kept
+            )
+            if about:
+                about = about[:ABOUT_US_MAX_CHARS].rsplit(" ", 1)[0] if len(about) > ABOUT_US_MAX_CHARS else about
+                self.intro = f"{self.intro}\nAbout the company: {about}".strip()
+            self.body = [s for s, kept in zip(self.segments, self.kept) if kept and s.kind != "intro"]
+        else:
+            self.intro = ""
+            self.body = []
+
+    @property
+    def dropped_kinds(self) -> list[str]:
+        return sorted({s.kind for s, kept in zip(self.segments, self.kept) if not kept})
+
+    def relevant_text(self) -> str:
+        """Intro plus relevant sections, or the full text if not segmented."""
+        if not self.segmented:
+            return self.jd_text
+        return "\n\n".join([self.intro] + [s.render() for s in self.body]).strip()
+
+    @staticmethod
+    def _split_long(segments: list[JDSegment], max_tokens: int) -> list[JDSegment]:
+        """Split sections longer than max_tokens at line boundaries, keeping the heading."""
+        result = []
+        for segment in segments:
+            if estimate_tokens(segment.render()) <= max_tokens:
+                result.append(segment)
+                continue
+            lines, size = [], estimate_tokens(segment.heading)
+            for line in segment.text.split("\n"):
+                if lines and size + estimate_tokens(line) > max_tokens:
+                    result.append(JDSegment(segment.kind, segment.heading, "\n".join(lines)))
+                    lines, size = [], estimate_tokens(segment.heading)
+                lines.append(line)
+                size += estimate_tokens(line) + 1
+            if lines:
+                result.append(JDSegment(segment.kind, segment.heading, "\n".join(lines)))
+        return result
+
+    def chunks(self, max_tokens: int) -> list[str]:
+        """
+        Relevant text split into analysis chunks of about max_tokens.
+
+        Every chunk repeats the intro (title, seniority, company context);
+        sections are kept whole and grouped in document order.
+        """
+        if not self.segmented:
+            return [self.jd_text]
+        intro_tokens = estimate_tokens(self.intro)
+        chunks, current, size = [], [], intro_tokens
+        for segment in self._split_long(self.body, max_tokens - intro_tokens):
+            tokens = estimate_tokens(segment.render())
+            if current and size + tokens > max_tokens:
+                chunks.append(current)
+                current, size = [], intro_tokens
+            current.append(segment)
+            size += tokens
+        if current or not chunks:
+            chunks.append(current)
+        return ["\n\n".join([self.intro] + [s.render() for s in chunk]).strip() for chunk in chunks]
+
+
+# Skill lists in precedence order: a skill keeps its strongest category
+_SKILL_FIELDS = ("must_have_skills", "nice_to_have_skills", "unclear_skills")
+_LIST_FIELDS = ("responsibilities", "keywords_for_ats")
+_SCALAR_FIELDS = (
+    "role_title", "department", "seniority_level", "employment_type", "industry", "years_experience_required"
+)
+
+
+def _norm(value: str) -> str:
+    return " ".join(value.lower().split())
+
+
+def merge_partial_analyses(partials: list[dict]) -> dict:
+    """
+    Reduce step: merge analyses of JD chunks into one.
+
+    Scalars take the first non-empty value (the first chunk holds the
+    responsibilities and intro). Lists are unioned in chunk order. A skill
+    found as must-have in any chunk is must-have overall and is removed
+    from the nice-to-have and unclear lists.
+    """
+    merged: dict = {field: "" for field in _SCALAR_FIELDS}
+    for field in _SKILL_FIELDS + _LIST_FIELDS:
+        merged[field] = []
+    seen: dict[str, set[str]] = {field: set() for field in _SKILL_FIELDS + _LIST_FIELDS}
+
+    for partial in partials:
+        for field in _SCALAR_FIELDS:
+            if not merged[field] and partial.get(field):
+                merged[field] = partial[field]
+        for field in _SKILL_FIELDS + _LIST_FIELDS:
+            for item in partial.get(field) or []:
+                key = _norm(item)
+                if key and key not in seen[field]:
+                    seen[field].add(key)
+                    merged[field].append(item)
+
+    stronger: set[str] = set()
+    for field in _SKILL_FIELDS:
+        merged[field] = [s for s in merged[field] if _norm(s) not in stronger]
+        stronger.update(_norm(s) for s in merged[field])
+
+    merged["required_skills"] = list(merged["must_have_skills"])
+    merged["preferred_skills"] = list(merged["nice_to_have_skills"])
+    return merged
@@ -0,0 +1,245 @@
+"""Structured-data fast path for job posting pages.
+
+Many job sites embed a schema.org `JobPosting` as JSON-LD, or at least
+OpenGraph metadata, carrying the full description, title and company.
+Reading those directly gives clean JD text without the LLM extraction
+call in the URL resolver.
+"""
+import html
+import json
+from html.parser import HTMLParser
+
+from models.job import ResolvedJobPosting
+
+
+# Below this, a structured description is probably a teaser, not the full JD
+MIN_JSON_LD_DESCRIPTION_CHARS = 200
+MIN_OPENGRAPH_DESCRIPTION_CHARS = 600
+
+# schema.org employmentType → JobAnalysis.employment_type
+EMPLOYMENT_TYPES = {
+    "FULL_TIME": "Full-time",
+    "PART_TIME": "Part-time",
+    "CONTRACTOR": "Contract",
+    "CONTRACT": "Contract",
+    "TEMPORARY": "Temporary",
+    "INTERN": "Internship",
+    "INTERNSHIP": "Internship",
+    "VOLUNTEER": "Volunteer",
+    "PER_DIEM": "Per diem",
+}
+
+# Free-text JobPosting properties appended after the description
+EXTRA_TEXT_PROPERTIES = [
+    ("responsibilities", "Responsibilities"),
+    ("qualifications", "Qualifications"),
+    ("skills", "Skills"),
+    ("educationRequirements", "Education"),
+    ("experienceRequirements", "Experience"),
+]
+
+
+class StructuredDataCollector(HTMLParser):
+    """
+    Collects JSON-LD script bodies and <meta> properties in one pass.
+
+    Can be fed the page chunk by chunk while it downloads.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.json_ld: list[str] = []
+        self.meta: dict[str, str] = {}
+        self._in_json_ld = False
+        self._buffer: list[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        attributes = {name.lower(): (value or "") for name, value in attrs}
+        if tag == "script" and attributes.get("type", "").lower().strip() == "application/ld+json":
+            self._in_json_ld = True
+            self._buffer = []
+        elif tag == "meta":
+            key = (attributes.get("property") or attributes.get("name") or "").lower()
+            if key and "content" in attributes:
+                self.meta.setdefault(key, attributes["content"])
+
+    def handle_endtag(self, tag):
+        if tag == "script" and self._in_json_ld:
+            self.json_ld.append("".join(self._buffer))
+            self._in_json_ld = False
+
+    def handle_data(self, data):
+        if self._in_json_ld:
+            self._buffer.append(data)
+
+
+def _iter_json_ld_nodes(value):
+    """Walk JSON-LD documents, including lists and @graph containers."""
+    if isinstance(value, list):
+        for item in value:
+            yield from _iter_json_ld_nodes(item)
+    elif isinstance(value, dict):
+        yield value
+        if "@graph" in value:
+            yield from _iter_json_ld_nodes(value["@graph"])
+
+
+def _is_job_posting(node: dict) -> bool:
+    node_type = node.get("@type")
+    types = node_type if isinstance(node_type, list) else [node_type]
+    return any(isinstance(t, str) and t.split("/")[-1] == "JobPosting" for t in types)
+
+
+def _text(value) -> str:
+    """Flatten a JSON-LD value (string, list, or typed object) to text."""
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, list):
+        return "\n".join(filter(None, (_text(v) for v in value)))
+    if isinstance(value, dict):
+        for key in ("name", "description", "value", "@value"):
+            if key in value:
+                return _text(value[key])
+    return ""
+
+
+def _html_text(value) -> str:
+    """JSON-LD descriptions are usually HTML fragments, sometimes entity-escaped."""
+    from agents.url_resolver import basic_html_to_text
+
+    text = _text(value)
+    if "&lt;" in text:
+        text = html.unescape(text)
+    return basic_html_to_text(text) if "<" in text else text
+
+
+def _employment_type(value) -> str:
+    values = value if isinstance(value, list) else [value]
+    labels = []
+    for item in values:
+        if isinstance(item, str) and item.strip():
+            key = item.strip().upper().replace("-", "_").replace(" ", "_")
+            labels.append(EMPLOYMENT_TYPES.get(key, item.strip()))
+    return ", ".join(dict.fromkeys(labels))
+
+
+def _location(node: dict) -> str:
+    if str(node.get("jobLocationType", "")).upper() == "TELECOMMUTE":
+        return "Remote"
+    locations = node.get("jobLocation")
+    locations = locations if isinstance(locations, list) else [locations]
+    names = []
+    for location in locations:
+        if not isinstance(location, dict):
+            continue
+        address = location.get("address")
+        if isinstance(address, dict):
+            parts = [
+                _text(address.get(key))
+                for key in ("addressLocality", "addressRegion", "addressCountry")
+            ]
+            name = ", ".join(p for p in parts if p)
+        else:
+            name = _text(address) or _text(location.get("name"))
+        if name:
+            names.append(name)
+    return "; ".join(dict.fromkeys(names))
+
+
+def _years_experience(value) -> str:
+    """experienceRequirements may be an OccupationalExperienceRequirements object."""
+    if isinstance(value, dict) and value.get("monthsOfExperience"):
+        try:
+            months = float(value["monthsOfExperience"])
+        except (TypeError, ValueError):
+            return ""
+        years = months / 12
+        return f"{years:g}+ years" if years >= 1 else f"{months:g}+ months"
+    return ""
+
+
+def _from_json_ld(node: dict) -> ResolvedJobPosting | None:
+    description = _html_text(node.get("description"))
+    if len(description) < MIN_JSON_LD_DESCRIPTION_CHARS:
+        return None
+
+    role_title = _text(node.get("title"))
+    company_name = _text(node.get("hiringOrganization"))
+    employment_type = _employment_type(node.get("employmentType"))
+    location = _location(node)
+
+    header = [role_title, company_name, location, employment_type]
+    sections = ["\n".join(h for h in header if h), description]
+    for prop, heading in EXTRA_TEXT_PROPERTIES:
+        value = node.get(prop)
+        if isinstance(value, dict) and not _text(value):
+            continue
+        text = _html_text(value)
+        if text and text not in description:
+            sections.append(f"{heading}:\n{text}")
+
+    return ResolvedJobPosting(
+        jd_text="\n\n".join(s for s in sections if s),
+        source="json_ld",
+        role_title=role_title,
+        employment_type=employment_type,
+        industry=_text(node.get("industry")),
+        years_experience_required=_years_experience(node.get("experienceRequirements")),
+        company_name=company_name,
+        location=location
+    )
+
+
+def _from_opengraph(meta: dict[str, str]) -> ResolvedJobPosting | None:
+    description = (meta.get("og:description") or meta.get("description") or "").strip()
+    if len(description) < MIN_OPENGRAPH_DESCRIPTION_CHARS:
+        return None
+
+    role_title = (meta.get("og:title") or "").strip()
+    company_name = (meta.get("og:site_name") or "").strip()
+    header = "\n".join(h for h in (role_title, company_name) if h)
+
+    return ResolvedJobPosting(
+        jd_text=f"{header}\n\n{description}" if header else description,
+        source="opengraph",
+        role_title=role_title,
+        company_name=company_name
+    )
+
+
+def job_posting_from_collector(collector: StructuredDataCollector) -> ResolvedJobPosting | None:
+    """Build a posting from collected structured data: JSON-LD first, then OpenGraph."""
+    for raw in collector.json_ld:
+        try:
+            document = json.loads(raw, strict=False)
+        except ValueError:
+            continue
+        for node in _iter_json_ld_nodes(document):
+            if _is_job_posting(node):
+                posting = _from_json_ld(node)
+                if posting:
+                    return posting
+
+    return _from_opengraph(collector.meta)
+
+
+def parse_structured_job_posting(page_html: str) -> ResolvedJobPosting | None:
+    """
+    Extract a job posting from embedded structured data.
+
+    Tries schema.org JobPosting JSON-LD first, then OpenGraph metadata.
+
+    Args:
+        page_html: Raw HTML of the job posting page
+
+    Returns:
+        ResolvedJobPosting, or None if the page has no usable structured data
+    """
+    collector = StructuredDataCollector()
+    try:
+        collector.feed(page_html)
+        collector.close()
+    except Exception:
+        return None
+
+    return job_posting_from_collector(collector)
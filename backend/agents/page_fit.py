@@ -0,0 +1,229 @@
+"""Page-fit estimator for generated resumes.
+
+The resume LLM is asked to stay within one page but cannot measure
+rendered length. This lays the markdown out locally the way the PDF
+export renders it — same fonts, sizes, spacing and margins, with words
+wrapped using PyMuPDF font metrics — to predict the page count and the
+overflow. If the resume is too long, the lowest-value bullets are dropped
+so the rest fits: a 0/1 knapsack over bullet heights (in wrapped lines)
+and local relevance scores. Deterministic, no LLM calls.
+"""
+import re
+
+import fitz  # PyMuPDF
+
+from models.export import ExportOptions
+from services.resume_export import (
+    PAGE_SIZES, MARGINS, BULLET_INDENT, LINE_HEIGHT, block_metrics, classify_markdown_line
+)
+from services.tracing import traced
+
+
+# Base-14 fonts matching the export's sans-serif body and bold headings
+BODY_FONT = "helv"
+BOLD_FONT = "hebo"
+
+_METRIC_RE = re.compile(r"\d|%|\$|€|£")
+
+
+class LaidOutBlock:
+    """One markdown line as laid out on the page."""
+
+    __slots__ = ("line_number", "kind", "text", "lines", "pitch", "before", "after", "entry_index", "position")
+
+    def __init__(self, line_number: int, kind: str, text: str, lines: int, pitch: float, before: float, after: float):
+        self.line_number = line_number  # Index into markdown.splitlines()
+        self.kind = kind
+        self.text = text
+        self.lines = lines  # Wrapped lines
+        self.pitch = pitch  # Line height in points
+        self.before = before
+        self.after = after
+        self.entry_index = -1  # Bullets: which experience entry (0 = first)
+        self.position = -1  # Bullets: index within the entry
+
+
+class _Measure:
+    """Word widths via PyMuPDF font metrics, memoized per layout."""
+
+    def __init__(self):
+        self._widths: dict[tuple[str, str, float], float] = {}
+
+    def width(self, word: str, font: str, size: float) -> float:
+        key = (word, font, size)
+        if key not in self._widths:
+            self._widths[key] = fitz.get_text_length(word, fontname=font, fontsize=size)
+        return self._widths[key]
+
+    def wrap_count(self, text: str, font: str, size: float, width: float) -> int:
+        """Number of lines text wraps to at the given width."""
+        lines, current = 1, 0.0
+        space = self.width(" ", font, size)
+        for word in text.replace("**", "").split():
+            length = self.width(word, font, size)
+            if current and current + space + length > width:
+                lines += 1
+                current = length
+            else:
+                current += (space if current else 0) + length
+        return lines
+
+
+def layout_resume(markdown: str, options: ExportOptions) -> list[LaidOutBlock]:
+    """Lay out resume markdown into blocks with wrapped line counts and spacing."""
+    page_width, _ = PAGE_SIZES[options.page_size]
+    body_width = page_width - 2 * MARGINS[options.template] - 2 * options.font_size
+    measure = _Measure()
+
+    blocks: list[LaidOutBlock] = []
+    entry_index, position = -1, 0
+    for number, raw in enumerate(markdown.splitlines()):
+        classified = classify_markdown_line(raw)
+        if classified is None:
+            continue
+        kind, text = classified
+        size, before, after = block_metrics(kind, options)
+        font = BOLD_FONT if kind in ("name", "section", "entry") else BODY_FONT
+        width = body_width - BULLET_INDENT if kind == "bullet" else body_width
+        if kind == "section":
+            text = text.upper()
+        lines = measure.wrap_count(text, font, size, width)
+
+        if kind == "entry":
+            entry_index, position = entry_index + 1, 0
+        block = LaidOutBlock(number, kind, text, lines, size * LINE_HEIGHT, before, after)
+        if kind == "bullet":
+            block.entry_index, block.position = max(entry_index, 0), position
+            position += 1
+        blocks.append(block)
+
+    # The list's bottom margin follows its last bullet
+    for current, following in zip(blocks, blocks[1:] + [None]):
+        if current.kind == "bullet" and (following is None or following.kind != "bullet"):
+            current.after = block_metrics("list", options)[2]
+    return blocks
+
+
+class PageFit:
+    """Predicted layout of a resume, and the bullets dropped to fit it."""
+
+    def __init__(self, markdown: str, pages: int, page_height: float, total_height: float, line_height: float):
+        self.markdown = markdown
+        self.pages = pages
+        self.page_height = page_height  # Usable height per page, in points
+        self.total_height = total_height  # As if pages were one continuous column
+        self.line_height = line_height  # Of body text
+        self.dropped_bullets: list[str] = []
+
+    def overflow_lines(self, max_pages: int) -> int:
+        """Body-text lines beyond max_pages (0 if it fits)."""
+        overflow = self.total_height - max_pages * self.page_height
+        return int(-(-overflow // self.line_height)) if overflow > 0 else 0
+
+
+def estimate_page_fit(markdown: str, options: ExportOptions | None = None) -> PageFit:
+    """Predict the page count of resume markdown as rendered by the PDF export."""
+    options = options or ExportOptions()
+    _, page_height = PAGE_SIZES[options.page_size]
+    # The body's 1em inset applies at the top of the column only
+    usable = page_height - 2 * MARGINS[options.template] - options.font_size
+
+    # Vertical margins between blocks collapse (CSS); lines flow onto the
+    # next page, and a heading moves with its first line
+    pages, y, previous_after = 1, 0.0, 0.0
+    for block in layout_resume(markdown, options):
+        gap = max(previous_after, block.before) if y > 0 else 0.0
+        if y + gap + block.pitch > usable and y > 0:
+            pages, y, gap = pages + 1, 0.0, 0.0
+        y += gap
+        for _ in range(block.lines):
+            if y + block.pitch > usable:
+                pages, y = pages + 1, 0.0
+            y += block.pitch
+        previous_after = block.after
+    total = (pages - 1) * usable + y
+    return PageFit(markdown, pages, usable, total, options.font_size * LINE_HEIGHT)
+
+
+def bullet_value(block: LaidOutBlock, keywords: list[str]) -> int:
+    """
+    Local relevance of a bullet: job keywords it mentions, whether it is
+    quantified, how recent its role is and how high it sits in the role.
+    """
+    text = block.text.lower()
+    hits = sum(1 for keyword in keywords if keyword and re.search(rf"(?<!\w){re.escape(keyword.lower())}(?!\w)", text))
+    value = 1 + 3 * hits
+    if _METRIC_RE.search(text):
+        value += 2
+    value += max(0, 3 - block.entry_index)
+    value += max(0, 2 - block.position)
+    return value
+
+
+def select_bullets_to_keep(weights: list[int], values: list[int], capacity: int) -> set[int]:
+    """0/1 knapsack: indices of the most valuable set of bullets within capacity."""
+    best = [0] * (capacity + 1)
+    keep = [[False] * (capacity + 1) for _ in weights]
+    for i, (weight, value) in enumerate(zip(weights, values)):
+        for c in range(capacity, weight - 1, -1):
+            if best[c - weight] + value > best[c]:
+                best[c] = best[c - weight] + value
+                keep[i][c] = True
+    chosen, c = set(), capacity
+    for i in range(len(weights) - 1, -1, -1):
+        if keep[i][c]:
+            chosen.add(i)
+            c -= weights[i]
+    return chosen
+
+
+@traced("agent.page_fit")
+def fit_resume(
+    markdown: str,
+    keywords: list[str],
+    max_pages: int = 1,
+    options: ExportOptions | None = None
+) -> PageFit:
+    """
+    Drop the lowest-value bullets until the resume fits max_pages.
+
+    The first bullet of every role is always kept, as are headings,
+    contact details, skills and education. If the resume still overflows
+    with every other bullet dropped, that best effort is returned.
+
+    Args:
+        markdown: Generated resume markdown
+        keywords: Job keywords and matched skills, for bullet relevance
+        max_pages: Target page count
+        options: Export layout the estimate is made for (default export)
+
+    Returns:
+        PageFit of the (possibly trimmed) markdown, with dropped_bullets
+    """
+    options = options or ExportOptions()
+    fit = estimate_page_fit(markdown, options)
+    if fit.pages <= max_pages:
+        return fit
+
+    raw_lines = markdown.splitlines()
+    blocks = layout_resume(markdown, options)
+    optional = [b for b in blocks if b.kind == "bullet" and b.position > 0]
+    weights = [b.lines for b in optional]
+    values = [bullet_value(b, keywords) for b in optional]
+
+    # Free the overflow, re-estimate (page breaks shift), and tighten if needed
+    excess = fit.overflow_lines(max_pages)
+    dropped: set[int] = set()
+    result = fit
+    while excess > 0 and len(dropped) < len(optional):
+        capacity = max(0, sum(weights) - excess)
+        kept = select_bullets_to_keep(weights, values, capacity)
+        dropped = {optional[i].line_number for i in range(len(optional)) if i not in kept}
+        trimmed = "\n".join(line for n, line in enumerate(raw_lines) if n not in dropped)
+        result = estimate_page_fit(trimmed, options)
+        if result.pages <= max_pages:
+            break
+        excess += max(1, result.overflow_lines(max_pages))
+
+    result.dropped_bullets = [b.text for b in optional if b.line_number in dropped]
+    return result
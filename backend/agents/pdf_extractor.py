@@ -2,85 +2,240 @@
 
 Extracts raw text from PDF resume files.
 No summarization, no cleanup beyond obvious headers/footers.
+
+Documents over PDF_MAX_PAGES are rejected before any page is read, and
+image-only (scanned) PDFs fail fast after the first pages instead of
+walking the whole document for no text. Long documents are extracted in
+contiguous page ranges across a process pool and reassembled in order.
 """
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
 import fitz  # PyMuPDF
 
+from config import settings
+from services.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+
+# Part of extracted-text cache keys: bump when extraction output changes
+PDF_EXTRACTOR_VERSION = "1"
+
+# Pages read up front to detect image-only documents
+PROBE_PAGES = 2
+
+
+class PDFExtractionMetrics:
+    """Counters for extraction time, page counts and early rejections."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.documents = 0
+        self.parallel_documents = 0
+        self.pages = 0
+        self.max_pages = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.rejected: dict[str, int] = {"too_many_pages": 0, "image_only": 0, "no_text": 0, "unreadable": 0}
+
+    def record(self, pages: int, seconds: float, parallel: bool) -> None:
+        with self._lock:
+            self.documents += 1
+            self.parallel_documents += int(parallel)
+            self.pages += pages
+            self.max_pages = max(self.max_pages, pages)
+            self.seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+
+    def reject(self, reason: str) -> None:
+        with self._lock:
+            self.rejected[reason] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "documents": self.documents,
+                "parallel_documents": self.parallel_documents,
+                "pages": self.pages,
+                "avg_pages": round(self.pages / self.documents, 2) if self.documents else 0.0,
+                "max_pages": self.max_pages,
+                "avg_seconds": round(self.seconds / self.documents, 4) if self.documents else 0.0,
+                "max_seconds": round(self.max_seconds, 4),
+                "rejected": dict(self.rejected),
+            }
+
+
+extraction_metrics = PDFExtractionMetrics()
+
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a process that runs an event loop and threads is unsafe
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.PDF_EXTRACT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def _discard_pool(broken: ProcessPoolExecutor) -> None:
+    """Drop a pool whose worker died (OOM kill, MuPDF crash) so the next call starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_extraction_pool() -> None:
+    """Stop the extraction worker processes, if any were started."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _page_text(page: fitz.Page, mode: str) -> str:
+    if mode == "blocks":
+        # Text blocks sorted by position (top to bottom, left to right); images skipped
+        blocks = sorted(page.get_text("blocks"), key=lambda b: (b[1], b[0]))
+        return "\n".join(b[4].strip() for b in blocks if b[6] == 0 and b[4].strip())
+    return page.get_text("text")
+
+
+def _page_range_texts(doc: fitz.Document, start: int, stop: int, mode: str) -> list[str]:
+    return [_page_text(doc[page_num], mode) for page_num in range(start, stop)]
+
+
+def _extract_range(file_bytes: bytes, start: int, stop: int, mode: str) -> list[str]:
+    """Process pool worker: texts of pages [start, stop)."""
+    with fitz.open(stream=file_bytes, filetype="pdf") as doc:
+        return _page_range_texts(doc, start, stop, mode)
+
+
+def _extract_parallel(file_bytes: bytes | memoryview, start: int, stop: int, mode: str) -> list[str]:
+    """Texts of pages [start, stop) in contiguous ranges across the pool, in page order."""
+    workers = settings.PDF_EXTRACT_WORKERS
+    step = -(-(stop - start) // workers)
+    bounds = [(i, min(i + step, stop)) for i in range(start, stop, step)]
+    data = bytes(file_bytes)  # Views over spooled uploads cannot be pickled
+    for attempt in (1, 2):
+        pool = _get_pool()
+        try:
+            futures = [pool.submit(_extract_range, data, lo, hi, mode) for lo, hi in bounds]
+            return [text for future in futures for text in future.result()]
+        except BrokenProcessPool:
+            _discard_pool(pool)
+            # The dead worker may have been serving another request: retry once on a fresh pool.
+            # A second crash is most likely this document; never retry it in-process.
+            logger.warning("PDF extraction worker died (attempt %d)", attempt)
+    extraction_metrics.reject("unreadable")
+    raise ValueError("Failed to extract text from PDF: the document crashed the extraction worker")
 
-def extract_text_from_pdf(file_bytes: bytes) -> str:
+
+def _extract_pages(file_bytes: bytes | memoryview, mode: str) -> list[str]:
     """
-    Extract all readable text from a PDF file.
-    
-    Args:
-        file_bytes: Raw PDF file bytes
-        
-    Returns:
-        Plain text extracted from the PDF, preserving order.
-        
+    Per-page texts with the page cap and image-only guard applied.
+
     Raises:
-        ValueError: If PDF cannot be parsed
+        ValueError: If the PDF cannot be parsed, has too many pages or
+            contains no extractable text
     """
+    started = time.perf_counter()
     try:
-        # Open PDF from bytes
         doc = fitz.open(stream=file_bytes, filetype="pdf")
-        
-        text_blocks = []
-        
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            
-            # Extract text with layout preservation
-            text = page.get_text("text")
-            
-            if text.strip():
-                text_blocks.append(text)
-        
-        doc.close()
-        
-        # Join all pages
-        full_text = "\n\n".join(text_blocks)
-        
-        # Basic cleanup - remove excessive whitespace
-        lines = []
-        for line in full_text.split("\n"):
-            stripped = line.strip()
-            if stripped:
-                lines.append(stripped)
-        
-        return "\n".join(lines)
-        
     except Exception as e:
+        extraction_metrics.reject("unreadable")
         raise ValueError(f"Failed to extract text from PDF: {e}")
 
+    with doc:
+        page_count = len(doc)
+        if page_count > settings.PDF_MAX_PAGES:
+            extraction_metrics.reject("too_many_pages")
+            raise ValueError(
+                f"PDF has {page_count} pages; at most {settings.PDF_MAX_PAGES} are accepted"
+            )
+
+        try:
+            pages = _page_range_texts(doc, 0, min(page_count, PROBE_PAGES), mode)
+            if not any(text.strip() for text in pages) and any(
+                doc[page_num].get_images() for page_num in range(len(pages))
+            ):
+                extraction_metrics.reject("image_only")
+                raise ValueError(
+                    "PDF appears to be scanned (images only, no text layer); "
+                    "please upload a text-based PDF"
+                )
+
+            parallel = (
+                page_count >= settings.PDF_PARALLEL_MIN_PAGES
+                and settings.PDF_EXTRACT_WORKERS > 1
+            )
+            if parallel:
+                pages += _extract_parallel(file_bytes, len(pages), page_count, mode)
+            else:
+                pages += _page_range_texts(doc, len(pages), page_count, mode)
+        except ValueError:
+            raise
+        except Exception as e:
+            extraction_metrics.reject("unreadable")
+            raise ValueError(f"Failed to extract text from PDF: {e}")
 
-def extract_text_from_pdf_with_blocks(file_bytes: bytes) -> str:
+    if not any(text.strip() for text in pages):
+        extraction_metrics.reject("no_text")
+        raise ValueError("PDF contains no extractable text")
+
+    elapsed = time.perf_counter() - started
+    extraction_metrics.record(page_count, elapsed, parallel)
+    logger.info(
+        "Extracted %d pages in %.0f ms%s", page_count, elapsed * 1000, " (parallel)" if parallel else ""
+    )
+    return pages
+
+
+@traced("agent.pdf_extractor")
+def extract_text_from_pdf(file_bytes: bytes | memoryview) -> str:
+    """
+    Extract all readable text from a PDF file.
+
+    Args:
+        file_bytes: Raw PDF file bytes, or a (memory-mapped) view of them
+
+    Returns:
+        Plain text extracted from the PDF, preserving order.
+
+    Raises:
+        ValueError: If PDF cannot be parsed, exceeds PDF_MAX_PAGES or
+            has no text layer
+    """
+    # Join all pages, then basic cleanup - remove excessive whitespace
+    full_text = "\n\n".join(text for text in _extract_pages(file_bytes, "text") if text.strip())
+    lines = []
+    for line in full_text.split("\n"):
+        stripped = line.strip()
+        if stripped:
+            lines.append(stripped)
+
+    return "\n".join(lines)
+
+
+@traced("agent.pdf_extractor")
+def extract_text_from_pdf_with_blocks(file_bytes: bytes | memoryview) -> str:
     """
     Extract text using block-based extraction for better structure.
-    
+
     This method preserves document structure better for complex layouts.
     """
-    try:
-        doc = fitz.open(stream=file_bytes, filetype="pdf")
-        
-        all_text = []
-        
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            
-            # Get text blocks with position info
-            blocks = page.get_text("blocks")
-            
-            # Sort blocks by position (top to bottom, left to right)
-            sorted_blocks = sorted(blocks, key=lambda b: (b[1], b[0]))
-            
-            for block in sorted_blocks:
-                if block[6] == 0:  # Text block (not image)
-                    text = block[4].strip()
-                    if text:
-                        all_text.append(text)
-        
-        doc.close()
-        
-        return "\n".join(all_text)
-        
-    except Exception as e:
-        raise ValueError(f"Failed to extract text from PDF: {e}")
+    return "\n".join(text for text in _extract_pages(file_bytes, "blocks") if text)
@@ -2,11 +2,19 @@
 
 Generates clean, ATS-compatible resume in markdown.
 Uses company philosophy and culture to predict ATS optimization priorities.
+The generated resume is measured locally and trimmed to RESUME_MAX_PAGES.
 """
+import logging
+
+from config import settings
 from models.cv import MasterCV
 from models.tailoring import RewriteResult, TailoredResume
 from models.job import CompanyIntelligence
+from agents.page_fit import PageFit, estimate_page_fit, fit_resume
 from services.llm import llm_service
+from services.tracing import traced
+
+logger = logging.getLogger(__name__)
 
 
 def _derive_ats_priorities_from_company(company_intel: CompanyIntelligence | None) -> str:
@@ -58,6 +66,53 @@ def _derive_ats_priorities_from_company(company_intel: CompanyIntelligence | Non
     return "\n".join(priorities) if priorities else "Standard ATS optimization."
 
 
+def prioritize_skills(matched_skills: list[str], cv_skills: list[str]) -> list[str]:
+    """Order skills for the Skills section: matched skills first, then the rest."""
+    all_skills = list(matched_skills)
+    for skill in cv_skills:
+        if skill not in all_skills:
+            all_skills.append(skill)
+    return all_skills
+
+
+def _length_guidance(max_pages: int) -> str:
+    """Page-length rules for the prompt, matching the page budget enforced after generation."""
+    if max_pages <= 1:
+        return """- The resume MUST fit on 1 page, whatever the candidate's number of roles.
+- Recruiters scan for 6-8 seconds. One clean, dense page wins over two sparse pages.
+- Choose what to cut yourself: keep the bullets with measurable impact and job keywords."""
+    return f"""- DEFAULT to 1 page. This is the target for most candidates.
+- Recruiters scan for 6-8 seconds. One clean, dense page wins over two sparse pages.
+- Expand beyond 1 page ONLY if you would be cutting real measurable achievements to stay at 1 page.
+
+How to decide:
+1. Count the candidate's RELEVANT roles with quantified achievements
+2. If 1-2 roles with strong bullets → 1 page
+3. If 3+ roles with genuine metrics and outcomes → up to {max_pages} pages is acceptable
+4. NEVER exceed {max_pages} pages. Beyond that is noise.
+
+The real rule: Use 1 page until you're CUTTING REAL ACHIEVEMENTS to stay there."""
+
+
+def fit_page_budget(resume_markdown: str, keywords: list[str]) -> PageFit:
+    """
+    Trim a resume to RESUME_MAX_PAGES (or only measure it when page fit is disabled).
+    
+    Args:
+        resume_markdown: Resume markdown
+        keywords: Job keywords and matched skills, for bullet relevance
+        
+    Returns:
+        PageFit of the (possibly trimmed) markdown
+    """
+    if not settings.RESUME_PAGE_FIT_ENABLED:
+        return estimate_page_fit(resume_markdown)
+    fit = fit_resume(resume_markdown, keywords, settings.RESUME_MAX_PAGES)
+    if fit.dropped_bullets:
+        logger.info("Trimmed %d bullets to fit %d page(s)", len(fit.dropped_bullets), settings.RESUME_MAX_PAGES)
+    return fit
+
+
 # ENHANCED PROMPT - Company-aware ATS optimization
 ATS_RESUME_PROMPT = """You are an expert ATS resume generator with company intelligence integration.
 
@@ -105,23 +160,13 @@ COMPANY-SPECIFIC OPTIMIZATION:
 {company_priorities}
 
 LENGTH GUIDANCE (CRITICAL):
-- DEFAULT to 1 page. This is the target for most candidates.
-- Recruiters scan for 6-8 seconds. One clean, dense page wins over two sparse pages.
-- Expand to 2 pages ONLY if you would be cutting real measurable achievements to stay at 1 page.
-
-How to decide:
-1. Count the candidate's RELEVANT roles with quantified achievements
-2. If 1-2 roles with strong bullets → 1 page
-3. If 3+ roles with genuine metrics and outcomes → 2 pages is acceptable
-4. NEVER exceed 2 pages. Beyond that is noise.
+{length_guidance}
 
 Quality over quantity:
 - 4 strong bullets per role > 8 weak bullets
 - Cut generic responsibilities, keep measurable impact
 - If a bullet doesn't show outcome or skill match, cut it
 
-The real rule: Use 1 page until you're CUTTING REAL ACHIEVEMENTS to stay there.
-
 IMPORTANT:
 - Do NOT invent experience, metrics, or dates
 - Do NOT add skills the candidate doesn't have
@@ -129,6 +174,7 @@ IMPORTANT:
 - Focus on ACTUAL achievements, properly worded for ATS"""
 
 
+@traced("agent.resume_generator")
 async def generate_ats_resume(
     cv: MasterCV,
     rewritten: RewriteResult,
@@ -153,7 +199,10 @@ async def generate_ats_resume(
     company_priorities = _derive_ats_priorities_from_company(company_intel)
     
     # Prepare system prompt with company context
-    system_prompt = ATS_RESUME_PROMPT.format(company_priorities=company_priorities)
+    system_prompt = ATS_RESUME_PROMPT.format(
+        company_priorities=company_priorities,
+        length_guidance=_length_guidance(settings.RESUME_MAX_PAGES)
+    )
     
     # Prepare structured inputs
     cv_contact = {
@@ -175,10 +224,7 @@ async def generate_ats_resume(
     ]
     
     # All skills with matched ones first (ATS prioritization)
-    all_skills = list(matched_skills)
-    for skill in cv.skills:
-        if skill not in all_skills:
-            all_skills.append(skill)
+    all_skills = prioritize_skills(matched_skills, cv.skills)
     
     # Include company context in user prompt
     company_context = ""
@@ -198,7 +244,7 @@ CONTACT INFO:
 {cv_contact}
 
 REWRITTEN EXPERIENCE (use these optimized bullets):
-{rewritten.model_dump_json(indent=2)}
+{rewritten.model_dump_json(indent=2, include={"rewritten_experience"})}
 
 SKILLS TO PRIORITIZE (matched skills, ordered by importance):
 {all_skills}
@@ -230,11 +276,16 @@ Generate the resume in clean markdown format following the exact template struct
             f"{skills_count} matched skills, and {keywords_count} job-specific keywords."
         )
         
+        # The LLM cannot measure rendered length: fit the page budget locally
+        fit = fit_page_budget(resume_md.strip(), job_keywords + matched_skills)
+        
         return TailoredResume(
-            resume_markdown=resume_md.strip(),
+            resume_markdown=fit.markdown,
             matched_skills=matched_skills,
             keywords_used=job_keywords,
-            relevance_summary=relevance_summary
+            relevance_summary=relevance_summary,
+            estimated_pages=fit.pages,
+            trimmed_bullets=fit.dropped_bullets
         )
         
     except Exception as e:
@@ -7,6 +7,7 @@ from models.cv import MasterCV
 from models.job import JobAnalysis
 from models.skill_gap import SkillGapAnalysis, SkillMatch
 from services.llm import llm_service
+from services.tracing import traced
 
 
 SKILL_GAP_PROMPT = """You are an ATS skill matching specialist.
@@ -38,6 +39,7 @@ Return JSON:
 }"""
 
 
+@traced("agent.skill_gap_analyzer")
 async def analyze_skill_gap(cv: MasterCV, job: JobAnalysis) -> SkillGapAnalysis:
     """
     Analyze skill gap between CV and JD.
@@ -3,9 +3,14 @@
 Extracts job description content from job posting URLs.
 Removes navigation, footers, and boilerplate.
 """
-import httpx
-import re
+import logging
+from html.parser import HTMLParser
+from config import settings
+from models.job import ResolvedJobPosting
 from services.llm import llm_service
+from services.tracing import traced
+
+logger = logging.getLogger(__name__)
 
 
 # LOCKED PROMPT - DO NOT MODIFY
@@ -29,6 +34,8 @@ async def fetch_url_content(url: str) -> str:
     """
     Fetch raw content from a URL.
     
+    Goes through the shared fetcher (pooled client, size cap, HTTP cache).
+    
     Args:
         url: Job posting URL
         
@@ -38,87 +45,203 @@ async def fetch_url_content(url: str) -> str:
     Raises:
         ValueError: If fetch fails
     """
-    try:
-        async with httpx.AsyncClient(
-            timeout=30.0,
-            follow_redirects=True,
-            headers={
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-            }
-        ) as client:
-            response = await client.get(url)
-            response.raise_for_status()
-            return response.text
-            
-    except Exception as e:
-        raise ValueError(f"Failed to fetch URL: {e}")
+    from services.http_fetcher import http_fetcher
+    
+    page = await http_fetcher.fetch(url)
+    return page.text
+
+
+# LLM cleanup input limits
+MIN_MAIN_CONTENT_WORDS = 50
+MAX_LLM_INPUT_CHARS = 12000
+
+# Content under these tags never belongs in the JD text
+SKIPPED_TAGS = frozenset({"script", "style", "noscript", "nav", "footer", "template", "svg"})
+
+# Tags that start a new line; other unknown tags become a space
+BLOCK_TAGS = frozenset({
+    "div", "section", "article", "main", "header", "aside", "ul", "ol", "dl", "dt", "dd",
+    "table", "tr", "blockquote", "pre", "form", "fieldset", "figure", "figcaption", "hr",
+})
+
+HEADING_TAGS = frozenset({"h1", "h2", "h3", "h4", "h5", "h6"})
+
+# Inline formatting tags join text without adding whitespace
+INLINE_TAGS = frozenset({
+    "a", "abbr", "b", "bdi", "bdo", "cite", "code", "em", "font", "i", "kbd", "mark",
+    "q", "s", "samp", "small", "span", "strong", "sub", "sup", "time", "u", "var", "wbr",
+})
+
+
+class HTMLTextConverter(HTMLParser):
+    """
+    Single-pass HTML → text converter.
+    
+    Feed the page in one piece or chunk by chunk as it downloads
+    (`feed()` repeatedly, then `close()`), then read `text()`. Entities are
+    decoded by the tokenizer; list items and headings keep their structure.
+    """
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._parts: list[str] = []
+        self._skip_depth = 0
+    
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+            return
+        if self._skip_depth:
+            return
+        if tag == "br":
+            self._parts.append("\n")
+        elif tag == "p" or tag in HEADING_TAGS:
+            self._parts.append("\n\n")
+        elif tag == "li":
+            self._parts.append("\n• ")
+        elif tag in BLOCK_TAGS:
+            self._parts.append("\n")
+        elif tag not in INLINE_TAGS:
+            self._parts.append(" ")
+    
+    def handle_startendtag(self, tag, attrs):
+        # <br/>, <img/>: no matching end tag, so never enter a skipped region
+        if tag not in SKIPPED_TAGS:
+            self.handle_starttag(tag, attrs)
+    
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS:
+            if self._skip_depth:
+                self._skip_depth -= 1
+            return
+        if self._skip_depth:
+            return
+        if tag == "p" or tag in HEADING_TAGS or tag in BLOCK_TAGS:
+            self._parts.append("\n")
+        elif tag not in INLINE_TAGS:
+            self._parts.append(" ")
+    
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._parts.append(data)
+    
+    def text(self) -> str:
+        """Text so far, with whitespace normalized and blank lines dropped."""
+        lines = []
+        for line in "".join(self._parts).split("\n"):
+            line = " ".join(line.split())
+            if line:
+                lines.append(line)
+        return "\n".join(lines)
 
 
 def basic_html_to_text(html: str) -> str:
     """
     Basic HTML to text conversion.
     
-    Removes scripts, styles, and converts common HTML to text.
+    Drops scripts, styles, navigation and footers, decodes entities and
+    converts common HTML structure (paragraphs, lists, headings) to text.
     """
-    # Remove scripts and styles
-    html = re.sub(r'<script[^>]*>.*?</script>', '', html, flags=re.DOTALL | re.IGNORECASE)
-    html = re.sub(r'<style[^>]*>.*?</style>', '', html, flags=re.DOTALL | re.IGNORECASE)
-    html = re.sub(r'<noscript[^>]*>.*?</noscript>', '', html, flags=re.DOTALL | re.IGNORECASE)
-    
-    # Convert common elements
-    html = re.sub(r'<br\s*/?>', '\n', html, flags=re.IGNORECASE)
-    html = re.sub(r'<p[^>]*>', '\n\n', html, flags=re.IGNORECASE)
-    html = re.sub(r'</p>', '', html, flags=re.IGNORECASE)
-    html = re.sub(r'<li[^>]*>', '\n• ', html, flags=re.IGNORECASE)
-    html = re.sub(r'<h[1-6][^>]*>', '\n\n', html, flags=re.IGNORECASE)
-    html = re.sub(r'</h[1-6]>', '\n', html, flags=re.IGNORECASE)
-    
-    # Remove remaining tags
-    html = re.sub(r'<[^>]+>', ' ', html)
-    
-    # Clean up whitespace
-    html = re.sub(r'&nbsp;', ' ', html)
-    html = re.sub(r'&amp;', '&', html)
-    html = re.sub(r'&lt;', '<', html)
-    html = re.sub(r'&gt;', '>', html)
-    html = re.sub(r'&#\d+;', '', html)
-    html = re.sub(r'&\w+;', '', html)
-    
-    # Normalize whitespace
-    lines = []
-    for line in html.split('\n'):
-        line = ' '.join(line.split())
-        if line:
-            lines.append(line)
-    
-    return '\n'.join(lines)
+    converter = HTMLTextConverter()
+    converter.feed(html)
+    converter.close()
+    return converter.text()
 
 
-async def extract_jd_from_url(url: str) -> str:
+@traced("agent.url_resolver")
+async def resolve_job_posting(url: str) -> ResolvedJobPosting:
     """
-    Extract clean job description from a job posting URL.
+    Resolve a job posting URL to clean JD text plus any structured fields.
+    
+    Known ATS platforms (Greenhouse, Lever, Ashby, Workday) are read from
+    their JSON APIs. Other pages with schema.org JobPosting JSON-LD or a
+    full OpenGraph description are parsed directly; only pages without
+    structured data go through the LLM extractor.
     
     Args:
         url: Job posting URL (LinkedIn, Indeed, company site, etc.)
         
     Returns:
-        Clean job description text
+        ResolvedJobPosting with the JD text and, when available,
+        role title, employment type, company and location
         
     Raises:
         ValueError: If extraction fails
     """
-    # Fetch raw content
-    raw_html = await fetch_url_content(url)
+    from agents.ats_adapters import find_ats_adapter
+    from services.http_fetcher import http_fetcher
+    
+    # Fastest path: ATS JSON API, one request
+    if settings.ATS_ADAPTERS_ENABLED:
+        found = find_ats_adapter(url)
+        if found:
+            adapter, ids = found
+            try:
+                posting = await adapter.fetch(ids)
+                if posting.jd_text.strip():
+                    return posting
+            except ValueError as e:
+                logger.warning(f"{adapter.name} adapter failed for {url}, falling back to page fetch: {e}")
     
-    # Basic HTML to text conversion
-    raw_text = basic_html_to_text(raw_html)
+    # Fetch the page, parsing structured data and text as chunks arrive
+    parsers = _PageParsers()
+    page = await http_fetcher.fetch(url, on_chunk=parsers.feed)
     
-    # Limit text length for LLM (take middle portion which usually has JD)
-    if len(raw_text) > 15000:
-        # Take a portion more likely to contain the JD
-        start = len(raw_text) // 4
-        end = start + 12000
-        raw_text = raw_text[start:end]
+    # Same page content was already resolved (possibly for another user)
+    known = await http_fetcher.get_posting(page.content_hash)
+    if known:
+        return known
+    
+    if not page.streamed:
+        parsers.feed(page.text)
+    posting = await _extract_posting(url, parsers)
+    await http_fetcher.save_posting(page.content_hash, posting)
+    return posting
+
+
+class _PageParsers:
+    """Structured-data collector and main-content extractor fed side by side."""
+    
+    def __init__(self):
+        from agents.content_extractor import MainContentExtractor
+        from agents.job_posting_parser import StructuredDataCollector
+        
+        self.collector = StructuredDataCollector()
+        self.converter = MainContentExtractor()
+    
+    def feed(self, chunk: str) -> None:
+        self.collector.feed(chunk)
+        self.converter.feed(chunk)
+    
+    def close(self) -> None:
+        self.collector.close()
+        self.converter.close()
+
+
+async def _extract_posting(url: str, parsers: _PageParsers) -> ResolvedJobPosting:
+    """Structured data → main-content region → LLM cleanup, in that order."""
+    from agents.job_posting_parser import job_posting_from_collector
+    
+    parsers.close()
+    collector, converter = parsers.collector, parsers.converter
+    
+    # Fast path: structured data, no LLM call
+    structured = job_posting_from_collector(collector)
+    if structured:
+        return structured
+    
+    # Main-content region by text/link density and JD vocabulary
+    main = converter.main_content()
+    logger.info(
+        f"Main content for {url}: {main.words}/{main.total_words} words, "
+        f"{main.jd_sections} JD sections, confidence {main.confidence}"
+    )
+    if main.confidence >= settings.CONTENT_EXTRACTION_MIN_CONFIDENCE:
+        return ResolvedJobPosting(jd_text=main.text, source="content")
+    
+    # Otherwise the LLM cleans up the region (or the whole page if no region was found)
+    raw_text = main.text if main.words >= MIN_MAIN_CONTENT_WORDS else converter.text()
+    raw_text = raw_text[:MAX_LLM_INPUT_CHARS]
     
     # Use LLM to extract clean JD
     try:
@@ -128,7 +251,25 @@ async def extract_jd_from_url(url: str) -> str:
             temperature=0.1
         )
         
-        return clean_jd.strip()
+        return ResolvedJobPosting(jd_text=clean_jd.strip(), source="llm")
         
     except Exception as e:
         raise ValueError(f"Failed to extract job description: {e}")
+
+
+@traced("agent.url_resolver")
+async def extract_jd_from_url(url: str) -> str:
+    """
+    Extract clean job description from a job posting URL.
+    
+    Args:
+        url: Job posting URL (LinkedIn, Indeed, company site, etc.)
+        
+    Returns:
+        Clean job description text
+        
+    Raises:
+        ValueError: If extraction fails
+    """
+    posting = await resolve_job_posting(url)
+    return posting.jd_text
@@ -5,6 +5,7 @@ This enables resume bullets to mirror the company's communication style.
 """
 from models.job import CompanyVoiceProfile
 from services.llm import llm_service
+from services.tracing import traced
 
 
 VOICE_EXTRACTION_PROMPT = """You are an expert linguistic analyst specializing in corporate communication styles.
@@ -65,6 +66,7 @@ IMPORTANT:
 Output ONLY valid JSON. No explanations."""
 
 
+@traced("agent.voice_extractor")
 async def extract_voice_profile(company_content: str, company_name: str = "") -> CompanyVoiceProfile:
     """
     Extract company voice profile from content.
@@ -115,6 +117,7 @@ Extract their voice profile as JSON."""
         )
 
 
+@traced("agent.voice_extractor")
 async def extract_voice_from_research(research_results: dict) -> CompanyVoiceProfile:
     """
     Extract voice profile from Tavily deep research results.
@@ -0,0 +1,113 @@
+"""Micro-benchmark: HTML → text conversion in the URL resolver.
+
+Compares the previous multi-pass regex converter with the single-pass
+tokenizer (whole page and chunked feeding).
+
+Run from backend/:
+
+    python -m benchmarks.bench_html_to_text                 # synthetic pages
+    python -m benchmarks.bench_html_to_text saved_page.html  # real pages saved from a browser
+"""
+import argparse
+import re
+import time
+
+from agents.url_resolver import HTMLTextConverter, basic_html_to_text
+
+
+def legacy_html_to_text(html: str) -> str:
+    """The regex converter this benchmark measures against."""
+    html = re.sub(r'<script[^>]*>.*?</script>', '', html, flags=re.DOTALL | re.IGNORECASE)
+    html = re.sub(r'<style[^>]*>.*?</style>', '', html, flags=re.DOTALL | re.IGNORECASE)
+    html = re.sub(r'<noscript[^>]*>.*?</noscript>', '', html, flags=re.DOTALL | re.IGNORECASE)
+    html = re.sub(r'<br\s*/?>', '\n', html, flags=re.IGNORECASE)
+    html = re.sub(r'<p[^>]*>', '\n\n', html, flags=re.IGNORECASE)
+    html = re.sub(r'</p>', '', html, flags=re.IGNORECASE)
+    html = re.sub(r'<li[^>]*>', '\n• ', html, flags=re.IGNORECASE)
+    html = re.sub(r'<h[1-6][^>]*>', '\n\n', html, flags=re.IGNORECASE)
+    html = re.sub(r'</h[1-6]>', '\n', html, flags=re.IGNORECASE)
+    html = re.sub(r'<[^>]+>', ' ', html)
+    html = re.sub(r'&nbsp;', ' ', html)
+    html = re.sub(r'&amp;', '&', html)
+    html = re.sub(r'&lt;', '<', html)
+    html = re.sub(r'&gt;', '>', html)
+    html = re.sub(r'&#\d+;', '', html)
+    html = re.sub(r'&\w+;', '', html)
+    lines = []
+    for line in html.split('\n'):
+        line = ' '.join(line.split())
+        if line:
+            lines.append(line)
+    return '\n'.join(lines)
+
+
+def synthetic_spa_page(target_bytes: int) -> str:
+    """
+    A page shaped like a modern job board SPA: huge inline JS bundles and
+    JSON state, CSS, navigation, then the posting itself.
+    """
+    bundle = "function f(a){return a<b&&c>d?'<p>'+a+'</p>':null};" * 2000
+    state = '{"jobs":[' + ",".join('{"id":%d,"title":"Engineer &amp; more"}' % i for i in range(2000)) + "]}"
+    css = ".c{color:#333;margin:0 auto}" * 2000
+    nav = "<nav><ul>" + "".join(f'<li><a href="/p{i}">Link {i}</a></li>' for i in range(200)) + "</ul></nav>"
+    posting = (
+        "<main><h1>Senior Backend Engineer</h1><p>We&rsquo;re hiring &mdash; join us.</p>"
+        "<h2>Requirements</h2><ul>"
+        + "".join(f"<li>Requirement {i} with <b>Python</b> &amp; <i>FastAPI</i></li>" for i in range(40))
+        + "</ul></main>"
+    )
+    footer = "<footer>" + "<p>Legal &copy; text</p>" * 200 + "</footer>"
+
+    chunks = ["<!doctype html><html><head><style>", css, "</style></head><body>", nav]
+    size = sum(len(c) for c in chunks)
+    while size < target_bytes:
+        block = f"<script>{bundle}</script><script type=\"application/json\">{state}</script>"
+        chunks.append(block)
+        size += len(block)
+    chunks += [posting, "<noscript>Enable JS</noscript>", footer, "</body></html>"]
+    return "".join(chunks)
+
+
+def chunked_convert(html: str, chunk_size: int = 64 * 1024) -> str:
+    converter = HTMLTextConverter()
+    for start in range(0, len(html), chunk_size):
+        converter.feed(html[start:start + chunk_size])
+    converter.close()
+    return converter.text()
+
+
+def bench(name: str, fn, html: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(html)
+        best = min(best, time.perf_counter() - start)
+    print(f"  {name:<22} {best * 1000:9.1f} ms")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pages", nargs="*", help="Saved HTML pages to benchmark")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pages = []
+    for path in args.pages:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            pages.append((path, f.read()))
+    if not pages:
+        for size_mb in (1, 4, 8):
+            pages.append((f"synthetic SPA {size_mb} MB", synthetic_spa_page(size_mb * 1024 * 1024)))
+
+    for name, html in pages:
+        print(f"{name} ({len(html) / 1024 / 1024:.1f} MB)")
+        legacy = bench("legacy regex", legacy_html_to_text, html, args.repeat)
+        single = bench("single pass", basic_html_to_text, html, args.repeat)
+        bench("single pass, chunked", chunked_convert, html, args.repeat)
+        print(f"  speedup                {legacy / single:9.1f}x")
+        print(f"  output chars           legacy={len(legacy_html_to_text(html))} single={len(basic_html_to_text(html))}")
+
+
+if __name__ == "__main__":
+    main()
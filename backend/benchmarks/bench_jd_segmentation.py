@@ -0,0 +1,97 @@
+"""Benchmark: JD segmentation before the analysis LLM call.
+
+Reports, per posting, the estimated input tokens of the full JD versus
+the relevant sections actually sent (and the map-reduce chunk count), plus
+the segmentation time. With --live, also runs the analysis both ways
+against the configured LLM provider and reports provider token usage and
+latency.
+
+Run from backend/:
+
+    python -m benchmarks.bench_jd_segmentation                  # synthetic posting
+    python -m benchmarks.bench_jd_segmentation jd1.txt jd2.txt  # saved postings
+    python -m benchmarks.bench_jd_segmentation jd1.txt --live   # needs LLM API keys
+"""
+import argparse
+import asyncio
+import time
+
+from config import settings
+from agents.jd_segmenter import SegmentedJD
+from services.llm import estimate_tokens, meter_tokens
+
+
+def synthetic_posting() -> str:
+    """A long posting shaped like a large company's careers page."""
+    return "\n".join([
+        "Senior Data Engineer",
+        "Acme Analytics · Berlin, Germany · Full-time",
+        "About Us",
+        "Acme Analytics builds the data platform behind retail forecasting for thousands of stores. "
+        "Founded in 2012, we are a team of 400 people across five offices who care deeply about craft. " * 4,
+        "What You'll Do",
+        *[f"• Design and operate batch and streaming pipeline {i} on Spark, Kafka and Airflow" for i in range(12)],
+        "Requirements",
+        *[f"• {i + 3}+ years of experience with Python, SQL and distributed data systems area {i}" for i in range(10)],
+        "Nice to Have",
+        *[f"• Experience with dbt, Snowflake or BigQuery use case {i}" for i in range(6)],
+        "Benefits",
+        *[f"• Benefit {i}: generous budget, flexible hours, wellness stipend and team offsites" for i in range(15)],
+        "Equal Opportunity Employer",
+        "Acme is an equal opportunity employer. We celebrate diversity and do not discriminate "
+        "based on race, religion, color, national origin, gender, sexual orientation, age, marital status, "
+        "veteran status, or disability status. " * 5,
+        "Applicant Privacy Notice",
+        "By applying you consent to the processing of your personal data as described in our privacy notice. " * 6,
+    ])
+
+
+async def analyze_live(jd_text: str, segmentation: bool) -> tuple[float, int, int]:
+    from agents.jd_analyzer import _analyze_uncached
+
+    settings.JD_SEGMENTATION_ENABLED = segmentation
+    started = time.perf_counter()
+    with meter_tokens() as meter:
+        await _analyze_uncached(jd_text)
+    return time.perf_counter() - started, meter.prompt_tokens, meter.completion_tokens
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("postings", nargs="*", help="Saved JD text files")
+    parser.add_argument("--live", action="store_true", help="Call the LLM both ways and compare")
+    args = parser.parse_args()
+
+    postings = []
+    for path in args.postings:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            postings.append((path, f.read()))
+    if not postings:
+        postings.append(("synthetic posting", synthetic_posting()))
+
+    for name, jd_text in postings:
+        started = time.perf_counter()
+        segmented = SegmentedJD(jd_text)
+        relevant = segmented.relevant_text()
+        chunks = (
+            segmented.chunks(settings.JD_CHUNK_MAX_TOKENS)
+            if estimate_tokens(relevant) > settings.JD_MAP_REDUCE_MIN_TOKENS else [relevant]
+        )
+        elapsed = time.perf_counter() - started
+
+        before, after = estimate_tokens(jd_text), sum(estimate_tokens(c) for c in chunks)
+        print(name)
+        print(f"  sections               {', '.join(s.kind for s in segmented.segments)}")
+        print(f"  dropped                {', '.join(segmented.dropped_kinds) or 'none'}")
+        print(f"  est. input tokens      {before} -> {after} ({(1 - after / before) * 100:.0f}% fewer)")
+        print(f"  analysis calls         {len(chunks)}")
+        print(f"  segmentation time      {elapsed * 1000:.2f} ms")
+
+        if args.live:
+            for label, enabled in (("full text", False), ("segmented", True)):
+                seconds, prompt, completion = asyncio.run(analyze_live(jd_text, enabled))
+                print(f"  live {label:<17} {seconds * 1000:7.0f} ms, {prompt} prompt + {completion} completion tokens")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Micro-benchmark: JSON in and out of the API.
+
+Compares the ways a route can turn its response model into body bytes:
+
+- jsonable_encoder + json.dumps: FastAPI's JSONResponse path (custom
+  response classes, plain dicts)
+- validate + orjson: ORJSONResponse as the response class
+- validate + dump_json: FastAPI's path for a response_model route with the
+  default response class
+- model_dump_json: serializing without the response_model validation
+
+then request body parsing (json vs orjson, as in ORJSONRoute), NDJSON
+stream events, and the sizes the compression middleware would send.
+
+Run from backend/:
+
+    python -m benchmarks.bench_serialization                 # synthetic responses
+    python -m benchmarks.bench_serialization --experience 30 # larger CV
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import time
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.routing import APIRoute, serialize_response
+
+from models.cv import MasterCV, Experience, Education
+from models.job import JobAnalysis, CompanyIntelligence, SourceLink
+from models.tailoring import TailoredResume
+from models.writing import CoverLetter, ColdEmail, CompanySummary, WritingPackage
+from models.pipeline import FullProcessResponse
+from middleware.json_io import ndjson_line
+
+try:
+    import brotli
+except ImportError:  # Optional dependency
+    brotli = None
+
+
+def synthetic_response(experience: int) -> FullProcessResponse:
+    """A /api/process/all response for a long CV and a detailed posting."""
+    paragraph = "Led the migration of the billing platform to event sourcing, cutting reconciliation time by 40%. " * 3
+    cv = MasterCV(
+        name="Jane Doe",
+        email="jane@example.com",
+        phone="+1 555 0100",
+        location="Berlin, Germany",
+        summary=paragraph,
+        experience=[
+            Experience(
+                company=f"Company {i}",
+                role="Senior Software Engineer",
+                start_date="2018-01",
+                end_date="2021-06",
+                bullets=[f"Bullet {j}: {paragraph}" for j in range(6)]
+            )
+            for i in range(experience)
+        ],
+        skills=[f"Skill {i}" for i in range(60)],
+        education=[Education(institution="TU Berlin", degree="MSc Computer Science", start_date="2012", end_date="2014")]
+    )
+    job = JobAnalysis(
+        role_title="Staff Engineer",
+        must_have_skills=[f"Must {i}" for i in range(20)],
+        nice_to_have_skills=[f"Nice {i}" for i in range(15)],
+        responsibilities=[f"Responsibility {i}: {paragraph}" for i in range(12)],
+        keywords_for_ats=[f"keyword {i}" for i in range(40)]
+    )
+    company = CompanyIntelligence(
+        company_name="Acme",
+        mission=paragraph,
+        sources=[SourceLink(title=f"Source {i}", url=f"https://example.com/{i}", fact=paragraph) for i in range(10)],
+        culture_highlights=[f"Highlight {i}" for i in range(10)]
+    )
+    resume = TailoredResume(
+        resume_markdown="\n".join(f"- {paragraph}" for _ in range(40)),
+        matched_skills=[f"Skill {i}" for i in range(30)],
+        keywords_used=[f"keyword {i}" for i in range(30)]
+    )
+    writing = WritingPackage(
+        cover_letter=CoverLetter(content=paragraph * 8, word_count=400),
+        cold_email=ColdEmail(content=paragraph * 2, word_count=120),
+        company_summary=CompanySummary(content=paragraph * 2, word_count=100)
+    )
+    return FullProcessResponse(
+        master_cv=cv, job_analysis=job, company_intel=company,
+        tailored_resume=resume, writing=writing, warnings=["warning"] * 5
+    )
+
+
+async def bench(name: str, fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        if asyncio.iscoroutine(result):
+            await result
+        best = min(best, time.perf_counter() - start)
+    print(f"  {name:<32} {best * 1e6:9.1f} us")
+    return best
+
+
+async def _endpoint() -> FullProcessResponse: ...
+
+
+async def run(args):
+    response = synthetic_response(args.experience)
+    field = APIRoute("/bench", _endpoint, response_model=FullProcessResponse).response_field
+    body = response.model_dump_json().encode()
+    print(f"FullProcessResponse ({len(body) / 1024:.0f} KB)")
+
+    def separators_json():
+        return json.dumps(jsonable_encoder(response), ensure_ascii=False, separators=(",", ":")).encode()
+
+    async def validate_orjson():
+        return orjson.dumps(await serialize_response(field=field, response_content=response))
+
+    legacy = await bench("jsonable_encoder + json.dumps", separators_json, args.repeat)
+    await bench("validate + orjson", validate_orjson, args.repeat)
+    await bench("validate + dump_json", lambda: serialize_response(field=field, response_content=response, dump_json=True), args.repeat)
+    direct = await bench("model_dump_json", lambda: response.model_dump_json().encode(), args.repeat)
+    print(f"  speedup vs json.dumps            {legacy / direct:9.1f}x")
+
+    print("Request body parsing")
+    await bench("json.loads", lambda: json.loads(body), args.repeat)
+    await bench("orjson.loads", lambda: orjson.loads(body), args.repeat)
+
+    print("NDJSON event")
+    event = {"type": "job", **response.model_dump(mode="json")}
+    await bench("json.dumps", lambda: (json.dumps(event) + "\n").encode(), args.repeat)
+    await bench("ndjson_line", lambda: ndjson_line(event), args.repeat)
+
+    print("Compressed size")
+    for level in (1, 6):
+        started = time.perf_counter()
+        size = len(gzip.compress(body, compresslevel=level))
+        print(f"  gzip -{level:<25} {size / 1024:9.1f} KB in {(time.perf_counter() - started) * 1000:.2f} ms")
+    if brotli is not None:
+        for quality in (4, 11):
+            started = time.perf_counter()
+            size = len(brotli.compress(body, quality=quality))
+            print(f"  brotli q{quality:<24} {size / 1024:9.1f} KB in {(time.perf_counter() - started) * 1000:.2f} ms")
+    else:
+        print("  brotli                           not installed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--experience", type=int, default=10, help="Experience entries in the synthetic CV")
+    parser.add_argument("--repeat", type=int, default=200)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
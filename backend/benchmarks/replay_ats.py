@@ -0,0 +1,208 @@
+"""Replay recorded ATS API responses against the ATS adapters.
+
+Serves the Greenhouse, Lever, Ashby and Workday responses in
+benchmarks/fixtures/ats/ from a local stand-in server, points the adapter
+base URLs at it and resolves one posting URL per platform, checking the
+fields each adapter extracts.
+
+Run from backend/:
+
+    python -m benchmarks.replay_ats                      # replay and check every adapter
+    python -m benchmarks.replay_ats --serve --port 8081  # keep serving for a local app
+
+With --serve, set GREENHOUSE_API_BASE_URL, LEVER_API_BASE_URL,
+ASHBY_API_BASE_URL and WORKDAY_API_BASE_URL to http://localhost:8081 and
+submit the posting URLs printed at startup.
+"""
+import argparse
+import asyncio
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from agents.ats_adapters import find_ats_adapter
+from config import settings
+
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "ats"
+
+
+@dataclass
+class ReplayCase:
+    """A posting URL, the API path its adapter requests, and the fields it should yield."""
+
+    posting_url: str
+    api_path: str
+    fixture: str
+    expected: dict
+    jd_contains: list[str] = field(default_factory=list)
+
+
+CASES = [
+    ReplayCase(
+        posting_url="https://boards.greenhouse.io/acmeanalytics/jobs/4012345",
+        api_path="/v1/boards/acmeanalytics/jobs/4012345",
+        fixture="greenhouse_job.json",
+        expected={
+            "source": "ats:greenhouse",
+            "role_title": "Senior Data Engineer",
+            "company_name": "Acme Analytics",
+            "location": "Berlin, Germany",
+        },
+        jd_contains=["What you'll bring", "• 5+ years building data pipelines in Python and SQL"],
+    ),
+    ReplayCase(
+        posting_url="https://jobs.lever.co/acmeanalytics/5f0e3c2a-8d4b-4b6e-9a61-2c7d9e1f4a3b",
+        api_path="/v0/postings/acmeanalytics/5f0e3c2a-8d4b-4b6e-9a61-2c7d9e1f4a3b",
+        fixture="lever_posting.json",
+        expected={
+            "source": "ats:lever",
+            "role_title": "Backend Engineer",
+            "location": "London, United Kingdom",
+            "employment_type": "Full-time",
+        },
+        jd_contains=["What we're looking for", "• 3+ years of backend development in Go or Python"],
+    ),
+    ReplayCase(
+        posting_url="https://jobs.ashbyhq.com/acmeanalytics/7c1d9e2f-5a4b-4c3d-9e8f-1a2b3c4d5e6f",
+        api_path="/posting-api/job-board/acmeanalytics",
+        fixture="ashby_job_board.json",
+        expected={
+            "source": "ats:ashby",
+            "role_title": "Senior Frontend Engineer",
+            "location": "Remote",
+            "employment_type": "Full-time",
+        },
+        jd_contains=["4+ years with TypeScript and React"],
+    ),
+    ReplayCase(
+        posting_url="https://acme.wd3.myworkdayjobs.com/en-US/External/job/Munich-Germany/Data-Analyst_R-2210",
+        api_path="/wday/cxs/acme/External/job/Munich-Germany/Data-Analyst_R-2210",
+        fixture="workday_job.json",
+        expected={
+            "source": "ats:workday",
+            "role_title": "Data Analyst",
+            "company_name": "Acme Analytics GmbH",
+            "location": "Munich, Germany",
+            "employment_type": "Full time",
+        },
+        jd_contains=["• 2+ years of SQL and Tableau or Power BI"],
+    ),
+]
+
+
+def make_handler(routes: dict[str, bytes]) -> type[BaseHTTPRequestHandler]:
+    """Request handler serving each recorded body at its API path."""
+
+    class ReplayHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = routes.get(self.path.split("?", 1)[0])
+            if body is None:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ReplayHandler
+
+
+def start_server(port: int) -> ThreadingHTTPServer:
+    """Start the stand-in server on a background thread (port 0 picks a free one)."""
+    routes = {case.api_path: (FIXTURES_DIR / case.fixture).read_bytes() for case in CASES}
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(routes))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def check(case: ReplayCase, posting) -> list[str]:
+    """Mismatches between the resolved posting and the case's expectations."""
+    problems = []
+    for name, want in case.expected.items():
+        got = getattr(posting, name)
+        if got != want:
+            problems.append(f"{name}: expected {want!r}, got {got!r}")
+    for snippet in case.jd_contains:
+        if snippet not in posting.jd_text:
+            problems.append(f"jd_text is missing {snippet!r}")
+    return problems
+
+
+async def replay(base_url: str) -> int:
+    """Resolve every case through its adapter; return the number of failures."""
+    from services.http_fetcher import http_fetcher
+
+    settings.GREENHOUSE_API_BASE_URL = base_url
+    settings.LEVER_API_BASE_URL = base_url
+    settings.ASHBY_API_BASE_URL = base_url
+    settings.WORKDAY_API_BASE_URL = base_url
+
+    failures = 0
+    print(f"{'adapter':<12} {'ms':>7} {'jd chars':>9}  result")
+    try:
+        for case in CASES:
+            found = find_ats_adapter(case.posting_url)
+            if not found:
+                failures += 1
+                print(f"{'-':<12} {'':>7} {'':>9}  FAIL no adapter matches {case.posting_url}")
+                continue
+            adapter, ids = found
+
+            start = time.perf_counter()
+            try:
+                posting = await adapter.fetch(ids)
+                problems = check(case, posting)
+            except ValueError as e:
+                posting, problems = None, [str(e)]
+            ms = (time.perf_counter() - start) * 1000
+
+            chars = len(posting.jd_text) if posting else 0
+            if problems:
+                failures += 1
+            print(f"{adapter.name:<12} {ms:>7.1f} {chars:>9}  {'FAIL' if problems else 'ok'}")
+            for problem in problems:
+                print(f"{'':<31}{problem}")
+    finally:
+        await http_fetcher.aclose()
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=0, help="Server port (default: any free port)")
+    parser.add_argument("--serve", action="store_true", help="Keep serving the fixtures instead of replaying them")
+    args = parser.parse_args()
+
+    server = start_server(args.port)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    if args.serve:
+        print(f"Serving recorded ATS responses on {base_url}; posting URLs:")
+        for case in CASES:
+            print(f"  {case.posting_url}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.shutdown()
+        return
+
+    try:
+        failures = asyncio.run(replay(base_url))
+    finally:
+        server.shutdown()
+    print(f"\n{len(CASES) - failures}/{len(CASES)} adapters match the recorded responses")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
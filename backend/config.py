@@ -1,4 +1,5 @@
 """Configuration settings for the Jobs backend."""
+import json
 import os
 from dotenv import load_dotenv
 
@@ -18,6 +19,20 @@ class Settings:
     OPENROUTER_BASE_URL: str = "https://openrouter.ai/api/v1"
     OPENROUTER_MODEL: str = os.getenv("OPENROUTER_MODEL", "meta-llama/llama-3.3-70b-instruct")
     
+    # LLM Usage Accounting
+    # JSON object: model -> [USD per million prompt tokens, USD per million completion tokens]
+    LLM_PRICING: dict[str, list[float]] = json.loads(os.getenv("LLM_PRICING", "{}") or "{}")
+    USAGE_BACKEND: str = os.getenv("USAGE_BACKEND", "sqlite")  # sqlite | supabase | none
+    USAGE_SQLITE_PATH: str = os.getenv("USAGE_SQLITE_PATH", "data/llm_usage.db")
+    USAGE_FLUSH_BATCH_SIZE: int = int(os.getenv("USAGE_FLUSH_BATCH_SIZE", "50"))
+    USAGE_FLUSH_INTERVAL_SECONDS: float = float(os.getenv("USAGE_FLUSH_INTERVAL_SECONDS", "10"))
+    USAGE_MAX_PENDING: int = int(os.getenv("USAGE_MAX_PENDING", "5000"))  # Oldest dropped past this
+    # X-Request-ID and X-LLM-* per-request usage response headers
+    LLM_USAGE_HEADERS: bool = os.getenv("LLM_USAGE_HEADERS", "false").lower() == "true"
+    # Required in the X-Admin-Token header by GET /api/usage/report and
+    # /api/analyze/speculation/stats; unset disables both
+    USAGE_REPORT_TOKEN: str = os.getenv("USAGE_REPORT_TOKEN", "")
+    
     # Supabase Configuration
     SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
     SUPABASE_SERVICE_KEY: str = os.getenv("SUPABASE_SERVICE_KEY", "")
@@ -28,9 +43,135 @@ class Settings:
     # Application Configuration
     DEBUG: bool = os.getenv("DEBUG", "false").lower() == "true"
     CORS_ORIGINS: list[str] = os.getenv("CORS_ORIGINS", "http://localhost:3000").split(",")
+    # gzip (or brotli, if installed) for JSON responses at least this large
+    COMPRESSION_ENABLED: bool = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+    COMPRESSION_MIN_BYTES: int = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+    # Per-stage timings in a Server-Timing response header; aggregates at GET /metrics
+    SERVER_TIMING_ENABLED: bool = os.getenv("SERVER_TIMING_ENABLED", "true").lower() == "true"
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
     
     # File Upload Configuration
-    MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10 MB
+    MAX_FILE_SIZE: int = int(os.getenv("MAX_FILE_SIZE", str(10 * 1024 * 1024)))  # Per file
+    # Whole multipart body; rejected before the form is parsed
+    MAX_UPLOAD_BODY_SIZE: int = int(os.getenv("MAX_UPLOAD_BODY_SIZE", str(MAX_FILE_SIZE + 1024 * 1024)))
+    RECRUITER_MAX_UPLOAD_BODY_SIZE: int = int(os.getenv("RECRUITER_MAX_UPLOAD_BODY_SIZE", str(200 * 1024 * 1024)))
+    # Larger uploads are spooled to a temporary file and memory-mapped
+    UPLOAD_SPOOL_MAX_MEMORY: int = int(os.getenv("UPLOAD_SPOOL_MAX_MEMORY", str(1024 * 1024)))
+    
+    # PDF extraction guards; long documents are split across worker processes
+    PDF_MAX_PAGES: int = int(os.getenv("PDF_MAX_PAGES", "30"))
+    PDF_PARALLEL_MIN_PAGES: int = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "8"))
+    PDF_EXTRACT_WORKERS: int = int(os.getenv("PDF_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+    
+    # Shared job page fetcher (services/http_fetcher.py)
+    FETCH_TIMEOUT_SECONDS: float = float(os.getenv("FETCH_TIMEOUT_SECONDS", "30"))
+    FETCH_MAX_BYTES: int = int(os.getenv("FETCH_MAX_BYTES", str(5 * 1024 * 1024)))
+    FETCH_MAX_CONNECTIONS: int = int(os.getenv("FETCH_MAX_CONNECTIONS", "50"))
+    FETCH_PER_HOST_CONCURRENCY: int = int(os.getenv("FETCH_PER_HOST_CONCURRENCY", "4"))
+    FETCH_CACHE_ENABLED: bool = os.getenv("FETCH_CACHE_ENABLED", "true").lower() == "true"
+    FETCH_CACHE_SQLITE_PATH: str = os.getenv("FETCH_CACHE_SQLITE_PATH", "data/http_cache.db")
+    FETCH_CACHE_DEFAULT_MAX_AGE_SECONDS: int = int(os.getenv("FETCH_CACHE_DEFAULT_MAX_AGE_SECONDS", "900"))
+    FETCH_CACHE_TTL_SECONDS: int = int(os.getenv("FETCH_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    
+    # ATS Adapters (job URLs resolved via the platform's JSON API)
+    # Override the base URLs to point adapters at a local stand-in server.
+    ATS_ADAPTERS_ENABLED: bool = os.getenv("ATS_ADAPTERS_ENABLED", "true").lower() == "true"
+    GREENHOUSE_API_BASE_URL: str = os.getenv("GREENHOUSE_API_BASE_URL", "https://boards-api.greenhouse.io")
+    LEVER_API_BASE_URL: str = os.getenv("LEVER_API_BASE_URL", "https://api.lever.co")
+    ASHBY_API_BASE_URL: str = os.getenv("ASHBY_API_BASE_URL", "https://api.ashbyhq.com")
+    WORKDAY_API_BASE_URL: str = os.getenv("WORKDAY_API_BASE_URL", "")  # Empty = the tenant's own host
+    
+    # Main-content extraction: at or above this confidence the selected
+    # region is used as the JD without the LLM cleanup call
+    CONTENT_EXTRACTION_MIN_CONFIDENCE: float = float(os.getenv("CONTENT_EXTRACTION_MIN_CONFIDENCE", "0.8"))
+    
+    # Bullet Rewrite Cache Configuration
+    BULLET_CACHE_MAX_ENTRIES: int = int(os.getenv("BULLET_CACHE_MAX_ENTRIES", "20000"))
+    BULLET_CACHE_TTL_SECONDS: int = int(os.getenv("BULLET_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    
+    # JD Analysis Cache (shared across users, with near-duplicate matching)
+    JD_CACHE_ENABLED: bool = os.getenv("JD_CACHE_ENABLED", "true").lower() == "true"
+    JD_CACHE_MAX_ENTRIES: int = int(os.getenv("JD_CACHE_MAX_ENTRIES", "5000"))
+    JD_CACHE_TTL_SECONDS: int = int(os.getenv("JD_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    # Minimum estimated Jaccard similarity (word 3-gram shingles) to reuse an analysis
+    JD_CACHE_SIMILARITY_THRESHOLD: float = float(os.getenv("JD_CACHE_SIMILARITY_THRESHOLD", "0.9"))
+    
+    # JD segmentation: only relevant sections are analyzed; long ones map-reduce
+    JD_SEGMENTATION_ENABLED: bool = os.getenv("JD_SEGMENTATION_ENABLED", "true").lower() == "true"
+    JD_MAP_REDUCE_MIN_TOKENS: int = int(os.getenv("JD_MAP_REDUCE_MIN_TOKENS", "2000"))
+    JD_CHUNK_MAX_TOKENS: int = int(os.getenv("JD_CHUNK_MAX_TOKENS", "1200"))
+    
+    # Rule-based CV pre-structuring: sections below this confidence go to the LLM
+    CV_PRESTRUCTURE_ENABLED: bool = os.getenv("CV_PRESTRUCTURE_ENABLED", "true").lower() == "true"
+    CV_PRESTRUCTURE_MIN_CONFIDENCE: float = float(os.getenv("CV_PRESTRUCTURE_MIN_CONFIDENCE", "0.8"))
+    
+    # Chunked CV structuring for long CVs (token counts are estimates)
+    CV_CHUNKED_ENABLED: bool = os.getenv("CV_CHUNKED_ENABLED", "true").lower() == "true"
+    CV_CHUNKED_MIN_TOKENS: int = int(os.getenv("CV_CHUNKED_MIN_TOKENS", "2500"))
+    CV_CHUNK_MAX_TOKENS: int = int(os.getenv("CV_CHUNK_MAX_TOKENS", "1200"))
+    CV_CHUNK_CONCURRENCY: int = int(os.getenv("CV_CHUNK_CONCURRENCY", "4"))
+    
+    # PDF cache: extracted text and structured CVs by file content hash.
+    # The SQLite tier is shared by all workers on the machine.
+    PDF_CACHE_ENABLED: bool = os.getenv("PDF_CACHE_ENABLED", "true").lower() == "true"
+    PDF_CACHE_MEMORY_ENTRIES: int = int(os.getenv("PDF_CACHE_MEMORY_ENTRIES", "2000"))
+    PDF_CACHE_TTL_SECONDS: int = int(os.getenv("PDF_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    PDF_CACHE_DISK_ENABLED: bool = os.getenv("PDF_CACHE_DISK_ENABLED", "true").lower() == "true"
+    PDF_CACHE_SQLITE_PATH: str = os.getenv("PDF_CACHE_SQLITE_PATH", "data/pdf_cache.db")
+    PDF_CACHE_DISK_MAX_ENTRIES: int = int(os.getenv("PDF_CACHE_DISK_MAX_ENTRIES", "50000"))
+    
+    # Per-user CV structuring state (re-uploads only re-structure changed sections)
+    CV_STATE_ENABLED: bool = os.getenv("CV_STATE_ENABLED", "true").lower() == "true"
+    CV_STATE_MAX_ENTRIES: int = int(os.getenv("CV_STATE_MAX_ENTRIES", "5000"))
+    CV_STATE_TTL_SECONDS: int = int(os.getenv("CV_STATE_TTL_SECONDS", str(7 * 24 * 3600)))
+    
+    # Generated resumes are measured in the PDF export layout and the
+    # lowest-value bullets dropped until they fit this many pages
+    RESUME_PAGE_FIT_ENABLED: bool = os.getenv("RESUME_PAGE_FIT_ENABLED", "true").lower() == "true"
+    RESUME_MAX_PAGES: int = int(os.getenv("RESUME_MAX_PAGES", "1"))
+    
+    # Resume export (PDF/DOCX rendered in worker processes, cached per resume + options)
+    EXPORT_RENDER_WORKERS: int = int(os.getenv("EXPORT_RENDER_WORKERS", "2"))
+    EXPORT_CACHE_MAX_ENTRIES: int = int(os.getenv("EXPORT_CACHE_MAX_ENTRIES", "500"))
+    EXPORT_CACHE_TTL_SECONDS: int = int(os.getenv("EXPORT_CACHE_TTL_SECONDS", str(24 * 3600)))
+    
+    # Incremental Tailoring Configuration
+    TAILORING_STATE_MAX_ENTRIES: int = int(os.getenv("TAILORING_STATE_MAX_ENTRIES", "2000"))
+    TAILORING_STATE_TTL_SECONDS: int = int(os.getenv("TAILORING_STATE_TTL_SECONDS", "3600"))
+    
+    # Analysis Session Store Configuration
+    SESSION_BACKEND: str = os.getenv("SESSION_BACKEND", "memory")  # memory | sqlite | supabase
+    SESSION_TTL_SECONDS: int = int(os.getenv("SESSION_TTL_SECONDS", "3600"))
+    SESSION_MAX_ENTRIES: int = int(os.getenv("SESSION_MAX_ENTRIES", "1000"))
+    SESSION_MAX_BYTES: int = int(os.getenv("SESSION_MAX_BYTES", str(2 * 1024 * 1024)))  # Per session
+    SESSION_MEMORY_MAX_BYTES: int = int(os.getenv("SESSION_MEMORY_MAX_BYTES", str(256 * 1024 * 1024)))
+    SESSION_SQLITE_PATH: str = os.getenv("SESSION_SQLITE_PATH", "data/sessions.db")
+    
+    # Speculative Step 2 Precomputation
+    SPECULATION_ENABLED: bool = os.getenv("SPECULATION_ENABLED", "true").lower() == "true"
+    SPECULATION_TTL_SECONDS: int = int(os.getenv("SPECULATION_TTL_SECONDS", "900"))
+    SPECULATION_MAX_RUNS: int = int(os.getenv("SPECULATION_MAX_RUNS", "200"))
+    SPECULATION_MAX_CONCURRENT: int = int(os.getenv("SPECULATION_MAX_CONCURRENT", "8"))
+    
+    # Background Job Queue Configuration
+    JOB_QUEUE_BACKEND: str = os.getenv("JOB_QUEUE_BACKEND", "sqlite")
+    JOB_QUEUE_SQLITE_PATH: str = os.getenv("JOB_QUEUE_SQLITE_PATH", "data/jobs.db")
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "2"))  # In-process workers; 0 = external only
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    JOB_VISIBILITY_TIMEOUT_SECONDS: float = float(os.getenv("JOB_VISIBILITY_TIMEOUT_SECONDS", "300"))
+    JOB_RETRY_BACKOFF_SECONDS: float = float(os.getenv("JOB_RETRY_BACKOFF_SECONDS", "10"))
+    JOB_RESULT_TTL_SECONDS: float = float(os.getenv("JOB_RESULT_TTL_SECONDS", str(24 * 3600)))
+    JOB_POLL_INTERVAL_SECONDS: float = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "1.0"))
+
+    # Batch tailoring (/api/process/batch)
+    BATCH_MAX_JOBS: int = int(os.getenv("BATCH_MAX_JOBS", "25"))
+    BATCH_MAX_CONCURRENCY: int = int(os.getenv("BATCH_MAX_CONCURRENCY", "4"))
+
+    # Recruiter mode (/api/recruiter/rank)
+    RECRUITER_MAX_CVS: int = int(os.getenv("RECRUITER_MAX_CVS", "500"))
+    RECRUITER_TOP_K: int = int(os.getenv("RECRUITER_TOP_K", "10"))
+    RECRUITER_INGEST_CONCURRENCY: int = int(os.getenv("RECRUITER_INGEST_CONCURRENCY", "8"))
+    RECRUITER_MATCH_CONCURRENCY: int = int(os.getenv("RECRUITER_MATCH_CONCURRENCY", "4"))
 
 
 settings = Settings()
@@ -0,0 +1,61 @@
+-- ============================================
+-- LLM USAGE MIGRATION
+-- Run this in Supabase SQL Editor when USAGE_BACKEND=supabase
+-- ============================================
+
+-- One row per LLM provider call, written in batches by services/usage.py
+CREATE TABLE IF NOT EXISTS llm_usage (
+    id BIGSERIAL PRIMARY KEY,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    request_id TEXT,
+    route TEXT,
+    user_id TEXT,  -- NULL for anonymous requests (and jobs they submitted)
+    agent TEXT,
+    provider TEXT NOT NULL,
+    model TEXT NOT NULL,
+    prompt_tokens INTEGER NOT NULL DEFAULT 0,
+    completion_tokens INTEGER NOT NULL DEFAULT 0,
+    latency_ms REAL NOT NULL DEFAULT 0,
+    cost_usd NUMERIC(12, 6) NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'ok'
+);
+
+CREATE INDEX IF NOT EXISTS idx_llm_usage_created ON llm_usage(created_at);
+CREATE INDEX IF NOT EXISTS idx_llm_usage_user ON llm_usage(user_id, created_at);
+
+-- Only the backend (service key) reads and writes usage
+ALTER TABLE llm_usage ENABLE ROW LEVEL SECURITY;
+
+-- Totals since a point in time, grouped by every report dimension;
+-- the backend collapses them to the requested dimension
+CREATE OR REPLACE FUNCTION llm_usage_totals(p_since TIMESTAMPTZ)
+RETURNS TABLE (
+    agent TEXT,
+    user_id TEXT,
+    provider TEXT,
+    model TEXT,
+    route TEXT,
+    calls BIGINT,
+    prompt_tokens BIGINT,
+    completion_tokens BIGINT,
+    latency_ms DOUBLE PRECISION,
+    cost_usd NUMERIC,
+    errors BIGINT
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        u.agent, u.user_id, u.provider, u.model, u.route,
+        COUNT(*),
+        SUM(u.prompt_tokens)::BIGINT,
+        SUM(u.completion_tokens)::BIGINT,
+        SUM(u.latency_ms)::DOUBLE PRECISION,
+        SUM(u.cost_usd),
+        COUNT(*) FILTER (WHERE u.status <> 'ok')
+    FROM llm_usage u
+    WHERE u.created_at >= p_since
+    GROUP BY u.agent, u.user_id, u.provider, u.model, u.route;
+END;
+$$;
@@ -0,0 +1,28 @@
+-- ============================================================
+-- ANALYSIS SESSIONS MIGRATION
+-- Run this in Supabase SQL Editor when SESSION_BACKEND=supabase
+-- ============================================================
+
+-- Step 1 results kept server-side for step 2
+CREATE TABLE IF NOT EXISTS analysis_sessions (
+  id TEXT PRIMARY KEY,
+  payload JSONB NOT NULL,
+  expires_at TIMESTAMPTZ NOT NULL,
+  created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Index for expiry lookups and cleanup
+CREATE INDEX IF NOT EXISTS idx_analysis_sessions_expires ON analysis_sessions(expires_at);
+
+-- Only the backend (service key) reads or writes sessions
+ALTER TABLE analysis_sessions ENABLE ROW LEVEL SECURITY;
+
+-- ============================================================
+-- CLEANUP: Delete expired sessions (schedule with pg_cron if available)
+-- ============================================================
+CREATE OR REPLACE FUNCTION public.delete_expired_analysis_sessions()
+RETURNS void AS $$
+BEGIN
+  DELETE FROM analysis_sessions WHERE expires_at <= NOW();
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
@@ -6,10 +6,16 @@ Phase 3: CV Matching & Tailoring
 Phase 4: Writing Layer
 Phase 5: MVP UI + End-to-End Wiring
 """
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from config import settings
+from middleware.uploads import UploadBodyLimitMiddleware
+from middleware.compression import CompressionMiddleware
+from middleware.timing import TimingMiddleware
+from middleware.usage import UsageMiddleware
 from routes.cv import router as cv_router
 from routes.job import router as job_router
 from routes.tailor import router as tailor_router
@@ -17,17 +23,62 @@ from routes.write import router as write_router
 from routes.process import router as process_router
 from routes.analyze import router as analyze_router
 from routes.webhooks import router as webhooks_router
+from routes.pipeline_jobs import router as pipeline_jobs_router
+from routes.recruiter import router as recruiter_router
+from routes.export import router as export_router
+from routes.metrics import router as metrics_router
+from routes.usage import router as usage_router
 from routers.credits import router as credits_router
+from services.job_queue import job_queue
+from services.job_worker import JobWorkerPool
+from services.http_fetcher import http_fetcher
+from agents.pdf_extractor import shutdown_extraction_pool
+from services.resume_export import resume_exporter
+from services.usage import usage_ledger
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop the in-process pipeline job workers; close shared clients and pools."""
+    usage_ledger.start()
+    worker_pool = None
+    if settings.JOB_WORKERS > 0:
+        worker_pool = JobWorkerPool(job_queue, settings.JOB_WORKERS)
+        worker_pool.start()
+    yield
+    if worker_pool:
+        await worker_pool.stop()
+    await http_fetcher.aclose()
+    shutdown_extraction_pool()
+    resume_exporter.shutdown()
+    await usage_ledger.stop()  # After the workers, so their last LLM calls are written
 
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Jobs API",
     description="AI-powered job application assistant",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Reject oversized uploads before the multipart form is parsed
+app.add_middleware(
+    UploadBodyLimitMiddleware,
+    limits={"/api/recruiter": settings.RECRUITER_MAX_UPLOAD_BODY_SIZE},
+    default_limit=settings.MAX_UPLOAD_BODY_SIZE
+)
+
+# Compress large JSON responses (streamed responses pass through as-is)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_BYTES)
+
+# Attribute LLM calls to requests and users; optional X-LLM-* debug headers
+app.add_middleware(UsageMiddleware, debug_headers=settings.LLM_USAGE_HEADERS)
+
 # Configure CORS
+# Added after the other middleware so it wraps them: their early responses
+# (e.g. 413 from the upload limit) still carry CORS headers for the browser
 # Allow both localhost:3000 (Next.js) and other potential origins
 app.add_middleware(
     CORSMiddleware,
@@ -37,6 +88,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost: time whole requests, add Server-Timing, feed /metrics
+app.add_middleware(TimingMiddleware, server_timing=settings.SERVER_TIMING_ENABLED)
+
 # Register routes
 app.include_router(cv_router)
 app.include_router(job_router)
@@ -46,6 +100,12 @@ app.include_router(process_router)
 app.include_router(analyze_router)  # Multi-step API
 app.include_router(webhooks_router)  # Polar.sh webhooks
 app.include_router(credits_router)  # Credits management
+app.include_router(pipeline_jobs_router)  # Background pipeline jobs
+app.include_router(recruiter_router)  # Recruiter mode (bulk CV ranking)
+app.include_router(export_router)  # Resume PDF/DOCX export
+app.include_router(usage_router)  # LLM token and cost accounting
+if settings.METRICS_ENABLED:
+    app.include_router(metrics_router)  # Prometheus /metrics
 
 
 @app.get("/")
@@ -1,9 +1,13 @@
 """Auth middleware for protecting API routes."""
-from fastapi import Request, HTTPException, Depends
+import hmac
+
+from fastapi import Request, HTTPException, Depends, Header
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
+from config import settings
 from services.supabase import supabase_service
 from services.polar import polar_service
+from services.usage import set_usage_user
 
 
 security = HTTPBearer(auto_error=False)
@@ -42,6 +46,9 @@ async def get_current_user(
     if not user_data:
         return None
     
+    # Attribute this request's LLM calls to the user
+    set_usage_user(user_data["id"])
+    
     # Get profile for additional data
     profile = await supabase_service.get_profile(user_data["id"])
     
@@ -70,6 +77,19 @@ async def require_auth(
     return user
 
 
+async def require_admin_token(x_admin_token: str = Header("")) -> None:
+    """
+    Require the X-Admin-Token header to match USAGE_REPORT_TOKEN.
+    
+    Raises 403 otherwise, and always when no token is configured.
+    """
+    # Bytes: compare_digest rejects non-ASCII str
+    if not settings.USAGE_REPORT_TOKEN or not hmac.compare_digest(
+        x_admin_token.encode(), settings.USAGE_REPORT_TOKEN.encode()
+    ):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
 async def require_credits(
     user: AuthenticatedUser = Depends(require_auth)
 ) -> AuthenticatedUser:
@@ -0,0 +1,105 @@
+"""Response compression above a size threshold.
+
+Compresses complete (non-streaming) responses with brotli when the client
+accepts it and the optional `brotli` package is installed, otherwise with
+gzip. Streaming responses (NDJSON progress, file downloads) pass through
+untouched: compressing them would hold back events until a compressor
+block fills. Already-encoded responses and binary media types are skipped.
+"""
+import gzip
+
+try:
+    import brotli
+except ImportError:  # Optional dependency
+    brotli = None
+
+
+COMPRESSIBLE_TYPES = (b"application/json", b"text/", b"application/x-ndjson", b"application/javascript")
+
+
+def _accepted(accept_encoding: str) -> set[str]:
+    encodings = set()
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        encodings.add(name.strip().lower())
+    return encodings
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI middleware compressing buffered responses.
+
+    Args:
+        app: The ASGI app to wrap
+        minimum_size: Bodies smaller than this many bytes are sent as-is
+        gzip_level: gzip compression level (1-9)
+        brotli_quality: brotli quality (0-11)
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _encoding_for(self, scope) -> str | None:
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accepted = _accepted(value.decode("latin-1"))
+                if brotli is not None and "br" in accepted:
+                    return "br"
+                if "gzip" in accepted:
+                    return "gzip"
+        return None
+
+    def _compress(self, encoding: str, body: bytes) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        encoding = self._encoding_for(scope)
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start_message = None
+
+        async def compressing_send(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                return await send(message)
+
+            start, start_message = start_message, None
+            headers = dict(start["headers"])
+            body = message.get("body", b"")
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or b"content-encoding" in headers
+                or not headers.get(b"content-type", b"").startswith(COMPRESSIBLE_TYPES)
+            ):
+                await send(start)
+                return await send(message)
+
+            compressed = self._compress(encoding, body)
+            rewritten = [
+                (name, value) for name, value in start["headers"]
+                if name not in (b"content-length", b"vary")
+            ]
+            vary = headers.get(b"vary")
+            rewritten += [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(compressed)).encode()),
+                (b"vary", b"Accept-Encoding" if not vary else vary + b", Accept-Encoding"),
+            ]
+            await send({**start, "headers": rewritten})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, compressing_send)
@@ -0,0 +1,44 @@
+"""Fast JSON in and out of route handlers.
+
+- ORJSONRoute: parses JSON request bodies with orjson instead of json.
+  Routers opt in with APIRouter(route_class=ORJSONRoute).
+- ndjson_line: one NDJSON event of a streamed response, via orjson.
+
+Routes with a response_model need nothing extra: FastAPI serializes the
+validated model straight to JSON bytes with pydantic-core, which beats
+ORJSONResponse (see benchmarks/bench_serialization.py). Setting a custom
+response class would switch them to the slower dict + encoder path, so
+large responses should keep a response_model rather than a response class.
+"""
+from typing import Any, Callable
+
+import orjson
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+
+class ORJSONRequest(Request):
+    """Request whose JSON body is decoded with orjson."""
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            body = await self.body()
+            self._json = orjson.loads(body) if body else None
+        return self._json
+
+
+class ORJSONRoute(APIRoute):
+    """APIRoute that hands endpoints an ORJSONRequest."""
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def orjson_route_handler(request: Request) -> Response:
+            return await handler(ORJSONRequest(request.scope, request.receive))
+
+        return orjson_route_handler
+
+
+def ndjson_line(value: Any) -> bytes:
+    """Serialize one event of an application/x-ndjson stream, newline included."""
+    return orjson.dumps(value, option=orjson.OPT_APPEND_NEWLINE)
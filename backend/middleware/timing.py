@@ -0,0 +1,52 @@
+"""Request timing: Server-Timing header and per-route duration metrics.
+
+Wraps each HTTP request in a services.tracing request trace. When the
+response starts, the spans finished so far (agents, LLM and other
+external calls) are summarized in a Server-Timing header; for streamed
+responses that covers the work done before the first byte. The full
+request duration is recorded per route template for GET /metrics.
+"""
+import time
+
+from services.tracing import metrics, request_trace
+
+
+class TimingMiddleware:
+    """
+    Pure ASGI middleware timing requests.
+
+    Args:
+        app: The ASGI app to wrap
+        server_timing: Add the Server-Timing response header
+    """
+
+    def __init__(self, app, server_timing: bool = True):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        started = time.perf_counter()
+        status = 500
+
+        with request_trace() as trace:
+            async def timing_send(message):
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    if self.server_timing:
+                        value = trace.server_timing(time.perf_counter() - started)
+                        message = {
+                            **message,
+                            "headers": [*message.get("headers", []), (b"server-timing", value.encode("latin-1"))]
+                        }
+                await send(message)
+
+            try:
+                await self.app(scope, receive, timing_send)
+            finally:
+                # The router records the matched route in the scope; templates keep label cardinality bounded
+                route = getattr(scope.get("route"), "path", "unmatched")
+                metrics.observe_request(scope["method"], route, status, time.perf_counter() - started)
@@ -0,0 +1,173 @@
+"""Upload handling: request body limits and streamed PDF reads.
+
+UploadBodyLimitMiddleware rejects oversized multipart requests before the
+form is parsed: up front from Content-Length, or as soon as a chunked body
+crosses the limit. read_pdf_upload then copies each file out of the form
+in fixed-size chunks, enforcing MAX_FILE_SIZE and hashing as it goes.
+Small files stay in memory; larger ones are spooled to a temporary file
+and memory-mapped, so PyMuPDF reads pages straight from the page cache
+and concurrent large uploads do not each hold a full in-memory copy.
+"""
+import hashlib
+import mmap
+import tempfile
+
+from fastapi import HTTPException, UploadFile
+
+from config import settings
+
+
+CHUNK_SIZE = 64 * 1024
+
+
+class UploadBodyLimitMiddleware:
+    """
+    Pure ASGI middleware capping multipart request bodies.
+
+    Args:
+        app: The ASGI app to wrap
+        limits: Path prefix → maximum body size in bytes; the longest
+            matching prefix wins, other paths use default_limit
+        default_limit: Limit for multipart requests on any other path
+    """
+
+    def __init__(self, app, limits: dict[str, int], default_limit: int):
+        self.app = app
+        self.limits = sorted(limits.items(), key=lambda item: len(item[0]), reverse=True)
+        self.default_limit = default_limit
+
+    def _limit_for(self, path: str) -> int:
+        for prefix, limit in self.limits:
+            if path.startswith(prefix):
+                return limit
+        return self.default_limit
+
+    async def _reject(self, send, limit: int) -> None:
+        body = f'{{"detail":"Upload too large; the limit is {limit // (1024 * 1024)} MB"}}'.encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = dict(scope["headers"])
+        if not headers.get(b"content-type", b"").startswith(b"multipart/form-data"):
+            return await self.app(scope, receive, send)
+
+        limit = self._limit_for(scope["path"])
+        content_length = headers.get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > limit:
+            return await self._reject(send, limit)
+
+        received = 0
+        rejected = False
+
+        async def limited_receive():
+            nonlocal received, rejected
+            if rejected:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    rejected = True
+                    await self._reject(send, limit)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            # The 413 has been sent; drop whatever the app answers after the disconnect
+            if not rejected:
+                await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not rejected:
+                raise
+
+
+class SpooledPDF:
+    """
+    An uploaded PDF held in memory or memory-mapped from a spool file.
+
+    `buffer` is a read-only view accepted by PyMuPDF and the caches;
+    `digest` is its content_hash, computed while the upload was read.
+    """
+
+    def __init__(self, filename: str, size: int, digest: str, buffer: memoryview, spool=None, mapping=None):
+        self.filename = filename
+        self.size = size
+        self.digest = digest
+        self.buffer = buffer
+        self._spool = spool
+        self._mapping = mapping
+
+    def close(self) -> None:
+        """Unmap and delete the spool file. Views still in use keep the mapping alive."""
+        if self._mapping is not None:
+            try:
+                self.buffer.release()
+                self._mapping.close()
+            except BufferError:
+                pass  # A shared extraction still reads it; freed with the last reference
+        if self._spool is not None:
+            self._spool.close()
+
+
+async def read_pdf_upload(upload: UploadFile, max_bytes: int | None = None) -> SpooledPDF:
+    """
+    Stream an uploaded file in chunks into memory or a spool file.
+
+    Args:
+        upload: The multipart file
+        max_bytes: Size limit, MAX_FILE_SIZE by default
+
+    Returns:
+        SpooledPDF; the caller closes it when done
+
+    Raises:
+        HTTPException: 413 as soon as the file exceeds the limit
+    """
+    max_bytes = max_bytes or settings.MAX_FILE_SIZE
+    too_large = HTTPException(
+        status_code=413,
+        detail=f"File too large; the limit is {max_bytes // (1024 * 1024)} MB"
+    )
+    if upload.size is not None and upload.size > max_bytes:
+        raise too_large
+
+    hasher = hashlib.blake2b(digest_size=20)
+    memory = bytearray()
+    spool = None
+    size = 0
+    try:
+        while chunk := await upload.read(CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_bytes:
+                raise too_large
+            hasher.update(chunk)
+            if spool is None and size > settings.UPLOAD_SPOOL_MAX_MEMORY:
+                spool = tempfile.TemporaryFile(prefix="upload-")
+                spool.write(memory)
+                memory = bytearray()
+            if spool is not None:
+                spool.write(chunk)
+            else:
+                memory += chunk
+    except BaseException:
+        if spool is not None:
+            spool.close()
+        raise
+
+    filename = upload.filename or ""
+    if spool is None:
+        return SpooledPDF(filename, size, hasher.hexdigest(), memoryview(memory).toreadonly())
+
+    spool.flush()
+    mapping = mmap.mmap(spool.fileno(), 0, access=mmap.ACCESS_READ)
+    return SpooledPDF(filename, size, hasher.hexdigest(), memoryview(mapping), spool, mapping)
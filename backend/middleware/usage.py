@@ -0,0 +1,35 @@
+"""Per-request LLM usage.
+
+Wraps each HTTP request in a services.usage request scope so every LLM
+call made while serving it is attributed to the request, its route and
+(once authenticated) its user. With debug headers on, the request's
+totals are added to the response as X-Request-ID and X-LLM-* headers; for
+streamed responses they cover the calls made before the first byte.
+"""
+from services.usage import request_usage
+
+
+class UsageMiddleware:
+    """
+    Pure ASGI middleware attributing LLM calls to requests.
+
+    Args:
+        app: The ASGI app to wrap
+        debug_headers: Add the X-Request-ID and X-LLM-* response headers
+    """
+
+    def __init__(self, app, debug_headers: bool = False):
+        self.app = app
+        self.debug_headers = debug_headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        with request_usage(scope) as usage:
+            async def usage_send(message):
+                if self.debug_headers and message["type"] == "http.response.start":
+                    message = {**message, "headers": [*message.get("headers", []), *usage.headers()]}
+                await send(message)
+
+            await self.app(scope, receive, usage_send)
@@ -1,12 +1,16 @@
 """Models package."""
 from .cv import MasterCV, Experience, Education
 from .job import JobAnalysis, CompanyIntelligence, JobCompanyPackage, HiringContact
-from .tailoring import MatchingResult, RewriteResult, TailoredResume, RelevantExperience, RewrittenExperience
+from .tailoring import MatchingResult, RewriteResult, TailoredResume, RelevantExperience, RewrittenExperience, TailoringState
 from .writing import CoverLetter, ColdEmail, CompanySummary, WritingPackage
+from .recruiter import CandidateScore, RankedCandidate, CandidateIngestError
+from .export import ExportOptions, ExportRequest
 
 __all__ = [
     "MasterCV", "Experience", "Education",
     "JobAnalysis", "CompanyIntelligence", "JobCompanyPackage", "HiringContact",
-    "MatchingResult", "RewriteResult", "TailoredResume", "RelevantExperience", "RewrittenExperience",
-    "CoverLetter", "ColdEmail", "CompanySummary", "WritingPackage"
+    "MatchingResult", "RewriteResult", "TailoredResume", "RelevantExperience", "RewrittenExperience", "TailoringState",
+    "CoverLetter", "ColdEmail", "CompanySummary", "WritingPackage",
+    "CandidateScore", "RankedCandidate", "CandidateIngestError",
+    "ExportOptions", "ExportRequest"
 ]
@@ -0,0 +1,18 @@
+"""Resume Export Models."""
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+
+class ExportOptions(BaseModel):
+    """Layout options for an exported resume; all templates are single-column."""
+    template: Literal["classic", "compact"] = "classic"
+    page_size: Literal["letter", "a4"] = "letter"
+    font_size: float = Field(default=10.5, ge=8.0, le=14.0)  # Body text, in points
+
+
+class ExportRequest(BaseModel):
+    """Request to export a tailored resume."""
+    resume_markdown: str = Field(min_length=1)
+    format: Literal["pdf", "docx"] = "pdf"
+    options: ExportOptions = Field(default_factory=ExportOptions)
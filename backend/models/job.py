@@ -49,6 +49,29 @@ class JobAnalysis(BaseModel):
     years_experience_required: str = ""  # e.g., "3-5 years", "5+ years"
 
 
+class ResolvedJobPosting(BaseModel):
+    """
+    Job description resolved from a URL (or pasted text).
+
+    When the page carries structured data (schema.org JobPosting JSON-LD
+    or OpenGraph), the JD text and the fields below come straight from it
+    without an LLM call.
+    """
+    jd_text: str
+    source: str = "text"  # "ats:<platform>" | "json_ld" | "opengraph" | "content" | "llm" | "text"
+    role_title: str = ""
+    employment_type: str = ""
+    industry: str = ""
+    years_experience_required: str = ""
+    company_name: str = ""
+    location: str = ""
+
+    def analysis_hints(self) -> dict[str, str]:
+        """JobAnalysis fields known from structured data (non-empty only)."""
+        fields = ("role_title", "employment_type", "industry", "years_experience_required")
+        return {field: getattr(self, field) for field in fields if getattr(self, field)}
+
+
 class CompanyIntelligence(BaseModel):
     """
     Company research data with source verification.
@@ -0,0 +1,78 @@
+"""Pipeline Models.
+
+Results of the multi-agent pipelines, shared by the HTTP routes that run
+them inline and the background job workers that run them asynchronously.
+"""
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+from .cv import MasterCV
+from .job import JobAnalysis, CompanyIntelligence
+from .tailoring import MatchingResult, RewriteResult, TailoredResume
+from .writing import WritingPackage
+
+
+class FullProcessResponse(BaseModel):
+    """Combined response for the entire application process."""
+    master_cv: MasterCV
+    job_analysis: JobAnalysis
+    company_intel: CompanyIntelligence
+    tailored_resume: TailoredResume
+    writing: WritingPackage
+    warnings: list[str]
+
+
+class FullTailorResponse(BaseModel):
+    """Response from full tailoring pipeline."""
+    matching: MatchingResult
+    rewritten: RewriteResult
+    resume: TailoredResume
+
+
+class BatchJobPosting(BaseModel):
+    """One posting in a batch tailoring request."""
+    job_description: str | None = None
+    job_url: str | None = None
+    company_name: str
+
+
+class BatchJobResult(BaseModel):
+    """
+    Outcome for one posting of a batch.
+
+    Streamed as soon as the posting finishes; `index` refers to the
+    position in the submitted list.
+    """
+    index: int
+    status: str  # "succeeded" | "failed"
+    job_analysis: JobAnalysis | None = None
+    company_intel: CompanyIntelligence | None = None
+    tailored_resume: TailoredResume | None = None
+    writing: WritingPackage | None = None
+    error: str = ""
+
+
+class PipelineJobSubmission(BaseModel):
+    """Request to run a pipeline in the background."""
+    pipeline: str  # e.g. "process_all", "tailor"
+    payload: dict[str, Any] = Field(default_factory=dict)
+
+
+class PipelineJobStatus(BaseModel):
+    """
+    State of a background pipeline job.
+
+    status: "queued" | "running" | "succeeded" | "failed"
+    """
+    id: str
+    pipeline: str
+    status: str
+    attempts: int = 0
+    max_attempts: int = 0
+    result: dict[str, Any] | None = None
+    error: str = ""
+    created_at: float = 0.0
+    updated_at: float = 0.0
+    # Signed-in submitter ("" for anonymous jobs); only that user may read the job
+    user_id: str = Field("", exclude=True)
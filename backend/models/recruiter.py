@@ -0,0 +1,34 @@
+"""Recruiter Mode Models.
+
+Bulk ranking of many CVs against one job.
+"""
+from pydantic import BaseModel, Field
+
+from .tailoring import MatchingResult
+
+
+class CandidateScore(BaseModel):
+    """Local (non-LLM) score of one candidate against the job."""
+    index: int  # Position of the CV in the upload
+    filename: str = ""
+    name: str = ""
+    score: float = 0.0  # 0-100, weighted skill + lexical score
+    skill_score: float = 0.0  # 0-1, weighted coverage of job skills/keywords
+    lexical_score: float = 0.0  # 0-1, IDF-weighted coverage of responsibility terms
+    matched_skills: list[str] = Field(default_factory=list)
+    missing_skills: list[str] = Field(default_factory=list)
+
+
+class RankedCandidate(BaseModel):
+    """Shortlisted candidate after the LLM matcher."""
+    candidate: CandidateScore
+    fit_score: int = 0  # Best relevance_score from the LLM matcher, 0-100
+    match: MatchingResult | None = None
+    error: str = ""
+
+
+class CandidateIngestError(BaseModel):
+    """A CV that could not be parsed or structured."""
+    index: int
+    filename: str = ""
+    error: str
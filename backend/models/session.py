@@ -0,0 +1,36 @@
+"""Analysis Session Models.
+
+Server-side state kept between /api/analyze/step1 and step 2, so the
+client only has to send back a session id plus its confirmed skills.
+"""
+from pydantic import BaseModel, Field
+
+from .cv import MasterCV
+from .job import JobAnalysis, CompanyIntelligence, CompanyVoiceProfile
+from .skill_gap import SkillGapAnalysis
+from .tailoring import TailoringState
+from .writing import ColdEmail, CompanySummary
+
+
+class AnalysisSession(BaseModel):
+    """
+    Step 1 results plus intermediate tailoring state.
+
+    Stored by the session store under an opaque, unguessable id.
+    """
+    master_cv: MasterCV
+    job_analysis: JobAnalysis
+    company_intel: CompanyIntelligence
+    voice_profile: CompanyVoiceProfile | None = None
+    skill_gap: SkillGapAnalysis
+    cv_warnings: list[str] = Field(default_factory=list)
+
+    # Signed-in user who ran step 1; only they may continue the session
+    user_id: str | None = None
+
+    # Filled in by step 2 for incremental re-tailoring
+    tailoring: TailoringState | None = None
+    
+    # Writing outputs that do not depend on confirmed skills
+    cold_email: ColdEmail | None = None
+    company_summary: CompanySummary | None = None
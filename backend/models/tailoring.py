@@ -1,6 +1,8 @@
 """Matching and Tailoring Models - Phase 3."""
 from pydantic import BaseModel, Field
 
+from .writing import CoverLetter
+
 
 class RelevantExperience(BaseModel):
     """Experience entry scored for relevance to job."""
@@ -35,6 +37,11 @@ class RewrittenExperience(BaseModel):
 class RewriteResult(BaseModel):
     """Result of bullet rewriting."""
     rewritten_experience: list[RewrittenExperience] = Field(default_factory=list)
+    
+    # Bullet rewrite cache stats for this request
+    cache_hits: int = 0
+    cache_misses: int = 0
+    cache_hit_ratio: float = 0.0  # 0-1
 
 
 class TailoredResume(BaseModel):
@@ -47,3 +54,26 @@ class TailoredResume(BaseModel):
     matched_skills: list[str] = Field(default_factory=list)
     keywords_used: list[str] = Field(default_factory=list)
     relevance_summary: str = ""
+    
+    # Local page-fit estimate (PDF export layout) and bullets trimmed to fit
+    estimated_pages: int = 0
+    trimmed_bullets: list[str] = Field(default_factory=list)
+
+
+class TailoringState(BaseModel):
+    """
+    Intermediate tailoring results kept per analysis session.
+    
+    Lets step 2 re-run incrementally when the user changes confirmed skills:
+    the baseline match is computed once, later runs only patch what changed.
+    """
+    baseline_matching: MatchingResult  # Match against the CV without confirmed skills
+    matching: MatchingResult  # Match after applying confirmed skills
+    rewritten: RewriteResult
+    resume: TailoredResume | None = None
+    confirmed_skills: list[str] = Field(default_factory=list)
+    
+    # The cover letter only reads the resume's experience: reused while
+    # resume_content_key(resume_markdown) is unchanged
+    cover_letter: CoverLetter | None = None
+    cover_letter_key: str = ""
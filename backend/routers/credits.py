@@ -4,8 +4,9 @@ from pydantic import BaseModel
 
 from services.supabase import supabase_service
 from middleware.auth import require_auth, AuthenticatedUser
+from middleware.json_io import ORJSONRoute
 
-router = APIRouter(prefix="/api/credits", tags=["credits"])
+router = APIRouter(prefix="/api/credits", tags=["credits"], route_class=ORJSONRoute)
 
 
 class CreditsResponse(BaseModel):
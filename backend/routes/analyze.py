@@ -4,32 +4,40 @@ Splits the processing into:
 1. /analyze - CV parsing + JD analysis + skill gap + voice profile
 2. /tailor - Final tailoring with confirmed skills AND voice mirroring
 """
-from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Depends
+from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Depends, status
 from pydantic import BaseModel
 from typing import Optional
 
 from models.cv import MasterCV
-from models.job import JobAnalysis, CompanyIntelligence, CompanyVoiceProfile
+from models.job import JobAnalysis, CompanyIntelligence, CompanyVoiceProfile, ResolvedJobPosting
 from models.skill_gap import SkillGapAnalysis, ConfirmedSkills
+from models.session import AnalysisSession
 
-from agents.pdf_extractor import extract_text_from_pdf
-from agents.cv_structurer import structure_cv
 from agents.cv_validator import validate_cv, get_validation_warnings
 
-from agents.url_resolver import extract_jd_from_url
+from agents.url_resolver import resolve_job_posting
 from agents.jd_analyzer import analyze_job_description
 from agents.company_intel import get_company_intel_with_voice, get_company_intelligence_from_url
 from agents.skill_gap_analyzer import analyze_skill_gap
+from agents.incremental_tailor import tailor_baseline
+from agents.cold_email import generate_cold_email
+from agents.company_summary import generate_company_summary
 
-from middleware.auth import require_auth, AuthenticatedUser
+from middleware.auth import require_auth, require_admin_token, get_current_user, AuthenticatedUser
+from middleware.uploads import read_pdf_upload
 from services.supabase import supabase_service
+from services.session_store import session_store
+from services.speculation import speculation_store
+from services.cv_ingest import ingest_cv_pdf
+from middleware.json_io import ORJSONRoute
 
 
-router = APIRouter(prefix="/api/analyze", tags=["Multi-Step Analysis"])
+router = APIRouter(prefix="/api/analyze", tags=["Multi-Step Analysis"], route_class=ORJSONRoute)
 
 
 class AnalysisResponse(BaseModel):
     """Response from initial analysis step."""
+    session_id: str  # Send back to step 2 instead of the full analysis
     master_cv: MasterCV
     job_analysis: JobAnalysis
     company_intel: CompanyIntelligence
@@ -43,7 +51,8 @@ async def analyze_step1(
     cv_pdf: UploadFile = File(...),
     job_description: Optional[str] = Form(None),
     job_url: Optional[str] = Form(None),
-    company_url: str = Form(...)
+    company_url: str = Form(...),
+    user: Optional[AuthenticatedUser] = Depends(get_current_user)
 ):
     """
     Step 1: Initial Analysis
@@ -54,6 +63,11 @@ async def analyze_step1(
     - Analyze skill gap
     
     Returns skill gap and voice profile for user confirmation before tailoring.
+    Results are kept server-side under the returned session_id for step 2.
+    
+    While the user reviews the skill gap, stages that do not depend on the
+    confirmation (baseline match + rewrite, cold email, company summary)
+    run speculatively in the background for step 2 to pick up.
     """
     if not job_description and not job_url:
         raise HTTPException(
@@ -61,23 +75,26 @@ async def analyze_step1(
             detail="Either job_description or job_url must be provided"
         )
 
+    upload = await read_pdf_upload(cv_pdf)
     try:
         # --- PHASE 1: Master CV Intelligence ---
-        cv_contents = await cv_pdf.read()
-        raw_cv_text = extract_text_from_pdf(cv_contents)
-        cv_json = await structure_cv(raw_cv_text)
+        # Cached by PDF content; signed-in users re-uploading an edited CV
+        # only pay for changed sections
+        try:
+            _, cv_json = await ingest_cv_pdf(upload.buffer, user.id if user else None, upload.digest)
+        finally:
+            upload.close()
         master_cv = validate_cv(cv_json)
         cv_warnings = get_validation_warnings(master_cv)
 
         # --- PHASE 2: Job + Company Intelligence ---
-        clean_jd_text = ""
         if job_url:
-            clean_jd_text = await extract_jd_from_url(job_url)
+            posting = await resolve_job_posting(job_url)
         else:
-            clean_jd_text = job_description
+            posting = ResolvedJobPosting(jd_text=job_description)
 
-        # Analyze JD
-        job_analysis = await analyze_job_description(clean_jd_text)
+        # Analyze JD (structured data from the posting, if any, pre-fills fields)
+        job_analysis = await analyze_job_description(posting.jd_text, posting.analysis_hints())
 
         # Deep company research + voice extraction (single call for efficiency)
         company_intel, voice_profile = await get_company_intel_with_voice(company_url)
@@ -85,7 +102,26 @@ async def analyze_step1(
         # --- PHASE 3: Skill Gap Analysis ---
         skill_gap = await analyze_skill_gap(master_cv, job_analysis)
 
+        session = AnalysisSession(
+            master_cv=master_cv,
+            job_analysis=job_analysis,
+            company_intel=company_intel,
+            voice_profile=voice_profile,
+            skill_gap=skill_gap,
+            cv_warnings=cv_warnings,
+            user_id=user.id if user else None
+        )
+        session_id = await session_store.create(session)
+
+        # --- Speculative step 2 work during user think-time ---
+        speculation_store.start(session_id, {
+            "tailoring": lambda: tailor_baseline(master_cv, job_analysis, voice_profile),
+            "cold_email": lambda: generate_cold_email(master_cv.summary, job_analysis, company_intel),
+            "company_summary": lambda: generate_company_summary(company_intel)
+        })
+
         return AnalysisResponse(
+            session_id=session_id,
             master_cv=master_cv,
             job_analysis=job_analysis,
             company_intel=company_intel,
@@ -101,12 +137,20 @@ async def analyze_step1(
 
 
 class TailorRequest(BaseModel):
-    """Request for tailoring with confirmed skills and voice profile."""
-    master_cv: MasterCV
-    job_analysis: JobAnalysis
-    company_intel: CompanyIntelligence
-    voice_profile: Optional[CompanyVoiceProfile] = None  # NEW
+    """
+    Request for tailoring with confirmed skills.
+    
+    Send the session_id from step 1. The full analysis fields are still
+    accepted for older clients but are ignored when session_id is set.
+    """
+    session_id: Optional[str] = None
     confirmed_skills: ConfirmedSkills
+    
+    # Legacy: full step 1 state round-tripped by the client
+    master_cv: Optional[MasterCV] = None
+    job_analysis: Optional[JobAnalysis] = None
+    company_intel: Optional[CompanyIntelligence] = None
+    voice_profile: Optional[CompanyVoiceProfile] = None
 
 
 class TailorResponse(BaseModel):
@@ -128,17 +172,42 @@ async def tailor_step2(
     """
     Step 2: Tailoring with Confirmed Skills + Voice Mirroring
     
-    Takes the analysis from step 1 plus user-confirmed skills.
+    Takes the step 1 session id plus user-confirmed skills.
     Generates tailored resume with company voice mirroring.
     
+    Tailoring is incremental per analysis session: re-submitting with
+    different confirmed skills reuses the previous match and rewrites.
+    
     Deducts 1 credit from user's account ONLY on successful generation.
     """
-    from agents.cv_matcher import analyze_cv_job_match
-    from agents.bullet_rewriter import rewrite_bullets
-    from agents.resume_generator import generate_ats_resume
+    from agents.incremental_tailor import (
+        analysis_fingerprint, get_tailoring_state, resume_content_key, save_tailoring_state, tailor_incremental
+    )
     from agents.cover_letter import generate_cover_letter
-    from agents.cold_email import generate_cold_email
-    from agents.company_summary import generate_company_summary
+    
+    # --- LOAD STEP 1 STATE ---
+    session = None
+    if request.session_id:
+        session = await session_store.get(request.session_id)
+        # Another user's session is reported as missing: it holds their CV
+        if session is None or (session.user_id is not None and session.user_id != user.id):
+            raise HTTPException(
+                status_code=404,
+                detail="Analysis session not found or expired. Please run the analysis again."
+            )
+    elif request.master_cv and request.job_analysis and request.company_intel:
+        session = AnalysisSession(
+            master_cv=request.master_cv,
+            job_analysis=request.job_analysis,
+            company_intel=request.company_intel,
+            voice_profile=request.voice_profile,
+            skill_gap=SkillGapAnalysis()
+        )
+    else:
+        raise HTTPException(
+            status_code=400,
+            detail="Either session_id or the full step 1 analysis must be provided"
+        )
     
     # --- PRE-CHECK CREDITS ---
     credits = await supabase_service.get_user_credits(user.id)
@@ -154,45 +223,73 @@ async def tailor_step2(
         )
     
     try:
-        # Add confirmed skills to CV skills list
-        enhanced_cv = request.master_cv.model_copy(deep=True)
-        for skill in request.confirmed_skills.confirmed_missing_skills:
-            if skill not in enhanced_cv.skills:
-                enhanced_cv.skills.append(skill)
-        
-        # --- Matching + Tailoring ---
-        matching_result = await analyze_cv_job_match(enhanced_cv, request.job_analysis)
+        # --- Matching + Tailoring (incremental per analysis session) ---
+        if request.session_id:
+            previous_state = session.tailoring
+            if previous_state is None:
+                # First run: seed from the speculative baseline if it is ready
+                previous_state = await speculation_store.take(request.session_id, "tailoring")
+            else:
+                speculation_store.discard(request.session_id, "tailoring")
+        else:
+            session_key = analysis_fingerprint(
+                session.master_cv,
+                session.job_analysis,
+                session.company_intel,
+                session.voice_profile
+            )
+            previous_state = get_tailoring_state(session_key)
         
-        # Rewrite bullets WITH voice mirroring
-        rewritten_result = await rewrite_bullets(
-            enhanced_cv,
-            matching_result,
-            request.job_analysis.keywords_for_ats,
-            request.voice_profile  # VOICE MIRRORING
+        tailored_resume, tailoring_state = await tailor_incremental(
+            session.master_cv,
+            session.job_analysis,
+            session.company_intel,
+            session.voice_profile,  # VOICE MIRRORING
+            request.confirmed_skills.confirmed_missing_skills,
+            previous_state
         )
         
-        tailored_resume = await generate_ats_resume(
-            enhanced_cv,
-            rewritten_result,
-            matching_result.matched_skills,
-            request.job_analysis.keywords_for_ats,
-            request.company_intel
-        )
-
         # --- Writing Layer ---
-        cover_letter = await generate_cover_letter(
-            tailored_resume.resume_markdown,
-            request.job_analysis,
-            request.company_intel
-        )
+        # Toggling a skill only patches the Skills section: keep the previous
+        # cover letter unless the rest of the resume changed
+        cover_letter_key = resume_content_key(tailored_resume.resume_markdown)
+        if previous_state is not None and previous_state.cover_letter_key == cover_letter_key:
+            cover_letter = previous_state.cover_letter
+        else:
+            cover_letter = await generate_cover_letter(
+                tailored_resume.resume_markdown,
+                session.job_analysis,
+                session.company_intel
+            )
+        tailoring_state.cover_letter = cover_letter
+        tailoring_state.cover_letter_key = cover_letter_key
         
-        cold_email = await generate_cold_email(
-            enhanced_cv.summary,
-            request.job_analysis,
-            request.company_intel
-        )
+        if not request.session_id:
+            save_tailoring_state(session_key, tailoring_state)
+        
+        # Neither depends on confirmed skills: reuse session or speculative results
+        cold_email = session.cold_email
+        if cold_email is None and request.session_id:
+            cold_email = await speculation_store.take(request.session_id, "cold_email")
+        if cold_email is None:
+            cold_email = await generate_cold_email(
+                session.master_cv.summary,
+                session.job_analysis,
+                session.company_intel
+            )
+        
+        company_summary = session.company_summary
+        if company_summary is None and request.session_id:
+            company_summary = await speculation_store.take(request.session_id, "company_summary")
+        if company_summary is None:
+            company_summary = await generate_company_summary(session.company_intel)
         
-        company_summary = await generate_company_summary(request.company_intel)
+        if request.session_id:
+            session.tailoring = tailoring_state
+            session.cold_email = cold_email
+            session.company_summary = company_summary
+            await session_store.save(request.session_id, session)
+            speculation_store.finish(request.session_id)
         
         # --- DEDUCT CREDIT ONLY ON SUCCESS ---
         credit_used = await supabase_service.use_credit(user.id)
@@ -220,3 +317,13 @@ async def tailor_step2(
         raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/speculation/stats", dependencies=[Depends(require_admin_token)])
+async def speculation_stats():
+    """
+    Speculative step 2 accounting: stages used vs discarded, wasted tokens.
+    
+    Requires the X-Admin-Token header to match USAGE_REPORT_TOKEN.
+    """
+    return speculation_store.stats
@@ -5,17 +5,23 @@ Phase 1 endpoints:
 - POST /api/cv/structure - Raw Text → JSON
 - POST /api/cv/validate - Validate JSON
 - POST /api/cv/process - Full pipeline (chains all 3)
+- GET /api/cv/extraction-stats - PDF extraction metrics
 """
-from fastapi import APIRouter, File, UploadFile, HTTPException
+from fastapi import APIRouter, File, UploadFile, HTTPException, Depends
 from pydantic import BaseModel
+from typing import Optional
 
 from models.cv import MasterCV
-from agents.pdf_extractor import extract_text_from_pdf
+from agents.pdf_extractor import extraction_metrics
 from agents.cv_structurer import structure_cv
 from agents.cv_validator import validate_cv, get_validation_warnings
+from middleware.auth import get_current_user, AuthenticatedUser
+from middleware.uploads import read_pdf_upload
+from services.cv_ingest import extract_pdf_text, structure_pdf_cv
+from middleware.json_io import ORJSONRoute
 
 
-router = APIRouter(prefix="/api/cv", tags=["CV Processing"])
+router = APIRouter(prefix="/api/cv", tags=["CV Processing"], route_class=ORJSONRoute)
 
 
 # Request/Response Models
@@ -49,9 +55,10 @@ async def extract_cv_text(file: UploadFile = File(...)):
     """
     Agent 1: Extract raw text from PDF resume.
     
-    - Accepts PDF file upload
+    - Accepts PDF file upload (up to MAX_FILE_SIZE)
     - Returns plain text preserving original order
     - No summarization or interpretation
+    - Cached by file content, shared with /process and /api/analyze/step1
     """
     # Validate file type
     if not file.filename.lower().endswith(".pdf"):
@@ -60,9 +67,11 @@ async def extract_cv_text(file: UploadFile = File(...)):
             detail="Only PDF files are accepted"
         )
     
-    # Read file bytes
+    # Stream the upload (size-limited, hashed while read)
     try:
-        contents = await file.read()
+        upload = await read_pdf_upload(file)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=400,
@@ -71,12 +80,14 @@ async def extract_cv_text(file: UploadFile = File(...)):
     
     # Extract text
     try:
-        raw_text = extract_text_from_pdf(contents)
+        raw_text = await extract_pdf_text(upload.buffer, upload.digest)
     except ValueError as e:
         raise HTTPException(
             status_code=422,
             detail=str(e)
         )
+    finally:
+        upload.close()
     
     return ExtractResponse(
         raw_text=raw_text,
@@ -117,12 +128,17 @@ async def validate_cv_json(request: ValidateRequest):
 
 
 @router.post("/process", response_model=ProcessResponse)
-async def process_cv(file: UploadFile = File(...)):
+async def process_cv(
+    file: UploadFile = File(...),
+    user: Optional[AuthenticatedUser] = Depends(get_current_user)
+):
     """
     Full Pipeline: Extract → Structure → Validate.
     
     Chains all 3 agents to process a PDF resume end-to-end.
     Returns the validated Master CV JSON ready for downstream use.
+    A PDF processed before is served from the PDF cache. For signed-in users, only sections changed since their last upload
+    are re-structured.
     """
     # Validate file type
     if not file.filename.lower().endswith(".pdf"):
@@ -131,9 +147,11 @@ async def process_cv(file: UploadFile = File(...)):
             detail="Only PDF files are accepted"
         )
     
-    # Read file
+    # Stream the upload (size-limited, hashed while read)
     try:
-        contents = await file.read()
+        upload = await read_pdf_upload(file)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=400,
@@ -141,17 +159,20 @@ async def process_cv(file: UploadFile = File(...)):
         )
     
     # Agent 1: Extract
+    digest = upload.digest
     try:
-        raw_text = extract_text_from_pdf(contents)
+        raw_text = await extract_pdf_text(upload.buffer, digest)
     except ValueError as e:
         raise HTTPException(
             status_code=422,
             detail=f"PDF extraction failed: {e}"
         )
+    finally:
+        upload.close()
     
     # Agent 2: Structure
     try:
-        cv = await structure_cv(raw_text)
+        cv = await structure_pdf_cv(raw_text, digest, user.id if user else None)
     except ValueError as e:
         raise HTTPException(
             status_code=422,
@@ -169,6 +190,17 @@ async def process_cv(file: UploadFile = File(...)):
     )
 
 
+@router.get("/extraction-stats")
+async def extraction_stats():
+    """
+    PDF extraction metrics.
+    
+    Documents and pages extracted, extraction time, how many documents
+    were split across worker processes, and early rejections by reason.
+    """
+    return extraction_metrics.stats()
+
+
 @router.get("/health")
 async def health_check():
     """Health check endpoint."""
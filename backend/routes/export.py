@@ -0,0 +1,67 @@
+"""Resume Export API Routes.
+
+Endpoints:
+- POST /api/export/resume - Tailored resume markdown → PDF or DOCX download
+- GET /api/export/cache - Render cache statistics
+"""
+from fastapi import APIRouter, HTTPException, Header, Response
+from fastapi.responses import StreamingResponse
+from typing import Optional
+
+from models.export import ExportRequest
+from services.resume_export import resume_exporter, resume_filename
+from middleware.json_io import ORJSONRoute
+
+
+router = APIRouter(prefix="/api/export", tags=["Resume Export"], route_class=ORJSONRoute)
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+@router.post("/resume")
+async def export_resume(
+    request: ExportRequest,
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Export a tailored resume as an ATS-safe, single-column PDF or DOCX.
+    
+    - resume_markdown: TailoredResume.resume_markdown
+    - format: "pdf" | "docx"
+    - options: template ("classic" | "compact"), page_size ("letter" | "a4"), font_size
+    
+    Rendering runs in worker processes; repeated downloads of the same
+    resume with the same options are served from the render cache. The
+    ETag lets clients revalidate without downloading the file again.
+    """
+    try:
+        exported = await resume_exporter.export(request.resume_markdown, request.format, request.options)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    etag = f'"{exported.key}"'
+    if if_none_match == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    content = exported.content
+
+    def chunks():
+        for start in range(0, len(content), STREAM_CHUNK_SIZE):
+            yield content[start:start + STREAM_CHUNK_SIZE]
+
+    filename = resume_filename(request.resume_markdown, request.format)
+    return StreamingResponse(
+        chunks(),
+        media_type=exported.media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Content-Length": str(len(content)),
+            "ETag": etag
+        }
+    )
+
+
+@router.get("/cache")
+async def export_cache_stats():
+    """Render cache statistics."""
+    return resume_exporter.stats()
@@ -5,18 +5,21 @@ Endpoints:
 - POST /api/job/from-url - Extract + analyze JD from URL
 - POST /api/job/company - Get company intelligence
 - POST /api/job/process - Full pipeline (JD + Company + Normalize)
+- GET /api/job/analysis-cache - JD analysis cache statistics
 """
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
 from models.job import JobAnalysis, CompanyIntelligence, JobCompanyPackage
 from agents.jd_analyzer import analyze_job_description
+from services.jd_cache import jd_analysis_cache
 from agents.company_intel import get_company_intelligence
-from agents.url_resolver import extract_jd_from_url
+from agents.url_resolver import resolve_job_posting
 from agents.job_normalizer import normalize_job_company_package, get_phase2_warnings
+from middleware.json_io import ORJSONRoute
 
 
-router = APIRouter(prefix="/api/job", tags=["Job Intelligence"])
+router = APIRouter(prefix="/api/job", tags=["Job Intelligence"], route_class=ORJSONRoute)
 
 
 # Request/Response Models
@@ -80,11 +83,11 @@ async def analyze_jd_from_url(request: FromURLRequest):
     - Analyzes for requirements
     """
     try:
-        # Extract JD from URL
-        jd_text = await extract_jd_from_url(request.url)
+        # Extract JD from URL (structured data first, LLM fallback)
+        posting = await resolve_job_posting(request.url)
         
         # Analyze extracted JD
-        job = await analyze_job_description(jd_text)
+        job = await analyze_job_description(posting.jd_text, posting.analysis_hints())
         return job
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
@@ -125,13 +128,16 @@ async def process_job(request: ProcessJobRequest):
     
     try:
         # Get JD text
+        hints = None
         if request.jd_url:
-            jd_text = await extract_jd_from_url(request.jd_url)
+            posting = await resolve_job_posting(request.jd_url)
+            jd_text = posting.jd_text
+            hints = posting.analysis_hints()
         else:
             jd_text = request.jd_text
         
         # Analyze JD
-        job = await analyze_job_description(jd_text)
+        job = await analyze_job_description(jd_text, hints)
         
         # Get company intelligence
         company = await get_company_intelligence(request.company_name)
@@ -152,6 +158,17 @@ async def process_job(request: ProcessJobRequest):
         raise HTTPException(status_code=422, detail=str(e))
 
 
+@router.get("/analysis-cache")
+async def analysis_cache_stats():
+    """
+    JD analysis cache statistics.
+    
+    Hit counts split into exact and near-duplicate matches, plus the
+    most-reused postings with their provenance.
+    """
+    return jd_analysis_cache.stats()
+
+
 @router.get("/health")
 async def health_check():
     """Health check endpoint."""
@@ -0,0 +1,26 @@
+"""Metrics Route.
+
+Endpoints:
+- GET /metrics - Request and per-stage timing, LLM tokens and cache
+  lookups in Prometheus text format
+"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from services.tracing import metrics
+from middleware.json_io import ORJSONRoute
+
+
+router = APIRouter(tags=["Metrics"], route_class=ORJSONRoute)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """
+    Prometheus scrape endpoint.
+
+    Histograms of request duration by route and of agent/external-call
+    span duration by provider, plus span errors, LLM tokens by provider
+    and cache hits/misses by span.
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,123 @@
+"""Background Pipeline Job Routes.
+
+Endpoints:
+- POST /api/jobs - Submit a pipeline run, returns a job id immediately
+- POST /api/jobs/process-all - Multipart convenience for the "process_all" pipeline
+- GET /api/jobs/{job_id} - Job status and, once finished, its result
+
+Pipelines run on the worker pool (services/job_worker.py), so the HTTP
+request no longer has to stay open for the whole LLM pipeline.
+"""
+import base64
+from typing import Optional
+
+from fastapi import APIRouter, Depends, File, UploadFile, Form, HTTPException
+from pydantic import BaseModel, ValidationError
+
+from config import settings
+from models.pipeline import PipelineJobSubmission, PipelineJobStatus
+from middleware.auth import get_current_user, AuthenticatedUser
+from middleware.uploads import read_pdf_upload
+from services.job_queue import job_queue
+from services.pipelines import PIPELINES, USAGE_PAYLOAD_KEY
+from services.usage import usage_attribution
+from middleware.json_io import ORJSONRoute
+
+
+router = APIRouter(prefix="/api/jobs", tags=["Background Jobs"], route_class=ORJSONRoute)
+
+
+class JobAcceptedResponse(BaseModel):
+    """Response for an accepted job submission."""
+    id: str
+    status: str = "queued"
+    status_url: str
+
+
+async def _enqueue(
+    pipeline_name: str,
+    payload: dict,
+    user: Optional[AuthenticatedUser]
+) -> JobAcceptedResponse:
+    pipeline = PIPELINES.get(pipeline_name)
+    if pipeline is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown pipeline '{pipeline_name}'. Available: {', '.join(PIPELINES)}"
+        )
+
+    # Reject bad payloads now rather than after a worker picks them up
+    try:
+        pipeline.payload_model(**payload)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False, include_input=False))
+
+    # Workers record the job's LLM usage against the submitting user and route
+    payload = {**payload, USAGE_PAYLOAD_KEY: usage_attribution()}
+    job_id = await job_queue.enqueue(
+        pipeline_name, payload, settings.JOB_MAX_ATTEMPTS, user_id=user.id if user else ""
+    )
+    return JobAcceptedResponse(id=job_id, status_url=f"/api/jobs/{job_id}")
+
+
+@router.post("", response_model=JobAcceptedResponse, status_code=202)
+async def submit_job(
+    request: PipelineJobSubmission,
+    user: Optional[AuthenticatedUser] = Depends(get_current_user)
+):
+    """
+    Submit a pipeline to run in the background.
+
+    - pipeline: one of the registered pipelines ("process_all", "tailor")
+    - payload: that pipeline's input (PDFs as base64)
+    """
+    return await _enqueue(request.pipeline, request.payload, user)
+
+
+@router.post("/process-all", response_model=JobAcceptedResponse, status_code=202)
+async def submit_process_all_job(
+    cv_pdf: UploadFile = File(...),
+    job_description: Optional[str] = Form(None),
+    job_url: Optional[str] = Form(None),
+    company_name: str = Form(...),
+    user: Optional[AuthenticatedUser] = Depends(get_current_user)
+):
+    """
+    Queue the end-to-end pipeline from the same form fields as /api/process/all.
+    """
+    if not job_description and not job_url:
+        raise HTTPException(
+            status_code=400,
+            detail="Either job_description or job_url must be provided"
+        )
+
+    upload = await read_pdf_upload(cv_pdf)
+    try:
+        cv_pdf_base64 = base64.b64encode(upload.buffer).decode("ascii")
+    finally:
+        upload.close()
+    return await _enqueue("process_all", {
+        "cv_pdf_base64": cv_pdf_base64,
+        "job_description": job_description,
+        "job_url": job_url,
+        "company_name": company_name
+    }, user)
+
+
+@router.get("/{job_id}", response_model=PipelineJobStatus)
+async def get_job(
+    job_id: str,
+    user: Optional[AuthenticatedUser] = Depends(get_current_user)
+):
+    """
+    Get job status.
+
+    status: queued | running | succeeded | failed
+    result is set once the job has succeeded; results expire after JOB_RESULT_TTL_SECONDS.
+    Jobs submitted by a signed-in user are only visible to that user.
+    """
+    job = await job_queue.get(job_id)
+    # Same 404 for other users' jobs: the result holds the submitter's CV
+    if job is None or (job.user_id and (user is None or user.id != job.user_id)):
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job
@@ -3,42 +3,20 @@
 Orchestrates all 4 phases into a single workflow.
 """
 from fastapi import APIRouter, File, UploadFile, Form, HTTPException
-from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
 from typing import Optional
 
-from models.cv import MasterCV
-from models.job import JobAnalysis, CompanyIntelligence, JobCompanyPackage
-from models.tailoring import MatchingResult, RewriteResult, TailoredResume
-from models.writing import WritingPackage
+from config import settings
+from models.pipeline import FullProcessResponse, BatchJobPosting
+from middleware.uploads import read_pdf_upload
+from services.pipelines import run_full_process, prepare_master_cv, run_batch_process
+from middleware.json_io import ORJSONRoute, ndjson_line
 
-from agents.pdf_extractor import extract_text_from_pdf
-from agents.cv_structurer import structure_cv
-from agents.cv_validator import validate_cv, get_validation_warnings
 
-from agents.url_resolver import extract_jd_from_url
-from agents.jd_analyzer import analyze_job_description
-from agents.company_intel import get_company_intelligence
+router = APIRouter(prefix="/api/process", tags=["End-to-End Processing"], route_class=ORJSONRoute)
 
-from agents.cv_matcher import analyze_cv_job_match
-from agents.bullet_rewriter import rewrite_bullets
-from agents.resume_generator import generate_ats_resume
-
-from agents.cover_letter import generate_cover_letter
-from agents.cold_email import generate_cold_email
-from agents.company_summary import generate_company_summary
-
-
-router = APIRouter(prefix="/api/process", tags=["End-to-End Processing"])
-
-
-class FullProcessResponse(BaseModel):
-    """Combined response for the entire application process."""
-    master_cv: MasterCV
-    job_analysis: JobAnalysis
-    company_intel: CompanyIntelligence
-    tailored_resume: TailoredResume
-    writing: WritingPackage
-    warnings: list[str]
+_postings_adapter = TypeAdapter(list[BatchJobPosting])
 
 
 @router.post("/all", response_model=FullProcessResponse)
@@ -62,87 +40,82 @@ async def process_all(
             detail="Either job_description or job_url must be provided"
         )
 
+    upload = await read_pdf_upload(cv_pdf)
     try:
-        # --- PHASE 1: Master CV Intelligence ---
-        # Agent 1: Extract Text
-        cv_contents = await cv_pdf.read()
-        raw_cv_text = extract_text_from_pdf(cv_contents)
-        
-        # Agent 2: Structure
-        cv_json = await structure_cv(raw_cv_text)
-        
-        # Agent 3: Validate
-        master_cv = validate_cv(cv_json)
-        cv_warnings = get_validation_warnings(master_cv)
-
-        # --- PHASE 2: Job + Company Intelligence ---
-        # Agent 3: URL Resolver (if needed)
-        clean_jd_text = ""
-        if job_url:
-            clean_jd_text = await extract_jd_from_url(job_url)
-        else:
-            clean_jd_text = job_description
-
-        # Agent 1: JD Analysis
-        job_analysis = await analyze_job_description(clean_jd_text)
-
-        # Agent 2: Company Intelligence
-        company_intel = await get_company_intelligence(company_name)
-
-        # --- PHASE 3: Matching + Tailoring ---
-        # Agent 1: Match
-        matching_result = await analyze_cv_job_match(master_cv, job_analysis)
-        
-        # Agent 2: Bullet Rewriting
-        rewritten_result = await rewrite_bullets(
-            master_cv, 
-            matching_result, 
-            job_analysis.keywords_for_ats
-        )
-        
-        # Agent 3: Resume Generation
-        tailored_resume = await generate_ats_resume(
-            master_cv,
-            rewritten_result,
-            matching_result.matched_skills,
-            job_analysis.keywords_for_ats
+        return await run_full_process(
+            upload.buffer,
+            job_description,
+            job_url,
+            company_name
         )
 
-        # --- PHASE 4: Writing Layer ---
-        # Agent 1: Cover Letter
-        cover_letter = await generate_cover_letter(
-            tailored_resume.resume_markdown,
-            job_analysis,
-            company_intel
-        )
-        
-        # Agent 2: Cold Email
-        cold_email = await generate_cold_email(
-            master_cv.summary, # Using master summary for general fit
-            job_analysis,
-            company_intel
-        )
-        
-        # Agent 3: Company Summary
-        company_summary = await generate_company_summary(company_intel)
-        
-        writing_package = WritingPackage(
-            cover_letter=cover_letter,
-            cold_email=cold_email,
-            company_summary=company_summary
-        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        # Log error in real world, for now just pass it
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        upload.close()
 
-        return FullProcessResponse(
-            master_cv=master_cv,
-            job_analysis=job_analysis,
-            company_intel=company_intel,
-            tailored_resume=tailored_resume,
-            writing=writing_package,
-            warnings=cv_warnings
+
+@router.post("/batch")
+async def process_batch(
+    cv_pdf: UploadFile = File(...),
+    jobs: str = Form(...)
+):
+    """
+    Tailor one CV against many job postings.
+
+    - jobs: JSON list of {job_description | job_url, company_name}
+
+    The CV is parsed and structured once. Postings are processed with
+    bounded concurrency (BATCH_MAX_CONCURRENCY); duplicate JD URLs/texts
+    and companies are resolved and researched only once.
+
+    Streams NDJSON, one object per line:
+    - {"type": "cv", "master_cv": ..., "warnings": [...]}
+    - {"type": "job", "index": i, "status": "succeeded" | "failed", ...} as each posting finishes
+    - {"type": "done", "succeeded": n, "failed": m}
+    """
+    try:
+        postings = _postings_adapter.validate_json(jobs)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+
+    if not postings:
+        raise HTTPException(status_code=400, detail="At least one job posting must be provided")
+    if len(postings) > settings.BATCH_MAX_JOBS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many job postings ({len(postings)}); the limit is {settings.BATCH_MAX_JOBS}"
         )
 
+    # Parse the CV before streaming so CV errors still map to status codes
+    upload = await read_pdf_upload(cv_pdf)
+    try:
+        master_cv, cv_warnings = await prepare_master_cv(upload.buffer, digest=upload.digest)
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
-        # Log error in real world, for now just pass it
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        upload.close()
+
+    async def stream():
+        yield ndjson_line({
+            "type": "cv",
+            "master_cv": master_cv.model_dump(mode="json"),
+            "warnings": cv_warnings
+        })
+
+        succeeded = failed = 0
+        async for result in run_batch_process(master_cv, postings, settings.BATCH_MAX_CONCURRENCY):
+            if result.status == "succeeded":
+                succeeded += 1
+            else:
+                failed += 1
+            yield ndjson_line({"type": "job", **result.model_dump(mode="json")})
+
+        yield ndjson_line({"type": "done", "succeeded": succeeded, "failed": failed})
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
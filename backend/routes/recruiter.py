@@ -0,0 +1,87 @@
+"""Recruiter Mode Routes.
+
+Endpoints:
+- POST /api/recruiter/rank - Rank many CVs against one job (streams NDJSON)
+"""
+from typing import Optional
+
+from fastapi import APIRouter, File, UploadFile, Form, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+
+from config import settings
+from models.job import JobAnalysis
+from agents.jd_analyzer import analyze_job_description
+from middleware.uploads import read_pdf_upload
+from services.recruiter import rank_candidates
+from middleware.json_io import ORJSONRoute, ndjson_line
+
+
+router = APIRouter(prefix="/api/recruiter", tags=["Recruiter Mode"], route_class=ORJSONRoute)
+
+
+@router.post("/rank")
+async def rank_cvs(
+    cv_pdfs: list[UploadFile] = File(...),
+    job_description: Optional[str] = Form(None),
+    job_analysis: Optional[str] = Form(None),
+    top_k: int = Form(settings.RECRUITER_TOP_K)
+):
+    """
+    Screen many CVs against one job.
+
+    - cv_pdfs: the candidate CVs (PDF)
+    - job_analysis: JobAnalysis JSON from /api/job/analyze, or
+    - job_description: raw JD text (analyzed once here)
+    - top_k: how many of the best local scores go to the LLM matcher
+
+    Every CV is scored locally (skill + lexical overlap); only the top_k
+    are sent to the LLM matcher. Streams NDJSON progress events, ending
+    with {"type": "done", "shortlist": [...], "failed": [...]}.
+    """
+    if not cv_pdfs:
+        raise HTTPException(status_code=400, detail="At least one CV must be provided")
+    if len(cv_pdfs) > settings.RECRUITER_MAX_CVS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many CVs ({len(cv_pdfs)}); the limit is {settings.RECRUITER_MAX_CVS}"
+        )
+    if not job_analysis and not job_description:
+        raise HTTPException(
+            status_code=400,
+            detail="Either job_analysis or job_description must be provided"
+        )
+
+    if job_analysis:
+        try:
+            job = JobAnalysis.model_validate_json(job_analysis)
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+    else:
+        try:
+            job = await analyze_job_description(job_description)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    # Spool uploads now: the form's files are closed once this handler returns
+    uploads = []
+    try:
+        for cv_pdf in cv_pdfs:
+            uploads.append(await read_pdf_upload(cv_pdf))
+    except BaseException:
+        for upload in uploads:
+            upload.close()
+        raise
+    files = [(upload.filename, upload.buffer) for upload in uploads]
+
+    async def stream():
+        try:
+            async for event in rank_candidates(files, job, top_k):
+                yield ndjson_line(event)
+        finally:
+            for upload in uploads:
+                upload.close()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
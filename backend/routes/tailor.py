@@ -12,12 +12,15 @@ from pydantic import BaseModel
 from models.cv import MasterCV
 from models.job import JobAnalysis
 from models.tailoring import MatchingResult, RewriteResult, TailoredResume
+from models.pipeline import FullTailorResponse
 from agents.cv_matcher import analyze_cv_job_match
 from agents.bullet_rewriter import rewrite_bullets
 from agents.resume_generator import generate_ats_resume
+from services.pipelines import run_tailoring
+from middleware.json_io import ORJSONRoute
 
 
-router = APIRouter(prefix="/api/tailor", tags=["Resume Tailoring"])
+router = APIRouter(prefix="/api/tailor", tags=["Resume Tailoring"], route_class=ORJSONRoute)
 
 
 # Request/Response Models
@@ -49,13 +52,6 @@ class FullTailorRequest(BaseModel):
     job: JobAnalysis
 
 
-class FullTailorResponse(BaseModel):
-    """Response from full tailoring pipeline."""
-    matching: MatchingResult
-    rewritten: RewriteResult
-    resume: TailoredResume
-
-
 # Endpoints
 
 @router.post("/match", response_model=MatchingResult)
@@ -127,32 +123,7 @@ async def full_tailoring_pipeline(request: FullTailorRequest):
     3. Generate ATS-safe resume
     """
     try:
-        # Step 1: Match
-        matching = await analyze_cv_job_match(request.cv, request.job)
-        
-        # Get job keywords
-        job_keywords = request.job.keywords_for_ats
-        
-        # Step 2: Rewrite
-        rewritten = await rewrite_bullets(
-            request.cv,
-            matching,
-            job_keywords
-        )
-        
-        # Step 3: Generate
-        resume = await generate_ats_resume(
-            request.cv,
-            rewritten,
-            matching.matched_skills,
-            job_keywords
-        )
-        
-        return FullTailorResponse(
-            matching=matching,
-            rewritten=rewritten,
-            resume=resume
-        )
+        return await run_tailoring(request.cv, request.job)
         
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
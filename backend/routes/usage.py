@@ -0,0 +1,49 @@
+"""LLM Usage Routes.
+
+Endpoints:
+- GET /api/usage/stats - Tokens, cost and latency per agent and per model
+  since this process started
+- GET /api/usage/report - Persisted usage over the last days, grouped by
+  agent, user, provider, model or route (admin token required)
+"""
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from middleware.auth import require_admin_token
+from services.usage import REPORT_GROUPS, usage_ledger
+from middleware.json_io import ORJSONRoute
+
+
+router = APIRouter(prefix="/api/usage", tags=["Usage"], route_class=ORJSONRoute)
+
+
+@router.get("/stats")
+async def usage_stats():
+    """
+    Live LLM usage of this process.
+
+    Totals per agent and per provider/model, plus how many calls are
+    waiting to be written to the usage table.
+    """
+    return usage_ledger.stats()
+
+
+@router.get("/report")
+async def usage_report(
+    days: float = Query(7, gt=0, le=366, description="Window, counted back from now"),
+    group_by: str = Query("agent", description=f"One of: {', '.join(REPORT_GROUPS)}"),
+    limit: int = Query(100, ge=1, le=1000),
+    _admin: None = Depends(require_admin_token)
+):
+    """
+    LLM usage from the usage table, most expensive groups first.
+
+    Requires the X-Admin-Token header to match USAGE_REPORT_TOKEN.
+    """
+    try:
+        groups = await usage_ledger.report(time.time() - days * 86400, group_by, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {"days": days, "group_by": group_by, "groups": groups}
@@ -2,9 +2,10 @@
 from fastapi import APIRouter, Request, HTTPException
 from services.polar import polar_service
 from services.supabase import supabase_service
+from middleware.json_io import ORJSONRoute
 
 
-router = APIRouter(prefix="/webhooks", tags=["webhooks"])
+router = APIRouter(prefix="/webhooks", tags=["webhooks"], route_class=ORJSONRoute)
 
 
 @router.post("/polar")
@@ -14,9 +14,10 @@ from models.writing import CoverLetter, ColdEmail, CompanySummary, WritingPackag
 from agents.cover_letter import generate_cover_letter
 from agents.cold_email import generate_cold_email
 from agents.company_summary import generate_company_summary
+from middleware.json_io import ORJSONRoute
 
 
-router = APIRouter(prefix="/api/write", tags=["Writing Layer"])
+router = APIRouter(prefix="/api/write", tags=["Writing Layer"], route_class=ORJSONRoute)
 
 
 # Request Models
@@ -0,0 +1,186 @@
+"""Caching primitives shared by agents and routes."""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any
+
+
+def stable_hash(*parts: Any) -> str:
+    """
+    Build a deterministic cache key from arbitrary JSON-compatible parts.
+
+    Pydantic models should be passed as ``model.model_dump()`` so that
+    the key does not depend on field ordering in the serialized JSON.
+    """
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def content_hash(data: bytes) -> str:
+    """BLAKE2b digest of file contents, for content-addressed cache keys."""
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+class TTLCache:
+    """
+    Bounded LRU cache with per-entry expiry.
+
+    Not thread-safe by design: every caller lives on the asyncio event loop.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a cached value, or ``default`` if missing or expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl_seconds: float | None = None) -> None:
+        """Store a value, evicting the least recently used entries if full."""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        """Remove and return a value regardless of expiry."""
+        entry = self._data.pop(key, None)
+        return entry[1] if entry else default
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._data.clear()
+
+    def __contains__(self, key: str) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and entry[0] >= time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class DiskCache:
+    """
+    SQLite key/value store with per-entry expiry.
+
+    A local file, so every worker process on the machine shares it.
+    Values are bytes; calls block and belong in a thread (see TieredCache).
+    """
+
+    def __init__(self, path: str, ttl_seconds: float, max_entries: int):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._writes = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS kv_cache ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL, stored_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def get(self, key: str) -> bytes | None:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value FROM kv_cache WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: bytes) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO kv_cache (key, value, expires_at, stored_at) VALUES (?, ?, ?, ?)",
+                (key, value, now + self.ttl_seconds, now)
+            )
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self.purge()
+
+    def purge(self) -> None:
+        """Drop expired entries, then the oldest ones beyond max_entries."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM kv_cache WHERE expires_at <= ?", (time.time(),))
+            conn.execute(
+                "DELETE FROM kv_cache WHERE key IN "
+                "(SELECT key FROM kv_cache ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+
+class TieredCache:
+    """
+    Bounded in-memory LRU in front of an optional disk tier.
+
+    Values must be JSON-compatible; the disk tier stores them compressed.
+    Disk hits are promoted to memory. Disk I/O runs in a thread so the
+    event loop never waits on SQLite.
+    """
+
+    def __init__(self, memory: TTLCache, disk: DiskCache | None = None):
+        self.memory = memory
+        self.disk = disk
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        value = self.memory.get(key, _MISSING)
+        if value is not _MISSING:
+            self.memory_hits += 1
+            return value
+
+        if self.disk is not None:
+            blob = await asyncio.to_thread(self.disk.get, key)
+            if blob is not None:
+                value = json.loads(zlib.decompress(blob))
+                self.memory.set(key, value)
+                self.disk_hits += 1
+                return value
+
+        self.misses += 1
+        return default
+
+    async def set(self, key: str, value: Any) -> None:
+        self.memory.set(key, value)
+        if self.disk is not None:
+            blob = zlib.compress(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+            await asyncio.to_thread(self.disk.set, key, blob)
+
+
+_MISSING = object()
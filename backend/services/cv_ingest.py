@@ -0,0 +1,158 @@
+"""CV ingestion cached by PDF content.
+
+The same PDF typically arrives several times (/api/cv/extract, then
+/api/cv/process, then /api/analyze/step1, plus retries and recruiter
+re-screens). Extracted text and the structured MasterCV are cached under
+the file's BLAKE2 content hash, in a bounded in-memory tier in front of a
+local SQLite tier that all worker processes on the machine share. A
+repeated upload skips PyMuPDF and the structuring LLM call entirely.
+"""
+import asyncio
+import logging
+
+from config import settings
+from models.cv import MasterCV
+from agents.pdf_extractor import extract_text_from_pdf, PDF_EXTRACTOR_VERSION
+from agents.cv_structurer import structure_cv_for_user, remember_cv_for_user, CV_STRUCTURER_VERSION
+from services.cache import TTLCache, DiskCache, TieredCache, content_hash
+from services.tracing import record_cache, traced
+
+logger = logging.getLogger(__name__)
+
+
+pdf_cache = TieredCache(
+    memory=TTLCache(
+        max_entries=settings.PDF_CACHE_MEMORY_ENTRIES,
+        ttl_seconds=settings.PDF_CACHE_TTL_SECONDS
+    ),
+    disk=DiskCache(
+        settings.PDF_CACHE_SQLITE_PATH,
+        ttl_seconds=settings.PDF_CACHE_TTL_SECONDS,
+        max_entries=settings.PDF_CACHE_DISK_MAX_ENTRIES
+    ) if settings.PDF_CACHE_ENABLED and settings.PDF_CACHE_DISK_ENABLED else None
+)
+
+
+# Structured-CV hits only (text hits are in pdf_cache's own counters)
+cv_cache_hits = 0
+
+
+# In-flight ingestions, so the same PDF uploaded twice at once is processed once
+_ingest_inflight: dict[str, asyncio.Task] = {}
+
+
+@traced("cv_ingest.text")
+async def extract_pdf_text(contents: bytes | memoryview, digest: str | None = None) -> str:
+    """
+    PDF bytes → raw text, cached by content hash.
+
+    Args:
+        contents: Raw PDF file bytes (or a view of a spooled upload)
+        digest: content_hash(contents), if the caller already has it
+
+    Returns:
+        Plain text extracted from the PDF
+
+    Raises:
+        ValueError: If the PDF cannot be parsed
+    """
+    if not settings.PDF_CACHE_ENABLED:
+        return await asyncio.to_thread(extract_text_from_pdf, contents)
+
+    key = f"text:{PDF_EXTRACTOR_VERSION}:{digest or content_hash(contents)}"
+    raw_text = await pdf_cache.get(key)
+    if raw_text is None:
+        record_cache(misses=1)
+        raw_text = await asyncio.to_thread(extract_text_from_pdf, contents)
+        await pdf_cache.set(key, raw_text)
+    else:
+        record_cache(hits=1)
+    return raw_text
+
+
+@traced("cv_ingest.cv")
+async def structure_pdf_cv(raw_text: str, digest: str, user_id: str | None = None) -> MasterCV:
+    """
+    Raw text of a PDF → structured (not yet validated) MasterCV, cached by
+    the PDF's content hash.
+
+    A cache hit still becomes the user's last upload, so their next
+    re-upload is diffed against it.
+
+    Args:
+        raw_text: Text extracted from the PDF
+        digest: content_hash of the PDF bytes
+        user_id: Authenticated user id, or None for anonymous uploads
+
+    Returns:
+        MasterCV object; a fresh copy the caller may mutate
+
+    Raises:
+        ValueError: If structuring fails
+    """
+    global cv_cache_hits
+
+    if not settings.PDF_CACHE_ENABLED:
+        return await structure_cv_for_user(raw_text, user_id)
+
+    key = f"cv:{CV_STRUCTURER_VERSION}:{digest}"
+    cached = await pdf_cache.get(key)
+    if cached is not None:
+        cv_cache_hits += 1
+        record_cache(hits=1)
+        logger.info("Structured CV served from PDF cache")
+        cv = MasterCV.model_validate(cached)
+        remember_cv_for_user(raw_text, user_id, cv)
+        return cv
+
+    record_cache(misses=1)
+    cv = await structure_cv_for_user(raw_text, user_id)
+    await pdf_cache.set(key, cv.model_dump(mode="json"))
+    return cv
+
+
+async def _ingest(digest: str, contents: bytes | memoryview, user_id: str | None) -> tuple[str, MasterCV]:
+    raw_text = await extract_pdf_text(contents, digest)
+    return raw_text, await structure_pdf_cv(raw_text, digest, user_id)
+
+
+async def _ingest_shared(digest: str, contents: bytes | memoryview) -> tuple[str, MasterCV]:
+    try:
+        return await _ingest(digest, contents, None)
+    finally:
+        _ingest_inflight.pop(digest, None)
+
+
+async def ingest_cv_pdf(
+    contents: bytes | memoryview,
+    user_id: str | None = None,
+    digest: str | None = None
+) -> tuple[str, MasterCV]:
+    """
+    PDF bytes → (raw text, structured MasterCV), both cached by content hash.
+
+    Concurrent anonymous ingestions of the same file share one run; runs
+    for a signed-in user also update that user's CV state, so they are not
+    shared. Validation is left to the caller.
+
+    Args:
+        contents: Raw PDF file bytes (or a view of a spooled upload)
+        user_id: Authenticated user id, or None for anonymous uploads
+        digest: content_hash(contents), if the caller already has it
+
+    Returns:
+        (raw_text, cv); cv is a copy the caller may mutate
+
+    Raises:
+        ValueError: If extraction or structuring fails
+    """
+    digest = digest or content_hash(contents)
+    if user_id:
+        return await _ingest(digest, contents, user_id)
+
+    task = _ingest_inflight.get(digest)
+    if task is None:
+        task = asyncio.create_task(_ingest_shared(digest, contents))
+        _ingest_inflight[digest] = task
+    raw_text, cv = await asyncio.shield(task)
+    return raw_text, cv.model_copy(deep=True)
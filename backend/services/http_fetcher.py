@@ -0,0 +1,376 @@
+"""Shared HTTP fetcher for job pages and ATS APIs.
+
+- One pooled httpx client for the process (keep-alive across requests)
+- Per-host concurrency limits, so a burst of batch/recruiter work cannot
+  hammer a single job board
+- Streaming downloads with a byte ceiling; oversized pages are aborted
+  as soon as the limit is crossed
+- HTTP cache honoring Cache-Control max-age, ETag and Last-Modified:
+  fresh entries skip the network, stale ones are revalidated with
+  If-None-Match / If-Modified-Since and a 304 reuses the stored body
+- Content-hash store: page bodies are stored once per content hash,
+  together with the JD extracted from them, so an unchanged page never
+  goes through extraction (or the LLM) twice
+"""
+import asyncio
+import codecs
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import time
+import zlib
+from typing import Callable
+from urllib.parse import urlparse
+
+import httpx
+
+from config import settings
+from services.tracing import record_cache, traced
+from models.job import ResolvedJobPosting
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+_MAX_AGE_RE = re.compile(r"(?:^|,)\s*(?:s-)?max-age\s*=\s*(\d+)", re.IGNORECASE)
+
+
+class FetchedPage:
+    """A fetched (or cache-served) page."""
+
+    def __init__(
+        self,
+        url: str,
+        text: str,
+        content_hash: str,
+        from_cache: bool = False,
+        revalidated: bool = False,
+        streamed: bool = False
+    ):
+        self.url = url
+        self.text = text
+        self.content_hash = content_hash
+        self.from_cache = from_cache  # Served without downloading the body
+        self.revalidated = revalidated  # Confirmed by a 304 response
+        self.streamed = streamed  # Chunks were already passed to on_chunk
+
+
+class _CacheEntry:
+    def __init__(self, etag: str, last_modified: str, content_hash: str, fresh_until: float):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content_hash = content_hash
+        self.fresh_until = fresh_until
+
+
+class HttpCacheStore:
+    """
+    SQLite store behind the fetcher.
+
+    http_cache: per-URL validators and freshness, pointing at a content hash
+    pages: content hash → compressed body and the JD extracted from it
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._writes = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS http_cache ("
+                "url TEXT PRIMARY KEY, etag TEXT NOT NULL DEFAULT '', "
+                "last_modified TEXT NOT NULL DEFAULT '', content_hash TEXT NOT NULL, "
+                "fresh_until REAL NOT NULL, stored_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "content_hash TEXT PRIMARY KEY, body BLOB NOT NULL, "
+                "posting TEXT, stored_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def get_entry(self, url: str) -> _CacheEntry | None:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT etag, last_modified, content_hash, fresh_until FROM http_cache WHERE url = ?",
+                (url,)
+            ).fetchone()
+        return _CacheEntry(*row) if row else None
+
+    def get_body(self, content_hash: str) -> str | None:
+        with self._connect() as conn:
+            row = conn.execute("SELECT body FROM pages WHERE content_hash = ?", (content_hash,)).fetchone()
+        return zlib.decompress(row[0]).decode("utf-8") if row else None
+
+    def save(self, url: str, entry: _CacheEntry, text: str | None) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            if text is not None:
+                conn.execute(
+                    "INSERT OR IGNORE INTO pages (content_hash, body, stored_at) VALUES (?, ?, ?)",
+                    (entry.content_hash, zlib.compress(text.encode("utf-8")), now)
+                )
+            conn.execute(
+                "INSERT OR REPLACE INTO http_cache "
+                "(url, etag, last_modified, content_hash, fresh_until, stored_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (url, entry.etag, entry.last_modified, entry.content_hash, entry.fresh_until, now)
+            )
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self.purge()
+
+    def refresh(self, url: str, fresh_until: float) -> None:
+        """Record a successful revalidation."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE http_cache SET fresh_until = ?, stored_at = ? WHERE url = ?",
+                (fresh_until, time.time(), url)
+            )
+
+    def get_posting(self, content_hash: str) -> ResolvedJobPosting | None:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT posting FROM pages WHERE content_hash = ?", (content_hash,)
+            ).fetchone()
+        if not row or not row[0]:
+            return None
+        return ResolvedJobPosting.model_validate_json(row[0])
+
+    def save_posting(self, content_hash: str, posting: ResolvedJobPosting) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE pages SET posting = ? WHERE content_hash = ?",
+                (posting.model_dump_json(), content_hash)
+            )
+
+    def purge(self) -> None:
+        """Drop entries older than FETCH_CACHE_TTL_SECONDS and unreferenced pages."""
+        cutoff = time.time() - settings.FETCH_CACHE_TTL_SECONDS
+        with self._connect() as conn:
+            conn.execute("DELETE FROM http_cache WHERE stored_at < ?", (cutoff,))
+            conn.execute(
+                "DELETE FROM pages WHERE content_hash NOT IN (SELECT content_hash FROM http_cache)"
+            )
+
+
+def _freshness(headers: httpx.Headers) -> tuple[bool, float]:
+    """
+    (storable, seconds fresh) from the response headers.
+
+    Without explicit max-age, pages are treated as fresh for
+    FETCH_CACHE_DEFAULT_MAX_AGE_SECONDS; job postings rarely change.
+    """
+    cache_control = headers.get("cache-control", "").lower()
+    if "no-store" in cache_control:
+        return False, 0.0
+    if "no-cache" in cache_control:
+        return True, 0.0
+    m = _MAX_AGE_RE.search(cache_control)
+    if m:
+        return True, float(m.group(1))
+    return True, float(settings.FETCH_CACHE_DEFAULT_MAX_AGE_SECONDS)
+
+
+class HttpFetcher:
+    """Pooled, host-limited, size-capped, caching HTTP fetcher."""
+
+    def __init__(self, cache: HttpCacheStore | None):
+        self.cache = cache
+        self._client: httpx.AsyncClient | None = None
+        self._client_loop: asyncio.AbstractEventLoop | None = None
+        self._host_limits: dict[str, asyncio.Semaphore] = {}
+
+        # Counters for logs
+        self.network_fetches = 0
+        self.cache_hits = 0
+        self.revalidations = 0
+        self.aborted_oversize = 0
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # The client is bound to the loop that created it (API process vs. standalone worker)
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                timeout=settings.FETCH_TIMEOUT_SECONDS,
+                follow_redirects=True,
+                headers={"User-Agent": USER_AGENT},
+                limits=httpx.Limits(
+                    max_connections=settings.FETCH_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.FETCH_MAX_CONNECTIONS
+                )
+            )
+            self._client_loop = loop
+            self._host_limits = {}
+        return self._client
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc.lower()
+        semaphore = self._host_limits.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(settings.FETCH_PER_HOST_CONCURRENCY)
+            self._host_limits[host] = semaphore
+        return semaphore
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @traced("fetch", provider="http")
+    async def get_json(self, url: str, method: str = "GET", json_body: dict | None = None) -> dict:
+        """
+        Fetch a JSON API response through the shared client (not cached).
+
+        Raises:
+            ValueError: If the request fails, is too large or is not JSON
+        """
+        client = self._get_client()
+        try:
+            async with self._host_limit(url):
+                async with client.stream(
+                    method, url, json=json_body, headers={"Accept": "application/json"}
+                ) as response:
+                    response.raise_for_status()
+                    body = await self._read_capped(response, None, None)
+            self.network_fetches += 1
+            return json.loads(body)
+        except ValueError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Failed to fetch {url}: {e}")
+
+    async def _read_capped(
+        self,
+        response: httpx.Response,
+        hasher,
+        on_chunk: Callable[[str], None] | None
+    ) -> str:
+        """Read the body incrementally, aborting once it exceeds FETCH_MAX_BYTES."""
+        max_bytes = settings.FETCH_MAX_BYTES
+        declared = response.headers.get("content-length")
+        if declared and declared.isdigit() and int(declared) > max_bytes:
+            self.aborted_oversize += 1
+            raise ValueError(f"Page too large ({declared} bytes, limit {max_bytes})")
+
+        decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+        parts: list[str] = []
+        received = 0
+        async for raw in response.aiter_bytes():
+            received += len(raw)
+            if received > max_bytes:
+                self.aborted_oversize += 1
+                raise ValueError(f"Page too large (over {max_bytes} bytes)")
+            if hasher is not None:
+                hasher.update(raw)
+            chunk = decoder.decode(raw)
+            if chunk:
+                parts.append(chunk)
+                if on_chunk:
+                    on_chunk(chunk)
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            parts.append(tail)
+            if on_chunk:
+                on_chunk(tail)
+        return "".join(parts)
+
+    @traced("fetch", provider="http")
+    async def fetch(self, url: str, on_chunk: Callable[[str], None] | None = None) -> FetchedPage:
+        """
+        Fetch a page as text.
+
+        Args:
+            url: Page URL
+            on_chunk: Called with each decoded chunk as it downloads. Not
+                called when the body comes from the cache (page.streamed is
+                False then; use page.text).
+
+        Returns:
+            FetchedPage
+
+        Raises:
+            ValueError: If the fetch fails or the page exceeds FETCH_MAX_BYTES
+        """
+        entry = None
+        if self.cache:
+            entry = await asyncio.to_thread(self.cache.get_entry, url)
+            if entry and entry.fresh_until > time.time():
+                text = await asyncio.to_thread(self.cache.get_body, entry.content_hash)
+                if text is not None:
+                    self.cache_hits += 1
+                    record_cache(hits=1)
+                    return FetchedPage(url, text, entry.content_hash, from_cache=True)
+                entry = None
+
+        headers = {}
+        if entry:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        client = self._get_client()
+        try:
+            async with self._host_limit(url):
+                async with client.stream("GET", url, headers=headers) as response:
+                    if response.status_code == 304 and entry:
+                        _, max_age = _freshness(response.headers)
+                        text = await asyncio.to_thread(self.cache.get_body, entry.content_hash)
+                        if text is not None:
+                            self.revalidations += 1
+                            record_cache(hits=1)
+                            await asyncio.to_thread(self.cache.refresh, url, time.time() + max_age)
+                            return FetchedPage(url, text, entry.content_hash, from_cache=True, revalidated=True)
+                        raise ValueError("Cached body missing for 304 response")
+
+                    response.raise_for_status()
+                    hasher = hashlib.sha256()
+                    text = await self._read_capped(response, hasher, on_chunk)
+                    response_headers = response.headers
+        except ValueError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Failed to fetch URL: {e}")
+
+        self.network_fetches += 1
+        content_hash = hasher.hexdigest()
+
+        if self.cache:
+            record_cache(misses=1)
+            storable, max_age = _freshness(response_headers)
+            if storable:
+                new_entry = _CacheEntry(
+                    etag=response_headers.get("etag", ""),
+                    last_modified=response_headers.get("last-modified", ""),
+                    content_hash=content_hash,
+                    fresh_until=time.time() + max_age
+                )
+                await asyncio.to_thread(self.cache.save, url, new_entry, text)
+
+        return FetchedPage(url, text, content_hash, streamed=on_chunk is not None)
+
+    async def get_posting(self, content_hash: str) -> ResolvedJobPosting | None:
+        """JD previously extracted from a page with this content."""
+        if not self.cache:
+            return None
+        return await asyncio.to_thread(self.cache.get_posting, content_hash)
+
+    async def save_posting(self, content_hash: str, posting: ResolvedJobPosting) -> None:
+        """Remember the JD extracted from a page with this content."""
+        if self.cache:
+            await asyncio.to_thread(self.cache.save_posting, content_hash, posting)
+
+
+# Singleton instance
+http_fetcher = HttpFetcher(
+    HttpCacheStore(settings.FETCH_CACHE_SQLITE_PATH) if settings.FETCH_CACHE_ENABLED else None
+)
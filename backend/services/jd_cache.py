@@ -0,0 +1,255 @@
+"""Cross-user cache for JD analyses with near-duplicate detection.
+
+Lookups try, in order:
+1. Exact match on a hash of the normalized JD text (case, whitespace and
+   most punctuation differences ignored; C, C++, C# and .NET stay distinct)
+2. Near-duplicate match through a MinHash/LSH index over word shingles, so
+   the same posting pasted with a tracking footer, a missing line or
+   reordered bullets reuses the existing analysis
+
+Every entry keeps provenance: how it was first analyzed, and how many
+exact and near-duplicate hits it has served.
+"""
+import hashlib
+import re
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from config import settings
+
+
+# "+", "#" and "." stay inside tokens: C, C++ and C# (or .NET and NET) are different skills
+_WORD_RE = re.compile(r"[\w+#.]+", re.UNICODE)
+
+# Mersenne prime for the MinHash permutations; a * x + b stays below 2**63
+_MERSENNE_PRIME = (1 << 31) - 1
+
+
+def normalize_jd_text(text: str) -> str:
+    """
+    Lowercased words only, one non-empty line per source line.
+
+    Ignores whitespace, punctuation and bullet glyphs, except "+", "#" and
+    "." within a token (trailing dots are sentence punctuation); line
+    breaks are kept so shingles never span two bullets.
+    """
+    lines = (
+        " ".join(token for token in (t.rstrip(".") for t in _WORD_RE.findall(line)) if token)
+        for line in text.lower().splitlines()
+    )
+    return "\n".join(line for line in lines if line)
+
+
+class MinHasher:
+    """MinHash signatures over word shingles, vectorized with numpy."""
+
+    def __init__(self, num_perm: int, shingle_size: int, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self._a = rng.integers(1, _MERSENNE_PRIME, size=num_perm, dtype=np.int64)
+        self._b = rng.integers(0, _MERSENNE_PRIME, size=num_perm, dtype=np.int64)
+
+    def shingles(self, normalized: str) -> set[str]:
+        """Word n-grams within each line, so reordered bullets shingle identically."""
+        n = self.shingle_size
+        result: set[str] = set()
+        for line in normalized.split("\n"):
+            words = line.split()
+            if len(words) <= n:
+                result.add(line)
+            else:
+                result.update(" ".join(words[i:i + n]) for i in range(len(words) - n + 1))
+        return result
+
+    def signature(self, normalized: str) -> np.ndarray:
+        shingles = self.shingles(normalized)
+        if not shingles:
+            return np.full(self.num_perm, _MERSENNE_PRIME, dtype=np.int64)
+        hashes = np.fromiter(
+            (
+                int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little")
+                % _MERSENNE_PRIME
+                for s in shingles
+            ),
+            dtype=np.int64,
+            count=len(shingles)
+        )
+        # (num_perm, num_shingles) permuted hashes, min over shingles
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE_PRIME
+        return permuted.min(axis=1)
+
+    @staticmethod
+    def similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+        """Estimated Jaccard similarity of the two shingle sets."""
+        return float(np.mean(sig_a == sig_b))
+
+
+class JDCacheEntry:
+    """One cached analysis plus its provenance."""
+
+    def __init__(self, key: str, analysis: dict, signature: np.ndarray, words: int):
+        self.key = key
+        self.analysis = analysis
+        self.signature = signature
+        self.words = words
+        self.created_at = time.time()
+        self.expires_at = self.created_at + settings.JD_CACHE_TTL_SECONDS
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.last_hit_at = 0.0
+
+    def provenance(self) -> dict:
+        return {
+            "key": self.key[:16],
+            "created_at": self.created_at,
+            "words": self.words,
+            "exact_hits": self.exact_hits,
+            "near_duplicate_hits": self.near_hits,
+            "last_hit_at": self.last_hit_at,
+        }
+
+
+class JDCacheHit:
+    """Result of a lookup: where the analysis came from and how close it was."""
+
+    def __init__(self, entry: JDCacheEntry, match: str, similarity: float):
+        self.entry = entry
+        self.analysis = entry.analysis
+        self.match = match  # "exact" | "near_duplicate" | "analyzed" (fresh LLM call)
+        self.similarity = similarity
+
+    def provenance(self) -> dict:
+        return {
+            "match": self.match,
+            "similarity": round(self.similarity, 4),
+            **self.entry.provenance()
+        }
+
+
+class JDAnalysisCache:
+    """
+    LRU cache of JD analyses with an LSH index for near-duplicates.
+
+    The LSH index splits each signature into `bands` bands of `rows`
+    values; texts sharing any band become candidates and are verified
+    against the similarity threshold. Not thread-safe by design: every
+    caller lives on the asyncio event loop.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        similarity_threshold: float,
+        num_perm: int = 128,
+        bands: int = 32,
+        shingle_size: int = 3
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm, shingle_size)
+        self._entries: OrderedDict[str, JDCacheEntry] = OrderedDict()
+        self._buckets: dict[tuple[int, bytes], set[str]] = {}
+
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(self.bands):
+            start = band * self.rows
+            yield band, signature[start:start + self.rows].tobytes()
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for band_key in self._band_keys(entry.signature):
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band_key]
+
+    def _live(self, key: str) -> JDCacheEntry | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.time():
+            self._remove(key)
+            return None
+        return entry
+
+    def lookup(self, key: str, signature: np.ndarray) -> JDCacheHit | None:
+        """Exact hash first, then the best LSH candidate above the threshold."""
+        entry = self._live(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            entry.exact_hits += 1
+            entry.last_hit_at = time.time()
+            self.exact_hits += 1
+            return JDCacheHit(entry, "exact", 1.0)
+
+        candidates: set[str] = set()
+        for band_key in self._band_keys(signature):
+            candidates.update(self._buckets.get(band_key, ()))
+
+        best, best_similarity = None, 0.0
+        for candidate_key in candidates:
+            candidate = self._live(candidate_key)
+            if candidate is None:
+                continue
+            similarity = MinHasher.similarity(signature, candidate.signature)
+            if similarity > best_similarity:
+                best, best_similarity = candidate, similarity
+
+        if best is not None and best_similarity >= self.similarity_threshold:
+            self._entries.move_to_end(best.key)
+            best.near_hits += 1
+            best.last_hit_at = time.time()
+            self.near_hits += 1
+            return JDCacheHit(best, "near_duplicate", best_similarity)
+
+        self.misses += 1
+        return None
+
+    def store(self, key: str, signature: np.ndarray, analysis: dict, words: int) -> JDCacheEntry:
+        self._remove(key)
+        entry = JDCacheEntry(key, analysis, signature, words)
+        self._entries[key] = entry
+        for band_key in self._band_keys(signature):
+            self._buckets.setdefault(band_key, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+        return entry
+
+    def stats(self, top: int = 10) -> dict:
+        lookups = self.exact_hits + self.near_hits + self.misses
+        popular = sorted(
+            self._entries.values(),
+            key=lambda e: e.exact_hits + e.near_hits,
+            reverse=True
+        )[:top]
+        return {
+            "entries": len(self._entries),
+            "lookups": lookups,
+            "exact_hits": self.exact_hits,
+            "near_duplicate_hits": self.near_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.exact_hits + self.near_hits) / lookups, 4) if lookups else 0.0,
+            "similarity_threshold": self.similarity_threshold,
+            "most_reused": [entry.provenance() for entry in popular],
+        }
+
+
+# Singleton instance
+jd_analysis_cache = JDAnalysisCache(
+    max_entries=settings.JD_CACHE_MAX_ENTRIES,
+    similarity_threshold=settings.JD_CACHE_SIMILARITY_THRESHOLD
+)
@@ -0,0 +1,269 @@
+"""Durable queue for background pipeline jobs.
+
+Jobs move through: queued → running → succeeded | failed.
+
+- Visibility timeout: a claimed job is leased to one worker until
+  `visible_at`. Workers extend the lease while they run; if a worker dies,
+  the lease lapses and another worker re-claims the job.
+- Retries: failed attempts are re-queued with exponential backoff until
+  `max_attempts` is reached.
+- Result TTL: finished jobs are purged `JOB_RESULT_TTL_SECONDS` after
+  completion.
+
+SQLite is the first backend; other backends implement QueueBackend.
+"""
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+import uuid
+
+import orjson
+
+from config import settings
+from models.pipeline import PipelineJobStatus
+
+logger = logging.getLogger(__name__)
+
+
+class QueuedJob:
+    """A job claimed by a worker."""
+
+    def __init__(self, id: str, pipeline: str, payload: dict, attempts: int, max_attempts: int):
+        self.id = id
+        self.pipeline = pipeline
+        self.payload = payload
+        self.attempts = attempts
+        self.max_attempts = max_attempts
+
+
+class QueueBackend:
+    """Interface implemented by every job queue backend."""
+
+    async def enqueue(self, pipeline: str, payload: dict, max_attempts: int, user_id: str = "") -> str:
+        """Queue a job; user_id is the signed-in submitter ("" for anonymous jobs)."""
+        raise NotImplementedError
+
+    async def claim(self, worker_id: str, visibility_timeout: float) -> QueuedJob | None:
+        raise NotImplementedError
+
+    async def extend(self, job_id: str, worker_id: str, visibility_timeout: float) -> bool:
+        raise NotImplementedError
+
+    async def complete(self, job_id: str, worker_id: str, result: dict, result_ttl: float) -> None:
+        raise NotImplementedError
+
+    async def fail(
+        self, job_id: str, worker_id: str, error: str, retry_delay: float, result_ttl: float, retry: bool = True
+    ) -> bool:
+        """Requeue the job after retry_delay (returns True), or mark it failed once out of attempts or retry=False."""
+        raise NotImplementedError
+
+    async def get(self, job_id: str) -> PipelineJobStatus | None:
+        raise NotImplementedError
+
+    async def purge_expired(self) -> int:
+        raise NotImplementedError
+
+
+class SQLiteQueueBackend(QueueBackend):
+    """
+    SQLite-backed queue.
+
+    Claims run inside `BEGIN IMMEDIATE` transactions, so several worker
+    processes on one machine can share the same database file safely.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS pipeline_jobs ("
+                "id TEXT PRIMARY KEY, pipeline TEXT NOT NULL, payload TEXT NOT NULL, "
+                "status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, "
+                "max_attempts INTEGER NOT NULL, visible_at REAL NOT NULL, lease_owner TEXT, "
+                "result TEXT, error TEXT NOT NULL DEFAULT '', created_at REAL NOT NULL, "
+                "updated_at REAL NOT NULL, expires_at REAL, user_id TEXT NOT NULL DEFAULT '')"
+            )
+            # Databases created before jobs recorded their submitter
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(pipeline_jobs)")}
+            if "user_id" not in columns:
+                conn.execute("ALTER TABLE pipeline_jobs ADD COLUMN user_id TEXT NOT NULL DEFAULT ''")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_pipeline_jobs_ready "
+                "ON pipeline_jobs(status, visible_at)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _enqueue_sync(self, pipeline: str, payload: dict, max_attempts: int, user_id: str) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO pipeline_jobs (id, pipeline, payload, status, max_attempts, "
+                "visible_at, created_at, updated_at, user_id) VALUES (?, ?, ?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, pipeline, orjson.dumps(payload).decode(), max_attempts, now, now, now, user_id)
+            )
+        return job_id
+
+    def _claim_sync(self, worker_id: str, visibility_timeout: float) -> QueuedJob | None:
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            while True:
+                row = conn.execute(
+                    "SELECT id, pipeline, payload, attempts, max_attempts FROM pipeline_jobs "
+                    "WHERE status IN ('queued', 'running') AND visible_at <= ? "
+                    "ORDER BY created_at LIMIT 1",
+                    (now,)
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+
+                job_id, pipeline, payload, attempts, max_attempts = row
+                if attempts >= max_attempts:
+                    # Lease lapsed on the final attempt (worker crashed or hung)
+                    conn.execute(
+                        "UPDATE pipeline_jobs SET status = 'failed', lease_owner = NULL, "
+                        "error = 'Worker lease expired on final attempt', updated_at = ?, "
+                        "expires_at = ? WHERE id = ?",
+                        (now, now + settings.JOB_RESULT_TTL_SECONDS, job_id)
+                    )
+                    continue
+
+                conn.execute(
+                    "UPDATE pipeline_jobs SET status = 'running', attempts = attempts + 1, "
+                    "lease_owner = ?, visible_at = ?, updated_at = ? WHERE id = ?",
+                    (worker_id, now + visibility_timeout, now, job_id)
+                )
+                conn.execute("COMMIT")
+                return QueuedJob(job_id, pipeline, orjson.loads(payload), attempts + 1, max_attempts)
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _extend_sync(self, job_id: str, worker_id: str, visibility_timeout: float) -> bool:
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE pipeline_jobs SET visible_at = ?, updated_at = ? "
+                "WHERE id = ? AND status = 'running' AND lease_owner = ?",
+                (now + visibility_timeout, now, job_id, worker_id)
+            )
+        return cursor.rowcount == 1
+
+    def _complete_sync(self, job_id: str, worker_id: str, result: dict, result_ttl: float) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE pipeline_jobs SET status = 'succeeded', result = ?, error = '', "
+                "lease_owner = NULL, updated_at = ?, expires_at = ? "
+                "WHERE id = ? AND status = 'running' AND lease_owner = ?",
+                (orjson.dumps(result).decode(), now, now + result_ttl, job_id, worker_id)
+            )
+
+    def _fail_sync(
+        self, job_id: str, worker_id: str, error: str, retry_delay: float, result_ttl: float, retry: bool
+    ) -> bool:
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM pipeline_jobs "
+                "WHERE id = ? AND status = 'running' AND lease_owner = ?",
+                (job_id, worker_id)
+            ).fetchone()
+            if row is None:
+                return False
+
+            attempts, max_attempts = row
+            if retry and attempts < max_attempts:
+                conn.execute(
+                    "UPDATE pipeline_jobs SET status = 'queued', error = ?, lease_owner = NULL, "
+                    "visible_at = ?, updated_at = ? WHERE id = ?",
+                    (error, now + retry_delay, now, job_id)
+                )
+                return True
+
+            conn.execute(
+                "UPDATE pipeline_jobs SET status = 'failed', error = ?, lease_owner = NULL, "
+                "updated_at = ?, expires_at = ? WHERE id = ?",
+                (error, now, now + result_ttl, job_id)
+            )
+            return False
+
+    def _get_sync(self, job_id: str) -> PipelineJobStatus | None:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, pipeline, status, attempts, max_attempts, result, error, "
+                "created_at, updated_at, expires_at, user_id FROM pipeline_jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None or (row[9] is not None and row[9] <= time.time()):
+            return None
+        return PipelineJobStatus(
+            id=row[0],
+            pipeline=row[1],
+            status=row[2],
+            attempts=row[3],
+            max_attempts=row[4],
+            result=orjson.loads(row[5]) if row[5] else None,
+            error=row[6],
+            created_at=row[7],
+            updated_at=row[8],
+            user_id=row[10]
+        )
+
+    def _purge_sync(self) -> int:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "DELETE FROM pipeline_jobs WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time(),)
+            )
+        return cursor.rowcount
+
+    async def enqueue(self, pipeline: str, payload: dict, max_attempts: int, user_id: str = "") -> str:
+        return await asyncio.to_thread(self._enqueue_sync, pipeline, payload, max_attempts, user_id)
+
+    async def claim(self, worker_id: str, visibility_timeout: float) -> QueuedJob | None:
+        return await asyncio.to_thread(self._claim_sync, worker_id, visibility_timeout)
+
+    async def extend(self, job_id: str, worker_id: str, visibility_timeout: float) -> bool:
+        return await asyncio.to_thread(self._extend_sync, job_id, worker_id, visibility_timeout)
+
+    async def complete(self, job_id: str, worker_id: str, result: dict, result_ttl: float) -> None:
+        await asyncio.to_thread(self._complete_sync, job_id, worker_id, result, result_ttl)
+
+    async def fail(
+        self, job_id: str, worker_id: str, error: str, retry_delay: float, result_ttl: float, retry: bool = True
+    ) -> bool:
+        return await asyncio.to_thread(self._fail_sync, job_id, worker_id, error, retry_delay, result_ttl, retry)
+
+    async def get(self, job_id: str) -> PipelineJobStatus | None:
+        return await asyncio.to_thread(self._get_sync, job_id)
+
+    async def purge_expired(self) -> int:
+        return await asyncio.to_thread(self._purge_sync)
+
+
+def _build_backend() -> QueueBackend:
+    """Select the queue backend from settings."""
+    backend = settings.JOB_QUEUE_BACKEND.lower()
+    if backend != "sqlite":
+        logger.warning(f"Unknown JOB_QUEUE_BACKEND '{settings.JOB_QUEUE_BACKEND}', using sqlite")
+    return SQLiteQueueBackend(settings.JOB_QUEUE_SQLITE_PATH)
+
+
+# Singleton instance
+job_queue = _build_backend()
@@ -0,0 +1,190 @@
+"""Worker pool that runs queued pipeline jobs.
+
+Runs inside the API process (JOB_WORKERS tasks, started on app startup) or
+standalone so workers scale independently of the API:
+
+    python -m services.job_worker --workers 4
+"""
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import uuid
+
+import httpx
+
+from config import settings
+from services.job_queue import QueueBackend, QueuedJob, job_queue
+from services.pipelines import PIPELINES, USAGE_PAYLOAD_KEY
+from services.usage import request_usage, set_usage_user
+
+logger = logging.getLogger(__name__)
+
+# Queue writes (complete/fail) are retried this many times before giving up
+QUEUE_WRITE_ATTEMPTS = 3
+
+# Errors worth retrying a job for; anything else raised as a ValueError is permanent
+TRANSIENT_ERRORS = (httpx.HTTPError, OSError, asyncio.TimeoutError)
+
+
+def is_permanent_failure(error: Exception) -> bool:
+    """
+    Whether retrying the job cannot help.
+
+    Agents raise ValueError both for bad input and to wrap provider
+    failures (`raise ValueError(...)` inside `except`); a ValueError is
+    permanent unless a transient error is in its cause/context chain.
+    """
+    if not isinstance(error, ValueError):
+        return False
+    cause = error.__cause__ or error.__context__
+    while cause is not None:
+        if isinstance(cause, TRANSIENT_ERRORS):
+            return False
+        cause = cause.__cause__ or cause.__context__
+    return True
+
+
+class JobWorkerPool:
+    """A fixed number of asyncio worker tasks polling the job queue."""
+
+    def __init__(self, queue: QueueBackend, concurrency: int):
+        self.queue = queue
+        self.concurrency = concurrency
+        self._tasks: list[asyncio.Task] = []
+        self._stopping = asyncio.Event()
+        self._prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+    def start(self) -> None:
+        """Spawn the worker tasks."""
+        for index in range(self.concurrency):
+            worker_id = f"{self._prefix}:{index}:{uuid.uuid4().hex[:6]}"
+            self._tasks.append(asyncio.create_task(self._worker_loop(worker_id)))
+        logger.info(f"Started {self.concurrency} pipeline job workers")
+
+    async def stop(self) -> None:
+        """Stop polling and cancel in-flight jobs (their leases will lapse)."""
+        self._stopping.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def _worker_loop(self, worker_id: str) -> None:
+        polls = 0
+        while not self._stopping.is_set():
+            try:
+                job = await self.queue.claim(worker_id, settings.JOB_VISIBILITY_TIMEOUT_SECONDS)
+            except Exception as e:
+                logger.error(f"Worker {worker_id} failed to claim a job: {e}")
+                job = None
+
+            if job is None:
+                polls += 1
+                if polls % 60 == 0:
+                    try:
+                        await self.queue.purge_expired()
+                    except Exception as e:
+                        logger.error(f"Worker {worker_id} failed to purge expired jobs: {e}")
+                await asyncio.sleep(settings.JOB_POLL_INTERVAL_SECONDS)
+                continue
+
+            try:
+                await self._run_job(worker_id, job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Never let one job (or a queue error) end the worker task
+                logger.exception(f"Worker {worker_id} failed handling job {job.id}: {e}")
+
+    async def _write_with_retries(self, description: str, write) -> bool:
+        """Run a queue write, retrying transient errors (e.g. "database is locked"); False if it never succeeded."""
+        for attempt in range(1, QUEUE_WRITE_ATTEMPTS + 1):
+            try:
+                await write()
+                return True
+            except Exception as e:
+                if attempt == QUEUE_WRITE_ATTEMPTS:
+                    # The lease lapses and the job is claimed again
+                    logger.error(f"Failed to {description} after {attempt} attempts: {e}")
+                    return False
+                logger.warning(f"Failed to {description} (attempt {attempt}), retrying: {e}")
+                await asyncio.sleep(0.5 * 2 ** (attempt - 1))
+
+    async def _heartbeat(self, worker_id: str, job: QueuedJob) -> None:
+        """Keep extending the lease while the pipeline runs."""
+        interval = settings.JOB_VISIBILITY_TIMEOUT_SECONDS / 3
+        delay = interval
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                extended = await self.queue.extend(job.id, worker_id, settings.JOB_VISIBILITY_TIMEOUT_SECONDS)
+            except Exception as e:
+                # Retry well before the lease runs out instead of letting it lapse
+                delay = min(interval, 2.0)
+                logger.warning(f"Failed to extend lease on job {job.id}, retrying in {delay}s: {e}")
+                continue
+            if not extended:
+                logger.warning(f"Lost lease on job {job.id}")
+                return
+            delay = interval
+
+    async def _run_job(self, worker_id: str, job: QueuedJob) -> None:
+        pipeline = PIPELINES.get(job.pipeline)
+        heartbeat = asyncio.create_task(self._heartbeat(worker_id, job))
+        try:
+            if pipeline is None:
+                raise ValueError(f"Unknown pipeline: {job.pipeline}")
+            logger.info(f"Running job {job.id} ({job.pipeline}), attempt {job.attempts}/{job.max_attempts}")
+            attribution = job.payload.pop(USAGE_PAYLOAD_KEY, None) or {}
+            with request_usage(request_id=attribution.get("request_id", ""), route=attribution.get("route", "")):
+                set_usage_user(attribution.get("user_id", ""))
+                result = await pipeline.run(job.payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            retry = not is_permanent_failure(e)
+            retry_delay = settings.JOB_RETRY_BACKOFF_SECONDS * (2 ** (job.attempts - 1))
+            requeued = False
+
+            async def fail():
+                nonlocal requeued
+                requeued = await self.queue.fail(
+                    job.id, worker_id, str(e), retry_delay, settings.JOB_RESULT_TTL_SECONDS, retry=retry
+                )
+
+            await self._write_with_retries(f"record failure of job {job.id}", fail)
+            logger.warning(
+                f"Job {job.id} failed: {e} "
+                f"({'retrying in ' + str(retry_delay) + 's' if requeued else 'giving up'})"
+            )
+        else:
+            if await self._write_with_retries(
+                f"complete job {job.id}",
+                lambda: self.queue.complete(job.id, worker_id, result, settings.JOB_RESULT_TTL_SECONDS)
+            ):
+                logger.info(f"Job {job.id} succeeded")
+        finally:
+            heartbeat.cancel()
+
+
+async def _run_standalone(concurrency: int) -> None:
+    pool = JobWorkerPool(job_queue, concurrency)
+    pool.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await pool.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run pipeline job workers")
+    parser.add_argument("--workers", type=int, default=max(settings.JOB_WORKERS, 1))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_run_standalone(args.workers))
+    except KeyboardInterrupt:
+        pass
@@ -2,13 +2,72 @@
 import json
 import httpx
 import logging
-from typing import Any
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
 
 from config import settings
+from services.tracing import current_agent, span
+from services.usage import LLMCall, usage_ledger
 
 logger = logging.getLogger(__name__)
 
 
+class TokenMeter:
+    """Accumulates provider-reported token usage for a unit of work."""
+    
+    def __init__(self):
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.calls = 0
+    
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+    
+    def add(self, usage: dict) -> None:
+        self.prompt_tokens += usage.get("prompt_tokens", 0) or 0
+        self.completion_tokens += usage.get("completion_tokens", 0) or 0
+        self.calls += 1
+
+
+# Meters active in the current task; nested meters all receive every call
+_active_meters: ContextVar[tuple[TokenMeter, ...]] = ContextVar("active_token_meters", default=())
+
+
+@contextmanager
+def meter_tokens() -> Iterator[TokenMeter]:
+    """
+    Count tokens used by LLM calls made inside this block.
+    
+    Scoped to the current asyncio task (and tasks it spawns).
+    """
+    meter = TokenMeter()
+    reset_token = _active_meters.set(_active_meters.get() + (meter,))
+    try:
+        yield meter
+    finally:
+        _active_meters.reset(reset_token)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count for sizing prompts before sending them.
+    
+    About four characters per token for English text; provider-reported
+    usage (TokenMeter) remains the source of truth.
+    """
+    return (len(text) + 3) // 4
+
+
+def _record_usage(data: dict) -> None:
+    """Feed the provider's usage block to every active meter."""
+    usage = data.get("usage") or {}
+    for meter in _active_meters.get():
+        meter.add(usage)
+
+
 class LLMService:
     """Async LLM client with automatic failover between providers."""
     
@@ -53,14 +112,35 @@ class LLMService:
         if json_mode:
             payload["response_format"] = {"type": "json_object"}
         
-        async with httpx.AsyncClient(timeout=90.0) as client:
-            response = await client.post(
-                f"{base_url}/chat/completions",
-                headers=headers,
-                json=payload
-            )
-            response.raise_for_status()
-            return response.json()
+        provider = provider_name.lower()
+        usage: dict = {}
+        status = "error"
+        started = time.perf_counter()
+        try:
+            with span("llm", provider=provider) as llm_span:
+                async with httpx.AsyncClient(timeout=90.0) as client:
+                    response = await client.post(
+                        f"{base_url}/chat/completions",
+                        headers=headers,
+                        json=payload
+                    )
+                    response.raise_for_status()
+                    data = response.json()
+                usage = data.get("usage") or {}
+                llm_span.record_usage(usage)
+                status = "ok"
+                return data
+        finally:
+            # Failed calls are recorded too: they cost latency and, past the prompt, tokens
+            usage_ledger.record(LLMCall(
+                provider=provider,
+                model=model,
+                prompt_tokens=usage.get("prompt_tokens", 0) or 0,
+                completion_tokens=usage.get("completion_tokens", 0) or 0,
+                latency_ms=(time.perf_counter() - started) * 1000,
+                status=status,
+                agent=current_agent()
+            ))
     
     async def _generate_with_fallback(
         self,
@@ -84,6 +164,7 @@ class LLMService:
                     "Groq"
                 )
                 logger.info("Groq request successful")
+                _record_usage(data)
                 return data["choices"][0]["message"]["content"]
             except httpx.HTTPStatusError as e:
                 if e.response.status_code == 429:
@@ -107,6 +188,7 @@ class LLMService:
                     "OpenRouter"
                 )
                 logger.info("OpenRouter request successful")
+                _record_usage(data)
                 return data["choices"][0]["message"]["content"]
             except Exception as e:
                 logger.error(f"OpenRouter also failed: {e}")
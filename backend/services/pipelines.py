@@ -0,0 +1,344 @@
+"""Pipeline orchestration shared by HTTP routes and background workers.
+
+Each registered pipeline pairs a payload model with an async runner, so the
+job queue can validate submissions up front and workers can run them
+without going through FastAPI.
+"""
+import asyncio
+import base64
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+from pydantic import BaseModel, model_validator
+
+from models.cv import MasterCV
+from models.job import JobAnalysis, CompanyIntelligence, ResolvedJobPosting
+from models.pipeline import FullProcessResponse, FullTailorResponse, BatchJobPosting, BatchJobResult
+from models.tailoring import TailoredResume
+from models.writing import WritingPackage
+
+from agents.cv_validator import validate_cv, get_validation_warnings
+
+from agents.url_resolver import resolve_job_posting
+from agents.jd_analyzer import analyze_job_description
+from agents.company_intel import get_company_intelligence
+
+from agents.cv_matcher import analyze_cv_job_match
+from agents.bullet_rewriter import rewrite_bullets
+from agents.resume_generator import generate_ats_resume
+
+from agents.cover_letter import generate_cover_letter
+from agents.cold_email import generate_cold_email
+from agents.company_summary import generate_company_summary
+
+from services.cv_ingest import ingest_cv_pdf
+
+
+async def prepare_master_cv(
+    cv_contents: bytes | memoryview,
+    user_id: Optional[str] = None,
+    digest: Optional[str] = None
+) -> tuple[MasterCV, list[str]]:
+    """
+    Phase 1: PDF → validated Master CV plus validation warnings.
+
+    A PDF seen before is served from the PDF cache (digest is its content
+    hash, when already computed while the upload was read). With a user id,
+    unchanged sections of the user's previous upload are reused instead of
+    re-structured.
+    """
+    # Agents 1 + 2: Extract and structure (cached by PDF content)
+    _, cv_json = await ingest_cv_pdf(cv_contents, user_id, digest)
+
+    # Agent 3: Validate
+    master_cv = validate_cv(cv_json)
+    cv_warnings = get_validation_warnings(master_cv)
+
+    return master_cv, cv_warnings
+
+
+async def resolve_jd(job_description: Optional[str], job_url: Optional[str]) -> ResolvedJobPosting:
+    """Agent 3: URL Resolver (if needed), otherwise the pasted JD text."""
+    if job_url:
+        return await resolve_job_posting(job_url)
+    return ResolvedJobPosting(jd_text=job_description)
+
+
+async def tailor_and_write(
+    master_cv: MasterCV,
+    job_analysis: JobAnalysis,
+    company_intel: CompanyIntelligence
+) -> tuple[TailoredResume, WritingPackage]:
+    """
+    Phases 3 + 4 for one job: match, rewrite, generate, then write.
+    """
+    # --- PHASE 3: Matching + Tailoring ---
+    # Agent 1: Match
+    matching_result = await analyze_cv_job_match(master_cv, job_analysis)
+
+    # Agent 2: Bullet Rewriting
+    rewritten_result = await rewrite_bullets(
+        master_cv,
+        matching_result,
+        job_analysis.keywords_for_ats
+    )
+
+    # Agent 3: Resume Generation
+    tailored_resume = await generate_ats_resume(
+        master_cv,
+        rewritten_result,
+        matching_result.matched_skills,
+        job_analysis.keywords_for_ats
+    )
+
+    # --- PHASE 4: Writing Layer ---
+    # Agent 1: Cover Letter
+    cover_letter = await generate_cover_letter(
+        tailored_resume.resume_markdown,
+        job_analysis,
+        company_intel
+    )
+
+    # Agent 2: Cold Email
+    cold_email = await generate_cold_email(
+        master_cv.summary, # Using master summary for general fit
+        job_analysis,
+        company_intel
+    )
+
+    # Agent 3: Company Summary
+    company_summary = await generate_company_summary(company_intel)
+
+    writing_package = WritingPackage(
+        cover_letter=cover_letter,
+        cold_email=cold_email,
+        company_summary=company_summary
+    )
+
+    return tailored_resume, writing_package
+
+
+async def run_full_process(
+    cv_contents: bytes | memoryview,
+    job_description: Optional[str],
+    job_url: Optional[str],
+    company_name: str
+) -> FullProcessResponse:
+    """
+    End-to-End Orchestration:
+    1. Parse PDF → Master CV
+    2. Extract Job Info (Text or URL)
+    3. Research Company
+    4. Match & Tailor Resume
+    5. Generate Cover Letter, Email, and Summary
+    """
+    # --- PHASE 1: Master CV Intelligence ---
+    master_cv, cv_warnings = await prepare_master_cv(cv_contents)
+
+    # --- PHASE 2: Job + Company Intelligence ---
+    posting = await resolve_jd(job_description, job_url)
+
+    # Agent 1: JD Analysis
+    job_analysis = await analyze_job_description(posting.jd_text, posting.analysis_hints())
+
+    # Agent 2: Company Intelligence
+    company_intel = await get_company_intelligence(company_name)
+
+    # --- PHASES 3 + 4 ---
+    tailored_resume, writing_package = await tailor_and_write(master_cv, job_analysis, company_intel)
+
+    return FullProcessResponse(
+        master_cv=master_cv,
+        job_analysis=job_analysis,
+        company_intel=company_intel,
+        tailored_resume=tailored_resume,
+        writing=writing_package,
+        warnings=cv_warnings
+    )
+
+
+class _SingleFlight:
+    """
+    Deduplicates concurrent calls by key within one batch.
+
+    The first caller for a key starts the work; later callers await the
+    same task (including its exception).
+    """
+
+    def __init__(self):
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._tasks[key] = task
+        return await asyncio.shield(task)
+
+    def cancel(self) -> None:
+        """Cancel shared work that is still running (its callers are gone)."""
+        for task in self._tasks.values():
+            if not task.done():
+                task.cancel()
+
+
+async def run_batch_process(
+    master_cv: MasterCV,
+    postings: list[BatchJobPosting],
+    max_concurrency: int
+) -> AsyncIterator[BatchJobResult]:
+    """
+    Tailor one Master CV against many postings.
+
+    Per-posting work runs with bounded concurrency. JD resolution, JD
+    analysis and company research are shared between postings with the
+    same URL, text or company name. Results are yielded as each posting
+    finishes (not in submission order).
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    jd_calls = _SingleFlight()
+    analysis_calls = _SingleFlight()
+    company_calls = _SingleFlight()
+
+    async def process_one(index: int, posting: BatchJobPosting) -> BatchJobResult:
+        async with semaphore:
+            try:
+                if not posting.job_description and not posting.job_url:
+                    raise ValueError("Either job_description or job_url must be provided")
+
+                jd_key = posting.job_url or f"text:{hash(posting.job_description)}"
+                resolved = await jd_calls.run(
+                    jd_key, lambda: resolve_jd(posting.job_description, posting.job_url)
+                )
+
+                job_analysis = await analysis_calls.run(
+                    jd_key, lambda: analyze_job_description(resolved.jd_text, resolved.analysis_hints())
+                )
+
+                company_key = " ".join(posting.company_name.lower().split())
+                company_intel = await company_calls.run(
+                    company_key, lambda: get_company_intelligence(posting.company_name)
+                )
+
+                tailored_resume, writing_package = await tailor_and_write(
+                    master_cv, job_analysis, company_intel
+                )
+
+                return BatchJobResult(
+                    index=index,
+                    status="succeeded",
+                    job_analysis=job_analysis,
+                    company_intel=company_intel,
+                    tailored_resume=tailored_resume,
+                    writing=writing_package
+                )
+            except Exception as e:
+                return BatchJobResult(index=index, status="failed", error=str(e))
+
+    tasks = [asyncio.create_task(process_one(i, p)) for i, p in enumerate(postings)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Client went away: stop the remaining postings and the shared
+        # lookups they were waiting on (shielded, so not cancelled with them)
+        for task in tasks:
+            task.cancel()
+        for calls in (jd_calls, analysis_calls, company_calls):
+            calls.cancel()
+
+
+async def run_tailoring(cv: MasterCV, job: JobAnalysis) -> FullTailorResponse:
+    """
+    Full Phase 3 pipeline: Match → Rewrite → Generate.
+    """
+    # Step 1: Match
+    matching = await analyze_cv_job_match(cv, job)
+
+    # Get job keywords
+    job_keywords = job.keywords_for_ats
+
+    # Step 2: Rewrite
+    rewritten = await rewrite_bullets(
+        cv,
+        matching,
+        job_keywords
+    )
+
+    # Step 3: Generate
+    resume = await generate_ats_resume(
+        cv,
+        rewritten,
+        matching.matched_skills,
+        job_keywords
+    )
+
+    return FullTailorResponse(
+        matching=matching,
+        rewritten=rewritten,
+        resume=resume
+    )
+
+
+# =========================================
+# Background job payloads
+# =========================================
+
+# Payload key for the submitting request's id, route and user, so LLM usage
+# of the job is attributed like the request's own (see services/usage.py)
+USAGE_PAYLOAD_KEY = "_usage"
+
+class ProcessAllPayload(BaseModel):
+    """Payload for the "process_all" pipeline (PDF sent base64-encoded)."""
+    cv_pdf_base64: str
+    job_description: Optional[str] = None
+    job_url: Optional[str] = None
+    company_name: str
+
+    @model_validator(mode="after")
+    def _require_job_source(self) -> "ProcessAllPayload":
+        if not self.job_description and not self.job_url:
+            raise ValueError("Either job_description or job_url must be provided")
+        return self
+
+
+class TailorPayload(BaseModel):
+    """Payload for the "tailor" pipeline."""
+    cv: MasterCV
+    job: JobAnalysis
+
+
+async def _process_all_job(payload: ProcessAllPayload) -> FullProcessResponse:
+    return await run_full_process(
+        base64.b64decode(payload.cv_pdf_base64),
+        payload.job_description,
+        payload.job_url,
+        payload.company_name
+    )
+
+
+async def _tailor_job(payload: TailorPayload) -> FullTailorResponse:
+    return await run_tailoring(payload.cv, payload.job)
+
+
+class Pipeline:
+    """A background-runnable pipeline: payload model + runner."""
+
+    def __init__(
+        self,
+        payload_model: type[BaseModel],
+        runner: Callable[[BaseModel], Awaitable[BaseModel]]
+    ):
+        self.payload_model = payload_model
+        self.runner = runner
+
+    async def run(self, payload: dict) -> dict:
+        """Validate the payload, run the pipeline and return a JSON-ready result."""
+        result = await self.runner(self.payload_model(**payload))
+        return result.model_dump(mode="json")
+
+
+# Pipelines that can be submitted to /api/jobs
+PIPELINES: dict[str, Pipeline] = {
+    "process_all": Pipeline(ProcessAllPayload, _process_all_job),
+    "tailor": Pipeline(TailorPayload, _tailor_job),
+}
@@ -3,8 +3,13 @@ import os
 import httpx
 import hmac
 import hashlib
+import logging
 from typing import Optional
 
+from services.tracing import traced
+
+logger = logging.getLogger(__name__)
+
 
 class PolarService:
     """Service for Polar.sh metered billing operations."""
@@ -26,6 +31,7 @@ class PolarService:
     # Meter Events (Usage Tracking)
     # =========================================
     
+    @traced("polar", provider="polar")
     async def record_usage(self, customer_id: str, quantity: int = 1) -> bool:
         """
         Record a meter event for analysis usage.
@@ -41,7 +47,7 @@ class PolarService:
             True if successful, False otherwise
         """
         if not self.api_key:
-            print("POLAR_API_KEY not set, skipping usage tracking")
+            logger.info("POLAR_API_KEY not set, skipping usage tracking")
             return True  # Allow in dev mode
         
         async with httpx.AsyncClient() as client:
@@ -56,9 +62,10 @@ class PolarService:
                 )
                 return response.status_code in (200, 201, 202)
             except Exception as e:
-                print(f"Failed to record Polar usage: {e}")
+                logger.warning(f"Failed to record Polar usage: {e}")
                 return False
     
+    @traced("polar", provider="polar")
     async def get_customer_usage(self, customer_id: str) -> dict:
         """
         Get current usage for a customer.
@@ -78,9 +85,10 @@ class PolarService:
                     return response.json()
                 return {"used": 0, "remaining": 0, "limit": 0}
             except Exception as e:
-                print(f"Failed to get Polar usage: {e}")
+                logger.warning(f"Failed to get Polar usage: {e}")
                 return {"used": 0, "remaining": 0, "limit": 0}
     
+    @traced("polar", provider="polar")
     async def check_can_analyze(self, customer_id: str) -> tuple[bool, int]:
         """
         Check if customer can perform an analysis.
@@ -96,6 +104,7 @@ class PolarService:
     # Customer Operations
     # =========================================
     
+    @traced("polar", provider="polar")
     async def create_customer(self, email: str, name: str = "") -> Optional[str]:
         """
         Create a new customer in Polar.
@@ -119,9 +128,10 @@ class PolarService:
                     return response.json().get("id")
                 return None
             except Exception as e:
-                print(f"Failed to create Polar customer: {e}")
+                logger.warning(f"Failed to create Polar customer: {e}")
                 return None
     
+    @traced("polar", provider="polar")
     async def get_customer(self, customer_id: str) -> Optional[dict]:
         """Get customer details from Polar."""
         if not self.api_key:
@@ -137,7 +147,7 @@ class PolarService:
                     return response.json()
                 return None
             except Exception as e:
-                print(f"Failed to get Polar customer: {e}")
+                logger.warning(f"Failed to get Polar customer: {e}")
                 return None
     
     # =========================================
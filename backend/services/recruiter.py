@@ -0,0 +1,150 @@
+"""Recruiter mode: rank many CVs against one job.
+
+1. Ingest every CV (PDF → structured Master CV) through the shared PDF cache
+2. Score all candidates locally in one vectorized pass
+3. Run the LLM matcher on the top-K only
+
+`rank_candidates` yields progress events as it goes so routes can stream
+them to the client.
+"""
+import asyncio
+from typing import AsyncIterator
+
+from config import settings
+from models.cv import MasterCV
+from models.job import JobAnalysis
+from models.recruiter import CandidateScore, RankedCandidate, CandidateIngestError
+from agents.cv_validator import validate_cv
+from agents.cv_matcher import analyze_cv_job_match
+from agents.candidate_ranker import score_candidates
+from services import cv_ingest
+from services.cv_ingest import ingest_cv_pdf
+
+
+async def ingest_cv(contents: bytes | memoryview) -> MasterCV:
+    """
+    PDF bytes → validated Master CV.
+
+    Extraction and structuring go through the shared PDF cache, so the
+    same PDF uploaded again (e.g. re-screening for another opening, or a
+    file the candidate already uploaded themselves) skips PyMuPDF and the
+    structuring LLM call. Concurrent uploads of one file share a single run.
+    """
+    _, cv_json = await ingest_cv_pdf(contents)
+    return validate_cv(cv_json)
+
+
+def _fit_score(candidate: RankedCandidate) -> int:
+    if not candidate.match or not candidate.match.relevant_experience:
+        return 0
+    return max(exp.relevance_score for exp in candidate.match.relevant_experience)
+
+
+async def rank_candidates(
+    files: list[tuple[str, bytes | memoryview]],
+    job: JobAnalysis,
+    top_k: int
+) -> AsyncIterator[dict]:
+    """
+    Rank uploaded CVs against a job, yielding progress events.
+
+    Args:
+        files: (filename, PDF bytes or spooled view) per candidate, in upload order
+        job: Job analysis JSON
+        top_k: How many of the best local scores go to the LLM matcher
+
+    Yields:
+        {"type": "progress", "stage": "ingest" | "match", ...} per finished item,
+        {"type": "scores", "candidates": [...]} once local scoring is done,
+        {"type": "done", "shortlist": [...], "failed": [...]} at the end
+    """
+    total = len(files)
+    ingest_semaphore = asyncio.Semaphore(settings.RECRUITER_INGEST_CONCURRENCY)
+    cache_hits_before = cv_ingest.cv_cache_hits
+
+    async def ingest_one(index: int, filename: str, contents: bytes | memoryview):
+        async with ingest_semaphore:
+            try:
+                return index, filename, await ingest_cv(contents), ""
+            except Exception as e:
+                return index, filename, None, str(e)
+
+    # --- Stage 1: Ingest ---
+    ingested: list[tuple[int, str, MasterCV]] = []
+    failed: list[CandidateIngestError] = []
+    tasks = [
+        asyncio.create_task(ingest_one(i, filename, contents))
+        for i, (filename, contents) in enumerate(files)
+    ]
+    try:
+        for completed, next_done in enumerate(asyncio.as_completed(tasks), start=1):
+            index, filename, cv, error = await next_done
+            if cv is None:
+                failed.append(CandidateIngestError(index=index, filename=filename, error=error))
+            else:
+                ingested.append((index, filename, cv))
+            yield {
+                "type": "progress",
+                "stage": "ingest",
+                "completed": completed,
+                "total": total,
+                "index": index,
+                "filename": filename,
+                "error": error
+            }
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    ingested.sort(key=lambda item: item[0])
+    failed.sort(key=lambda item: item.index)
+
+    # --- Stage 2: Local vectorized scoring ---
+    scores: list[CandidateScore] = score_candidates(ingested, job) if ingested else []
+    yield {
+        "type": "scores",
+        "cache_hits": cv_ingest.cv_cache_hits - cache_hits_before,
+        "candidates": [score.model_dump(mode="json") for score in scores]
+    }
+
+    # --- Stage 3: LLM matcher on the shortlist ---
+    cvs_by_index = {index: cv for index, _, cv in ingested}
+    shortlist = scores[:max(top_k, 0)]
+    match_semaphore = asyncio.Semaphore(settings.RECRUITER_MATCH_CONCURRENCY)
+
+    async def match_one(score: CandidateScore) -> RankedCandidate:
+        async with match_semaphore:
+            try:
+                match = await analyze_cv_job_match(cvs_by_index[score.index], job)
+                ranked = RankedCandidate(candidate=score, match=match)
+                ranked.fit_score = _fit_score(ranked)
+                return ranked
+            except Exception as e:
+                return RankedCandidate(candidate=score, error=str(e))
+
+    ranked: list[RankedCandidate] = []
+    match_tasks = [asyncio.create_task(match_one(score)) for score in shortlist]
+    try:
+        for completed, next_done in enumerate(asyncio.as_completed(match_tasks), start=1):
+            result = await next_done
+            ranked.append(result)
+            yield {
+                "type": "progress",
+                "stage": "match",
+                "completed": completed,
+                "total": len(shortlist),
+                "index": result.candidate.index,
+                "filename": result.candidate.filename,
+                "error": result.error
+            }
+    finally:
+        for task in match_tasks:
+            task.cancel()
+
+    # LLM fit first, local score breaks ties (and orders failed matches)
+    ranked.sort(key=lambda r: (r.fit_score, r.candidate.score), reverse=True)
+    yield {
+        "type": "done",
+        "shortlist": [r.model_dump(mode="json") for r in ranked],
+        "failed": [f.model_dump(mode="json") for f in failed]
+    }
@@ -0,0 +1,400 @@
+"""Resume export: tailored resume markdown → PDF or DOCX.
+
+Both formats are ATS-safe: one column, a real text layer, standard fonts,
+no tables, text boxes or images. PDFs are laid out with PyMuPDF's Story
+(HTML + CSS, paginated automatically); DOCX files are written directly as
+WordprocessingML, so no extra dependency is needed.
+
+Rendering is CPU-bound and runs in a process pool, off the event loop.
+Rendered files are cached by (resume hash, format, template, options), so
+repeated downloads of the same resume are served from memory.
+"""
+import asyncio
+import html
+import io
+import logging
+import multiprocessing
+import re
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from xml.sax.saxutils import escape
+
+import fitz  # PyMuPDF
+
+from config import settings
+from models.export import ExportOptions
+from services.cache import TTLCache, stable_hash, content_hash
+
+logger = logging.getLogger(__name__)
+
+
+# Part of cache keys: bump when rendered output changes
+EXPORT_RENDERER_VERSION = "2"
+
+MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+# Page margins in points, per template
+MARGINS = {"classic": 54, "compact": 36}
+
+# Page sizes in points (width, height)
+PAGE_SIZES = {"letter": (612, 792), "a4": (595, 842)}
+
+
+# --- Markdown → blocks ---
+
+_BOLD_RE = re.compile(r"\*\*(.+?)\*\*|__(.+?)__")
+_LINK_RE = re.compile(r"\[([^\]]+)\]\(([^)]+)\)")
+
+
+def classify_markdown_line(raw: str) -> tuple[str, str] | None:
+    """
+    (kind, text) of one resume markdown line, or None for blank lines and rules.
+
+    Kinds: "name" (#), "section" (##), "entry" (###), "bullet" and
+    "paragraph". Links become "text (url)"; other markup except **bold**
+    is dropped, since ATS parsers read plain text.
+    """
+    line = raw.strip()
+    if not line or line.strip("-*_") == "":
+        return None
+    line = _LINK_RE.sub(lambda m: m.group(1) if m.group(1) == m.group(2) else f"{m.group(1)} ({m.group(2)})", line)
+    line = line.replace("`", "")
+    if line.startswith("### "):
+        return "entry", line[4:].strip()
+    if line.startswith("## "):
+        return "section", line[3:].strip()
+    if line.startswith("# "):
+        return "name", line[2:].strip()
+    if line.startswith(("- ", "* ", "• ", "+ ")):
+        return "bullet", line[2:].strip()
+    return "paragraph", line
+
+
+def parse_resume_markdown(markdown: str) -> list[tuple[str, str]]:
+    """Split resume markdown into (kind, text) blocks; see classify_markdown_line."""
+    return [block for block in map(classify_markdown_line, markdown.splitlines()) if block]
+
+
+def _runs(text: str) -> list[tuple[str, bool]]:
+    """(text, bold) runs of a line with **bold** markup."""
+    runs, position = [], 0
+    for match in _BOLD_RE.finditer(text):
+        if match.start() > position:
+            runs.append((text[position:match.start()], False))
+        runs.append((match.group(1) or match.group(2), True))
+        position = match.end()
+    if position < len(text):
+        runs.append((text[position:], False))
+    return runs
+
+
+# --- PDF ---
+
+# Letters that Story's fonts join with a preceding "f" into ff/fi/fl/ffi/ffl ligatures
+_LIGATURE_RE = re.compile(r"(?<=f)([fil])")
+
+
+def _no_ligatures(escaped: str) -> str:
+    """
+    Split f-ligature pairs into separate text runs.
+
+    Story shapes with the fonts' standard ligatures and ignores CSS to turn
+    them off; the text layer would then read "oﬃce" for "office" and ATS
+    keyword matching on such words fails. Ligatures only form within a run.
+    """
+    return _LIGATURE_RE.sub(r"<span>\1</span>", escaped)
+
+
+def _pdf_html(blocks: list[tuple[str, str]]) -> str:
+    def inline(text: str) -> str:
+        return "".join(
+            f"<b>{_no_ligatures(html.escape(t))}</b>" if bold else _no_ligatures(html.escape(t))
+            for t, bold in _runs(text)
+        )
+
+    parts, in_list = [], False
+    for kind, text in blocks:
+        if kind == "bullet" and not in_list:
+            parts.append("<ul>")
+            in_list = True
+        elif kind != "bullet" and in_list:
+            parts.append("</ul>")
+            in_list = False
+        tag = {"name": "h1", "section": "h2", "entry": "h3", "bullet": "li"}.get(kind, "p")
+        if kind == "section":
+            text = text.upper()
+        parts.append(f"<{tag}>{inline(text)}</{tag}>")
+    if in_list:
+        parts.append("</ul>")
+    return "\n".join(parts)
+
+
+# Story's default insets: 1em around the body, a fixed indent for list items
+BULLET_INDENT = 30
+LINE_HEIGHT = 1.25
+
+
+def block_metrics(kind: str, options: ExportOptions) -> tuple[float, float, float]:
+    """(font size, space before, space after) of a block kind, in points."""
+    size = options.font_size
+    gap = 2 if options.template == "compact" else 5
+    return {
+        "name": (size + 8, 0, gap),
+        "section": (size + 1.5, gap * 2, gap),
+        "entry": (size + 0.5, gap, 1),
+        "bullet": (size, 0, 0),
+        "paragraph": (size, 0, gap / 2),
+        "list": (size, 0, gap / 2),  # After the last bullet of a list
+    }[kind]
+
+
+def _pdf_css(options: ExportOptions) -> str:
+    rules = [f"body {{font-family: sans-serif; font-size: {options.font_size}pt; line-height: {LINE_HEIGHT};}}"]
+    for kind, selector in (("name", "h1"), ("section", "h2"), ("entry", "h3"), ("paragraph", "p"), ("list", "ul"), ("bullet", "li")):
+        size, before, after = block_metrics(kind, options)
+        border = " border-bottom: 0.5pt solid black;" if kind == "section" else ""
+        rules.append(f"{selector} {{font-size: {size}pt; margin: {before}pt 0 {after}pt 0;{border}}}")
+    return "".join(rules)
+
+
+def render_pdf(markdown: str, options: ExportOptions) -> bytes:
+    """Render resume markdown to a single-column PDF."""
+    story = fitz.Story(html=_pdf_html(parse_resume_markdown(markdown)), user_css=_pdf_css(options))
+    width, height = PAGE_SIZES[options.page_size]
+    margin = MARGINS[options.template]
+    mediabox = fitz.Rect(0, 0, width, height)
+    where = fitz.Rect(margin, margin, width - margin, height - margin)
+
+    buffer = io.BytesIO()
+    writer = fitz.DocumentWriter(buffer)
+    more = True
+    while more:
+        device = writer.begin_page(mediabox)
+        more, _ = story.place(where)
+        story.draw(device)
+        writer.end_page()
+    writer.close()
+    return buffer.getvalue()
+
+
+# --- DOCX ---
+
+_DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+
+_DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+
+
+def _docx_paragraph(kind: str, text: str, options: ExportOptions) -> str:
+    half_points = round(options.font_size * 2)
+    gap = 40 if options.template == "compact" else 100  # twentieths of a point
+    size = {"name": half_points + 16, "section": half_points + 3, "entry": half_points + 1}.get(kind, half_points)
+    properties = {
+        "name": f'<w:spacing w:after="{gap}"/>',
+        "section": (
+            f'<w:pBdr><w:bottom w:val="single" w:sz="4" w:space="1" w:color="000000"/></w:pBdr>'
+            f'<w:spacing w:before="{gap * 2}" w:after="{gap}"/>'
+        ),
+        "entry": f'<w:keepNext/><w:spacing w:before="{gap}" w:after="20"/>',
+        "bullet": '<w:ind w:left="360" w:hanging="180"/><w:spacing w:after="0"/>',
+    }.get(kind, f'<w:spacing w:after="{gap // 2}"/>')
+
+    if kind == "bullet":
+        text = f"•\t{text}"
+    if kind == "section":
+        text = text.upper()
+    runs = []
+    for run_text, bold in _runs(text):
+        run_properties = (
+            f'<w:rFonts w:ascii="Arial" w:hAnsi="Arial" w:cs="Arial"/>'
+            f'{"<w:b/>" if bold or kind in ("name", "section", "entry") else ""}'
+            f'<w:sz w:val="{size}"/>'
+        )
+        for i, piece in enumerate(run_text.split("\t")):
+            tab = "<w:tab/>" if i else ""
+            runs.append(f'<w:r><w:rPr>{run_properties}</w:rPr>{tab}<w:t xml:space="preserve">{escape(piece)}</w:t></w:r>')
+    return f'<w:p><w:pPr>{properties}</w:pPr>{"".join(runs)}</w:p>'
+
+
+def render_docx(markdown: str, options: ExportOptions) -> bytes:
+    """Render resume markdown to a single-column DOCX."""
+    width, height = PAGE_SIZES[options.page_size]
+    margin = MARGINS[options.template] * 20
+    body = "".join(_docx_paragraph(kind, text, options) for kind, text in parse_resume_markdown(markdown))
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+        f'{body}'
+        f'<w:sectPr><w:pgSz w:w="{width * 20}" w:h="{height * 20}"/>'
+        f'<w:pgMar w:top="{margin}" w:right="{margin}" w:bottom="{margin}" w:left="{margin}" '
+        f'w:header="0" w:footer="0" w:gutter="0"/></w:sectPr>'
+        '</w:body></w:document>'
+    )
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        # Fixed timestamps keep identical input byte-identical (stable ETags)
+        for name, content in (
+            ("[Content_Types].xml", _DOCX_CONTENT_TYPES),
+            ("_rels/.rels", _DOCX_RELS),
+            ("word/document.xml", document),
+        ):
+            archive.writestr(zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0)), content)
+    return buffer.getvalue()
+
+
+RENDERERS = {"pdf": render_pdf, "docx": render_docx}
+
+
+def _render(markdown: str, fmt: str, options: dict) -> bytes:
+    """Process pool entry point."""
+    return RENDERERS[fmt](markdown, ExportOptions(**options))
+
+
+# --- Service ---
+
+class ExportedFile:
+    """A rendered resume file."""
+
+    __slots__ = ("content", "format", "key")
+
+    def __init__(self, content: bytes, format: str, key: str):
+        self.content = content
+        self.format = format
+        self.key = key
+
+    @property
+    def media_type(self) -> str:
+        return MEDIA_TYPES[self.format]
+
+
+def resume_filename(markdown: str, fmt: str) -> str:
+    """Download name from the resume's name heading, e.g. Jane_Doe_Resume.pdf."""
+    name = next((text for kind, text in parse_resume_markdown(markdown) if kind == "name"), "")
+    stem = "_".join(re.sub(r"[^A-Za-z0-9 ]", "", name).split())
+    return f"{stem + '_' if stem else ''}Resume.{fmt}"
+
+
+class ResumeExporter:
+    """Renders resumes in a process pool, with a cache and single-flight per file."""
+
+    def __init__(self, max_entries: int, ttl_seconds: int, workers: int):
+        self._cache = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._workers = workers
+        self._pool: ProcessPoolExecutor | None = None
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self._workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def _discard_pool(self, broken: ProcessPoolExecutor) -> None:
+        """Drop a pool whose worker died so the next render starts a fresh one."""
+        with self._pool_lock:
+            if self._pool is broken:
+                self._pool = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    async def _render_in_pool(self, markdown: str, fmt: str, options: dict) -> bytes:
+        """Render in the pool; if a worker died (OOM kill, crash), retry once on a fresh pool."""
+        loop = asyncio.get_running_loop()
+        for attempt in (1, 2):
+            pool = self._get_pool()
+            try:
+                return await loop.run_in_executor(pool, _render, markdown, fmt, options)
+            except BrokenProcessPool:
+                self._discard_pool(pool)
+                if attempt == 2:
+                    raise
+                logger.warning("Resume render worker died, retrying on a fresh pool")
+
+    def cache_key(self, markdown: str, fmt: str, options: ExportOptions) -> str:
+        return stable_hash(
+            EXPORT_RENDERER_VERSION, fmt, options.model_dump(),
+            content_hash(markdown.encode("utf-8"))
+        )
+
+    async def export(self, markdown: str, fmt: str, options: ExportOptions) -> ExportedFile:
+        """
+        Render resume markdown, or serve it from the render cache.
+
+        Args:
+            markdown: TailoredResume.resume_markdown
+            fmt: "pdf" or "docx"
+            options: Template and layout options
+
+        Returns:
+            ExportedFile; its key doubles as an ETag
+
+        Raises:
+            ValueError: If rendering fails
+        """
+        key = self.cache_key(markdown, fmt, options)
+        content = self._cache.get(key)
+        if content is not None:
+            return ExportedFile(content, fmt, key)
+
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._render_in_pool(markdown, fmt, options.model_dump()))
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._finish(key, done))
+        try:
+            content = await asyncio.shield(future)
+        except Exception as e:
+            logger.warning("Resume export failed: %s", e)
+            raise ValueError(f"Failed to render {fmt.upper()}: {e}")
+        return ExportedFile(content, fmt, key)
+
+    def _finish(self, key: str, future: asyncio.Future) -> None:
+        # Cache even if every waiting request was cancelled meanwhile
+        self._inflight.pop(key, None)
+        if not future.cancelled() and future.exception() is None:
+            self._cache.set(key, future.result())
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._cache),
+            "hits": self._cache.hits,
+            "misses": self._cache.misses,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the render worker processes, if any were started."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+# Singleton instance
+resume_exporter = ResumeExporter(
+    max_entries=settings.EXPORT_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.EXPORT_CACHE_TTL_SECONDS,
+    workers=settings.EXPORT_RENDER_WORKERS
+)
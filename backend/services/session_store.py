@@ -0,0 +1,221 @@
+"""Analysis session store with pluggable backends.
+
+Backends:
+- memory: in-process LRU bounded by entry count and total bytes (default)
+- sqlite: local file, shared by every worker on the same machine
+- supabase: `analysis_sessions` table (see database/migration_sessions.sql)
+
+Every backend enforces the session TTL; the store enforces a per-session
+size limit so a single oversized analysis cannot evict everything else.
+"""
+import asyncio
+import logging
+import os
+import secrets
+import sqlite3
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+from config import settings
+from models.session import AnalysisSession
+
+logger = logging.getLogger(__name__)
+
+
+class SessionBackend:
+    """Interface implemented by every session backend."""
+
+    async def get(self, session_id: str) -> AnalysisSession | None:
+        raise NotImplementedError
+
+    async def set(self, session_id: str, session: AnalysisSession, size: int, ttl_seconds: int) -> None:
+        raise NotImplementedError
+
+    async def delete(self, session_id: str) -> None:
+        raise NotImplementedError
+
+
+class MemorySessionBackend(SessionBackend):
+    """
+    In-process LRU backend.
+
+    Keeps validated model instances, so reads skip JSON parsing entirely.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._data: OrderedDict[str, tuple[float, int, AnalysisSession]] = OrderedDict()
+
+    async def get(self, session_id: str) -> AnalysisSession | None:
+        entry = self._data.get(session_id)
+        if entry is None:
+            return None
+
+        expires_at, _, session = entry
+        if expires_at < time.monotonic():
+            await self.delete(session_id)
+            return None
+
+        self._data.move_to_end(session_id)
+        return session
+
+    async def set(self, session_id: str, session: AnalysisSession, size: int, ttl_seconds: int) -> None:
+        await self.delete(session_id)
+        self._data[session_id] = (time.monotonic() + ttl_seconds, size, session)
+        self.total_bytes += size
+
+        while self._data and (len(self._data) > self.max_entries or self.total_bytes > self.max_bytes):
+            _, (_, evicted_size, _) = self._data.popitem(last=False)
+            self.total_bytes -= evicted_size
+
+    async def delete(self, session_id: str) -> None:
+        entry = self._data.pop(session_id, None)
+        if entry is not None:
+            self.total_bytes -= entry[1]
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """Local SQLite backend; survives restarts and is shared across workers."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS analysis_sessions ("
+                "id TEXT PRIMARY KEY, payload TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_analysis_sessions_expires "
+                "ON analysis_sessions(expires_at)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _get_sync(self, session_id: str) -> str | None:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT payload FROM analysis_sessions WHERE id = ? AND expires_at > ?",
+                (session_id, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def _set_sync(self, session_id: str, payload: str, ttl_seconds: int) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM analysis_sessions WHERE expires_at <= ?", (now,))
+            conn.execute(
+                "INSERT OR REPLACE INTO analysis_sessions (id, payload, expires_at) VALUES (?, ?, ?)",
+                (session_id, payload, now + ttl_seconds)
+            )
+
+    def _delete_sync(self, session_id: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM analysis_sessions WHERE id = ?", (session_id,))
+
+    async def get(self, session_id: str) -> AnalysisSession | None:
+        payload = await asyncio.to_thread(self._get_sync, session_id)
+        return AnalysisSession.model_validate_json(payload) if payload else None
+
+    async def set(self, session_id: str, session: AnalysisSession, size: int, ttl_seconds: int) -> None:
+        await asyncio.to_thread(self._set_sync, session_id, session.model_dump_json(), ttl_seconds)
+
+    async def delete(self, session_id: str) -> None:
+        await asyncio.to_thread(self._delete_sync, session_id)
+
+
+class SupabaseSessionBackend(SessionBackend):
+    """Supabase backend for deployments with several app instances."""
+
+    def __init__(self):
+        from services.supabase import get_supabase_client
+        self.client = get_supabase_client()
+
+    async def get(self, session_id: str) -> AnalysisSession | None:
+        result = self.client.table("analysis_sessions").select("payload").eq(
+            "id", session_id
+        ).gt("expires_at", datetime.now(timezone.utc).isoformat()).limit(1).execute()
+        if not result.data:
+            return None
+        return AnalysisSession.model_validate(result.data[0]["payload"])
+
+    async def set(self, session_id: str, session: AnalysisSession, size: int, ttl_seconds: int) -> None:
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=ttl_seconds)
+        self.client.table("analysis_sessions").upsert({
+            "id": session_id,
+            "payload": session.model_dump(mode="json"),
+            "expires_at": expires_at.isoformat()
+        }).execute()
+
+    async def delete(self, session_id: str) -> None:
+        self.client.table("analysis_sessions").delete().eq("id", session_id).execute()
+
+
+class SessionTooLargeError(ValueError):
+    """Raised when a session exceeds SESSION_MAX_BYTES."""
+
+
+class SessionStore:
+    """Creates, loads and updates analysis sessions."""
+
+    def __init__(self, backend: SessionBackend, ttl_seconds: int, max_session_bytes: int):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.max_session_bytes = max_session_bytes
+
+    def _measure(self, session: AnalysisSession) -> int:
+        size = len(session.model_dump_json().encode("utf-8"))
+        if size > self.max_session_bytes:
+            raise SessionTooLargeError(
+                f"Analysis session is {size} bytes, limit is {self.max_session_bytes}"
+            )
+        return size
+
+    async def create(self, session: AnalysisSession) -> str:
+        """Store a new session and return its id."""
+        session_id = secrets.token_urlsafe(24)
+        await self.backend.set(session_id, session, self._measure(session), self.ttl_seconds)
+        return session_id
+
+    async def get(self, session_id: str) -> AnalysisSession | None:
+        """Load a session, or None if it expired or never existed."""
+        return await self.backend.get(session_id)
+
+    async def save(self, session_id: str, session: AnalysisSession) -> None:
+        """Update an existing session (refreshes its TTL)."""
+        await self.backend.set(session_id, session, self._measure(session), self.ttl_seconds)
+
+    async def delete(self, session_id: str) -> None:
+        """Remove a session."""
+        await self.backend.delete(session_id)
+
+
+def _build_backend() -> SessionBackend:
+    """Select the session backend from settings."""
+    backend = settings.SESSION_BACKEND.lower()
+    if backend == "sqlite":
+        return SQLiteSessionBackend(settings.SESSION_SQLITE_PATH)
+    if backend == "supabase":
+        return SupabaseSessionBackend()
+    if backend != "memory":
+        logger.warning(f"Unknown SESSION_BACKEND '{settings.SESSION_BACKEND}', using memory")
+    return MemorySessionBackend(
+        max_entries=settings.SESSION_MAX_ENTRIES,
+        max_bytes=settings.SESSION_MEMORY_MAX_BYTES
+    )
+
+
+# Singleton instance
+session_store = SessionStore(
+    backend=_build_backend(),
+    ttl_seconds=settings.SESSION_TTL_SECONDS,
+    max_session_bytes=settings.SESSION_MAX_BYTES
+)
@@ -0,0 +1,145 @@
+"""Speculative background execution between analysis steps.
+
+After step 1 the user spends time on the skill confirmation screen. Stages
+that do not depend on that confirmation are started in the background and
+kept here, keyed by analysis session id, for step 2 to pick up. Stages
+that step 2 does not consume are cancelled (if still running) and their
+tokens are counted as wasted.
+
+Runs are in-process only: if step 2 lands on another instance it simply
+computes everything itself.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable
+
+from config import settings
+from services.llm import TokenMeter, meter_tokens
+
+logger = logging.getLogger(__name__)
+
+
+class SpeculativeStage:
+    """One background stage and its token usage."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.meter = TokenMeter()
+        self.task: asyncio.Task | None = None
+        self.outcome = "pending"  # pending | consumed | discarded
+
+
+class SpeculationStore:
+    """Short-lived store of speculative stage results per analysis session."""
+
+    def __init__(self, ttl_seconds: int, max_runs: int, max_concurrent: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_runs = max_runs
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._runs: dict[str, tuple[float, dict[str, SpeculativeStage]]] = {}
+        self.stats = {
+            "stages_started": 0,
+            "stages_consumed": 0,
+            "stages_discarded": 0,
+            "speculative_tokens": 0,
+            "wasted_tokens": 0
+        }
+
+    def start(self, session_id: str, stages: dict[str, Callable[[], Awaitable[Any]]]) -> None:
+        """Launch background stages for a session."""
+        if not settings.SPECULATION_ENABLED:
+            return
+
+        self._expire()
+        while len(self._runs) >= self.max_runs:
+            oldest = min(self._runs, key=lambda key: self._runs[key][0])
+            self.finish(oldest)
+
+        run = {}
+        for name, factory in stages.items():
+            stage = SpeculativeStage(name)
+            stage.task = asyncio.create_task(self._run_stage(stage, factory))
+            run[name] = stage
+            self.stats["stages_started"] += 1
+
+        self._runs[session_id] = (time.monotonic() + self.ttl_seconds, run)
+
+    async def _run_stage(self, stage: SpeculativeStage, factory: Callable[[], Awaitable[Any]]) -> Any:
+        async with self._semaphore:
+            with meter_tokens() as meter:
+                stage.meter = meter
+                return await factory()
+
+    async def take(self, session_id: str, name: str) -> Any | None:
+        """
+        Consume a stage result, waiting for it if still running.
+
+        Returns None if the stage was never started, expired, failed or
+        was cancelled while waiting.
+        """
+        self._expire()
+        entry = self._runs.get(session_id)
+        stage = entry[1].get(name) if entry else None
+        if stage is None or stage.outcome != "pending":
+            return None
+
+        # Another request may cancel the stage meanwhile (discard, finish,
+        # expiry); that cancellation must not propagate into this request
+        await asyncio.wait({stage.task})
+        if stage.task.cancelled():
+            return None
+        error = stage.task.exception()
+        if error is not None:
+            logger.warning(f"Speculative stage '{name}' failed: {error}")
+            self._close(stage)
+            return None
+
+        if stage.outcome == "pending":
+            stage.outcome = "consumed"
+            self.stats["stages_consumed"] += 1
+            self.stats["speculative_tokens"] += stage.meter.total_tokens
+        return stage.task.result()
+
+    def discard(self, session_id: str, name: str) -> None:
+        """Cancel or drop a stage whose result step 2 will not use."""
+        entry = self._runs.get(session_id)
+        stage = entry[1].get(name) if entry else None
+        if stage is not None:
+            self._close(stage)
+
+    def finish(self, session_id: str) -> None:
+        """Drop a session's run, discarding any stage that was not consumed."""
+        entry = self._runs.pop(session_id, None)
+        if entry is None:
+            return
+        for stage in entry[1].values():
+            self._close(stage)
+
+    def _close(self, stage: SpeculativeStage) -> None:
+        if stage.outcome != "pending":
+            return
+        if stage.task is not None and not stage.task.done():
+            stage.task.cancel()
+        elif stage.task is not None and not stage.task.cancelled():
+            stage.task.exception()  # Mark retrieved so asyncio does not log it
+
+        stage.outcome = "discarded"
+        wasted = stage.meter.total_tokens
+        self.stats["stages_discarded"] += 1
+        self.stats["speculative_tokens"] += wasted
+        self.stats["wasted_tokens"] += wasted
+        logger.info(f"Discarded speculative stage '{stage.name}' ({wasted} tokens wasted)")
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        for session_id in [key for key, (expires_at, _) in self._runs.items() if expires_at < now]:
+            self.finish(session_id)
+
+
+# Singleton instance
+speculation_store = SpeculationStore(
+    ttl_seconds=settings.SPECULATION_TTL_SECONDS,
+    max_runs=settings.SPECULATION_MAX_RUNS,
+    max_concurrent=settings.SPECULATION_MAX_CONCURRENT
+)
@@ -3,6 +3,8 @@ import os
 from supabase import create_client, Client
 from functools import lru_cache
 
+from services.tracing import traced
+
 
 @lru_cache()
 def get_supabase_client() -> Client:
@@ -26,25 +28,30 @@ class SupabaseService:
     # User/Profile Operations
     # =========================================
     
+    @traced("supabase", provider="supabase")
     async def get_profile(self, user_id: str) -> dict | None:
         """Get user profile by ID."""
         result = self.client.table("profiles").select("*").eq("id", user_id).single().execute()
         return result.data if result.data else None
     
+    @traced("supabase", provider="supabase")
     async def get_profile_by_polar_customer(self, polar_customer_id: str) -> dict | None:
         """Get user profile by Polar customer ID."""
         result = self.client.table("profiles").select("*").eq("polar_customer_id", polar_customer_id).single().execute()
         return result.data if result.data else None
     
+    @traced("supabase", provider="supabase")
     async def update_profile(self, user_id: str, **updates) -> dict:
         """Update user profile."""
         result = self.client.table("profiles").update(updates).eq("id", user_id).execute()
         return result.data[0] if result.data else {}
     
+    @traced("supabase", provider="supabase")
     async def set_polar_customer_id(self, user_id: str, polar_customer_id: str):
         """Link Polar customer ID to user profile."""
         await self.update_profile(user_id, polar_customer_id=polar_customer_id)
     
+    @traced("supabase", provider="supabase")
     async def update_tier(self, user_id: str, tier: str):
         """Update user's subscription tier."""
         await self.update_profile(user_id, tier=tier)
@@ -53,6 +60,7 @@ class SupabaseService:
     # Analysis Operations
     # =========================================
     
+    @traced("supabase", provider="supabase")
     async def create_analysis(
         self, 
         user_id: str, 
@@ -70,11 +78,13 @@ class SupabaseService:
         }).execute()
         return result.data[0] if result.data else {}
     
+    @traced("supabase", provider="supabase")
     async def get_user_analyses(self, user_id: str, limit: int = 50) -> list:
         """Get user's analysis history."""
         result = self.client.table("analyses").select("*").eq("user_id", user_id).order("created_at", desc=True).limit(limit).execute()
         return result.data or []
     
+    @traced("supabase", provider="supabase")
     async def get_analysis_count(self, user_id: str) -> int:
         """Get total number of analyses for a user."""
         result = self.client.table("analyses").select("id", count="exact").eq("user_id", user_id).execute()
@@ -84,6 +94,7 @@ class SupabaseService:
     # Credits Operations
     # =========================================
     
+    @traced("supabase", provider="supabase")
     async def get_user_credits(self, user_id: str) -> dict:
         """Get user's credit information.
         
@@ -125,6 +136,7 @@ class SupabaseService:
             "tier_limit": tier_limits.get(tier, 3)
         }
     
+    @traced("supabase", provider="supabase")
     async def use_credit(self, user_id: str) -> bool:
         """
         Attempt to use one credit for an analysis.
@@ -143,6 +155,7 @@ class SupabaseService:
         
         return True
     
+    @traced("supabase", provider="supabase")
     async def add_credits(self, user_id: str, amount: int) -> dict:
         """Add purchased credits to user account."""
         credits = await self.get_user_credits(user_id)
@@ -154,6 +167,7 @@ class SupabaseService:
         
         return {"credits_remaining": new_total}
     
+    @traced("supabase", provider="supabase")
     async def reset_credits_for_tier(self, user_id: str, tier: str) -> dict:
         """Reset credits when user upgrades/changes tier."""
         tier_limits = {"free": 3, "pro": 30, "team": 100}
@@ -171,6 +185,7 @@ class SupabaseService:
     # Auth Verification
     # =========================================
     
+    @traced("supabase", provider="supabase")
     async def verify_jwt(self, token: str) -> dict | None:
         """Verify JWT and return user data."""
         try:
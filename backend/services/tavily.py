@@ -8,6 +8,7 @@ from typing import Any
 from urllib.parse import urlparse
 
 from config import settings
+from services.tracing import traced
 
 
 class TavilySearchService:
@@ -17,6 +18,7 @@ class TavilySearchService:
         self.api_key = settings.TAVILY_API_KEY
         self.base_url = "https://api.tavily.com"
     
+    @traced("tavily.search", provider="tavily")
     async def search(
         self,
         query: str,
@@ -0,0 +1,267 @@
+"""Per-stage timing spans, Server-Timing and Prometheus metrics.
+
+Agents and external calls (LLM providers, Tavily, Supabase, Polar, URL
+fetches) run inside spans:
+
+    with span("llm", provider="groq") as s:
+        data = await call()
+        s.record_usage(data.get("usage"))
+
+    @traced("agent.cv_matcher")
+    async def analyze_cv_job_match(...): ...
+
+Each finished span is added to the current request's trace, which
+middleware/timing.py reports in the Server-Timing response header, and
+feeds process-wide histograms and counters served in Prometheus text
+format at GET /metrics. Spans also work outside requests (job workers,
+speculative tasks): they then only feed the metrics.
+"""
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator
+
+
+# Upper bounds in seconds; LLM calls and full pipelines take tens of seconds
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Span:
+    """One timed stage, with its provider, token usage and cache outcome."""
+
+    __slots__ = (
+        "name", "provider", "parent", "duration", "prompt_tokens", "completion_tokens", "cache_hits", "cache_misses", "error"
+    )
+
+    def __init__(self, name: str, provider: str = "", parent: "Span | None" = None):
+        self.name = name
+        self.provider = provider
+        self.parent = parent  # Enclosing span, if any
+        self.duration = 0.0  # Seconds, set when the span ends
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.error = False
+
+    def record_usage(self, usage: dict | None) -> None:
+        """Add an LLM provider's usage block."""
+        usage = usage or {}
+        self.prompt_tokens += usage.get("prompt_tokens", 0) or 0
+        self.completion_tokens += usage.get("completion_tokens", 0) or 0
+
+    def record_cache(self, hits: int = 0, misses: int = 0) -> None:
+        self.cache_hits += hits
+        self.cache_misses += misses
+
+
+class RequestTrace:
+    """Spans finished while handling one request."""
+
+    def __init__(self):
+        self.spans: list[Span] = []
+
+    def server_timing(self, total_seconds: float) -> str:
+        """
+        Server-Timing header value: total time per span name, in order of
+        first completion, plus the whole request as "total".
+        """
+        totals: dict[str, list] = {}
+        for finished in list(self.spans):
+            entry = totals.setdefault(finished.name, [0.0, 0])
+            entry[0] += finished.duration
+            entry[1] += 1
+        parts = [
+            f'{name};dur={seconds * 1000:.1f};desc="{count} calls"' if count > 1
+            else f"{name};dur={seconds * 1000:.1f}"
+            for name, (seconds, count) in totals.items()
+        ]
+        parts.append(f"total;dur={total_seconds * 1000:.1f}")
+        return ", ".join(parts)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus layout."""
+
+    __slots__ = ("buckets", "sum", "count")
+
+    def __init__(self):
+        self.buckets = [0] * len(DURATION_BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if value <= bound:
+                self.buckets[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+class TracingMetrics:
+    """Process-wide aggregates of requests and spans."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests: dict[tuple[str, str, str], Histogram] = {}  # (method, route, status)
+        self.spans: dict[tuple[str, str], Histogram] = {}  # (span, provider)
+        self.errors: dict[tuple[str, str], int] = {}
+        self.tokens: dict[tuple[str, str], int] = {}  # (provider, prompt|completion)
+        self.cache: dict[tuple[str, str], int] = {}  # (span, hit|miss)
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float) -> None:
+        with self._lock:
+            self.requests.setdefault((method, route, str(status)), Histogram()).observe(seconds)
+
+    def observe_span(self, span: Span) -> None:
+        key = (span.name, span.provider)
+        with self._lock:
+            self.spans.setdefault(key, Histogram()).observe(span.duration)
+            if span.error:
+                self.errors[key] = self.errors.get(key, 0) + 1
+            for kind, tokens in (("prompt", span.prompt_tokens), ("completion", span.completion_tokens)):
+                if tokens:
+                    token_key = (span.provider, kind)
+                    self.tokens[token_key] = self.tokens.get(token_key, 0) + tokens
+            for result, count in (("hit", span.cache_hits), ("miss", span.cache_misses)):
+                if count:
+                    cache_key = (span.name, result)
+                    self.cache[cache_key] = self.cache.get(cache_key, 0) + count
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (0.0.4)."""
+        lines: list[str] = []
+
+        def histogram(name: str, help_text: str, series: dict, label_names: tuple[str, ...]) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for key, hist in sorted(series.items()):
+                labels = dict(zip(label_names, key))
+                for bound, count in zip(DURATION_BUCKETS, hist.buckets):
+                    lines.append(f"{name}_bucket{_labels(**labels, le=str(bound))} {count}")
+                lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {hist.count}")
+                lines.append(f"{name}_sum{_labels(**labels)} {hist.sum}")
+                lines.append(f"{name}_count{_labels(**labels)} {hist.count}")
+
+        def counter(name: str, help_text: str, series: dict, label_names: tuple[str, ...]) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for key, value in sorted(series.items()):
+                lines.append(f"{name}{_labels(**dict(zip(label_names, key)))} {value}")
+
+        with self._lock:
+            histogram(
+                "jobs_http_request_duration_seconds", "HTTP request duration by route.",
+                self.requests, ("method", "route", "status")
+            )
+            histogram(
+                "jobs_span_duration_seconds", "Duration of agent and external-call spans.",
+                self.spans, ("span", "provider")
+            )
+            counter("jobs_span_errors_total", "Spans that ended with an exception.", self.errors, ("span", "provider"))
+            counter("jobs_llm_tokens_total", "Provider-reported LLM tokens.", self.tokens, ("provider", "type"))
+            counter("jobs_cache_lookups_total", "Cache lookups made inside spans.", self.cache, ("span", "result"))
+        return "\n".join(lines) + "\n"
+
+
+# Singleton instance
+metrics = TracingMetrics()
+
+_current_trace: ContextVar[RequestTrace | None] = ContextVar("request_trace", default=None)
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+@contextmanager
+def request_trace() -> Iterator[RequestTrace]:
+    """Collect the spans finished in this block (and tasks it spawns)."""
+    trace = RequestTrace()
+    reset_token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(reset_token)
+
+
+@contextmanager
+def span(name: str, provider: str = "") -> Iterator[Span]:
+    """
+    Time the enclosed block as one stage.
+
+    Args:
+        name: Stage name, e.g. "llm" or "agent.jd_analyzer"; becomes the
+            Server-Timing metric name and the "span" metrics label
+        provider: External service behind the stage, if any
+    """
+    current = Span(name, provider, _current_span.get())
+    reset_token = _current_span.set(current)
+    started = time.perf_counter()
+    try:
+        yield current
+    except BaseException:
+        current.error = True
+        raise
+    finally:
+        current.duration = time.perf_counter() - started
+        _current_span.reset(reset_token)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.spans.append(current)
+        metrics.observe_span(current)
+
+
+def current_agent() -> str:
+    """Name of the innermost enclosing "agent." span, or "" outside agents."""
+    current = _current_span.get()
+    while current is not None:
+        if current.name.startswith("agent."):
+            return current.name
+        current = current.parent
+    return ""
+
+
+def record_cache(hits: int = 0, misses: int = 0) -> None:
+    """Count cache lookups against the innermost active span, if any."""
+    current = _current_span.get()
+    if current is not None:
+        current.record_cache(hits, misses)
+
+
+def traced(name: str, provider: str = "") -> Callable:
+    """
+    Decorator running a sync or async function inside a span.
+
+    A call made inside a span of the same name (e.g. one agent entry point
+    delegating to another) is not recorded again.
+    """
+    def decorator(fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                parent = _current_span.get()
+                if parent is not None and parent.name == name:
+                    return await fn(*args, **kwargs)
+                with span(name, provider):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            parent = _current_span.get()
+            if parent is not None and parent.name == name:
+                return fn(*args, **kwargs)
+            with span(name, provider):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorator
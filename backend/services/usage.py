@@ -0,0 +1,454 @@
+"""LLM token and cost accounting.
+
+Every provider call (services/llm.py) is recorded as an LLMCall with:
+- the provider, model, prompt and completion tokens, latency and status
+- the estimated cost from LLM_PRICING
+- the agent that made it (innermost "agent." tracing span)
+- the signed-in user, request id and route of the request it served
+
+Calls are aggregated three ways:
+- per request: X-LLM-* debug headers (middleware/usage.py, LLM_USAGE_HEADERS)
+- per agent: in-process totals at GET /api/usage/stats
+- per user, agent, provider, model and route: the llm_usage table, written
+  in batches (see database/migration_llm_usage.sql) and reported at
+  GET /api/usage/report
+
+Backends for the table: sqlite (default, local file), supabase, or none.
+"""
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Iterator
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+USAGE_COLUMNS = (
+    "created_at", "request_id", "route", "user_id", "agent", "provider", "model",
+    "prompt_tokens", "completion_tokens", "latency_ms", "cost_usd", "status"
+)
+
+# Dimensions the report can group by
+REPORT_GROUPS = ("agent", "user_id", "provider", "model", "route")
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """USD cost of a call from LLM_PRICING ($ per million prompt/completion tokens); 0 if unpriced."""
+    prices = settings.LLM_PRICING.get(model)
+    if not prices:
+        return 0.0
+    prompt_price, completion_price = prices
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+
+class LLMCall:
+    """One LLM provider call."""
+
+    __slots__ = USAGE_COLUMNS
+
+    def __init__(
+        self,
+        provider: str,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        latency_ms: float,
+        status: str = "ok",
+        agent: str = "",
+        user_id: str = "",
+        request_id: str = "",
+        route: str = ""
+    ):
+        self.created_at = time.time()
+        self.provider = provider
+        self.model = model
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.latency_ms = latency_ms
+        self.status = status  # "ok" | "error"
+        self.cost_usd = estimate_cost(model, prompt_tokens, completion_tokens)
+        self.agent = agent
+        self.user_id = user_id
+        self.request_id = request_id
+        self.route = route
+
+    def as_row(self) -> tuple:
+        return tuple(getattr(self, column) for column in USAGE_COLUMNS)
+
+
+class UsageTotals:
+    """Running totals for a group of calls."""
+
+    __slots__ = ("calls", "prompt_tokens", "completion_tokens", "latency_ms", "cost_usd", "errors")
+
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.latency_ms = 0.0
+        self.cost_usd = 0.0
+        self.errors = 0
+
+    def add(self, calls: int, prompt_tokens: int, completion_tokens: int, latency_ms: float, cost_usd: float, errors: int) -> None:
+        self.calls += calls
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.latency_ms += latency_ms
+        self.cost_usd += cost_usd
+        self.errors += errors
+
+    def add_call(self, call: LLMCall) -> None:
+        self.add(1, call.prompt_tokens, call.completion_tokens, call.latency_ms, call.cost_usd, int(call.status != "ok"))
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.prompt_tokens + self.completion_tokens,
+            "cost_usd": round(self.cost_usd, 6),
+            "avg_latency_ms": round(self.latency_ms / self.calls, 1) if self.calls else 0.0,
+        }
+
+
+class RequestUsage:
+    """LLM calls made while serving one request."""
+
+    def __init__(self, scope: dict | None = None, request_id: str = "", route: str = ""):
+        self.request_id = request_id or uuid.uuid4().hex
+        self.user_id = ""  # Set by the auth dependency for signed-in users
+        self._scope = scope or {}
+        self._route = route
+        self.totals = UsageTotals()
+        self.by_agent: dict[str, UsageTotals] = {}
+
+    @property
+    def route(self) -> str:
+        # The router records the matched route in the scope before the endpoint runs
+        return getattr(self._scope.get("route"), "path", "") or self._route
+
+    def add(self, call: LLMCall) -> None:
+        self.totals.add_call(call)
+        self.by_agent.setdefault(call.agent or "unattributed", UsageTotals()).add_call(call)
+
+    def headers(self) -> list[tuple[bytes, bytes]]:
+        """Debug response headers summarizing this request's LLM usage."""
+        totals = self.totals
+        agents = ", ".join(
+            f"{agent};calls={t.calls};tokens={t.prompt_tokens + t.completion_tokens}"
+            for agent, t in self.by_agent.items()
+        )
+        values = [
+            ("x-request-id", self.request_id),
+            ("x-llm-calls", str(totals.calls)),
+            ("x-llm-prompt-tokens", str(totals.prompt_tokens)),
+            ("x-llm-completion-tokens", str(totals.completion_tokens)),
+            ("x-llm-latency-ms", f"{totals.latency_ms:.0f}"),
+            ("x-llm-cost-usd", f"{totals.cost_usd:.6f}"),
+        ]
+        if agents:
+            values.append(("x-llm-agents", agents))
+        return [(name.encode(), value.encode("latin-1", "replace")) for name, value in values]
+
+
+_current_usage: ContextVar[RequestUsage | None] = ContextVar("request_llm_usage", default=None)
+
+
+@contextmanager
+def request_usage(scope: dict | None = None, request_id: str = "", route: str = "") -> Iterator[RequestUsage]:
+    """
+    Attribute LLM calls made in this block (and tasks it spawns) to one request.
+
+    Args:
+        scope: ASGI scope of the request; its matched route is read lazily
+        request_id: Id to record the calls under (default: a new one)
+        route: Route to record when there is no scope, e.g. for a
+            background job, the route that submitted it
+    """
+    usage = RequestUsage(scope, request_id, route)
+    reset_token = _current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_usage.reset(reset_token)
+
+
+def usage_attribution() -> dict:
+    """The current request's id, route and user, to carry into work that runs after it (background jobs)."""
+    usage = _current_usage.get()
+    if usage is None:
+        return {}
+    return {"request_id": usage.request_id, "route": usage.route, "user_id": usage.user_id}
+
+
+def set_usage_user(user_id: str) -> None:
+    """Attribute the current request's LLM calls to a signed-in user."""
+    usage = _current_usage.get()
+    if usage is not None:
+        usage.user_id = user_id
+
+
+class UsageBackend:
+    """Interface implemented by every usage table backend."""
+
+    async def write(self, rows: list[tuple]) -> None:
+        raise NotImplementedError
+
+    async def totals(self, since: float) -> list[dict]:
+        """Totals since a UNIX time, grouped by every REPORT_GROUPS dimension."""
+        raise NotImplementedError
+
+
+class SQLiteUsageBackend(UsageBackend):
+    """Local SQLite table; shared by every worker on the same machine."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_usage ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, created_at REAL NOT NULL, request_id TEXT, "
+                "route TEXT, user_id TEXT, agent TEXT, provider TEXT, model TEXT, "
+                "prompt_tokens INTEGER, completion_tokens INTEGER, latency_ms REAL, "
+                "cost_usd REAL, status TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_usage_created ON llm_usage(created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_usage_user ON llm_usage(user_id, created_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _write_sync(self, rows: list[tuple]) -> None:
+        placeholders = ", ".join("?" for _ in USAGE_COLUMNS)
+        with self._connect() as conn:
+            conn.executemany(
+                f"INSERT INTO llm_usage ({', '.join(USAGE_COLUMNS)}) VALUES ({placeholders})", rows
+            )
+
+    def _totals_sync(self, since: float) -> list[dict]:
+        groups = ", ".join(REPORT_GROUPS)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {groups}, COUNT(*), SUM(prompt_tokens), SUM(completion_tokens), "
+                "SUM(latency_ms), SUM(cost_usd), SUM(status != 'ok') "
+                f"FROM llm_usage WHERE created_at >= ? GROUP BY {groups}",
+                (since,)
+            ).fetchall()
+        keys = REPORT_GROUPS + ("calls", "prompt_tokens", "completion_tokens", "latency_ms", "cost_usd", "errors")
+        return [dict(zip(keys, row)) for row in rows]
+
+    async def write(self, rows: list[tuple]) -> None:
+        await asyncio.to_thread(self._write_sync, rows)
+
+    async def totals(self, since: float) -> list[dict]:
+        return await asyncio.to_thread(self._totals_sync, since)
+
+
+class SupabaseUsageBackend(UsageBackend):
+    """Supabase `llm_usage` table, for deployments with several app instances."""
+
+    def __init__(self):
+        from services.supabase import get_supabase_client
+        self.client = get_supabase_client()
+
+    def _write_sync(self, rows: list[tuple]) -> None:
+        records = []
+        for row in rows:
+            record = dict(zip(USAGE_COLUMNS, row))
+            record["created_at"] = datetime.fromtimestamp(record["created_at"], timezone.utc).isoformat()
+            record["user_id"] = record["user_id"] or None
+            records.append(record)
+        self.client.table("llm_usage").insert(records).execute()
+
+    def _totals_sync(self, since: float) -> list[dict]:
+        result = self.client.rpc(
+            "llm_usage_totals",
+            {"p_since": datetime.fromtimestamp(since, timezone.utc).isoformat()}
+        ).execute()
+        return result.data or []
+
+    async def write(self, rows: list[tuple]) -> None:
+        await asyncio.to_thread(self._write_sync, rows)
+
+    async def totals(self, since: float) -> list[dict]:
+        return await asyncio.to_thread(self._totals_sync, since)
+
+
+class UsageLedger:
+    """
+    Records LLM calls, keeps per-agent totals and writes calls to the
+    usage table in batches.
+
+    A batch is written once USAGE_FLUSH_BATCH_SIZE calls are pending, and
+    by a background task every USAGE_FLUSH_INTERVAL_SECONDS. Failed writes
+    are retried with the next batch; at most USAGE_MAX_PENDING calls are
+    kept, older ones are dropped.
+    """
+
+    def __init__(self, backend: UsageBackend | None, batch_size: int, flush_interval: float, max_pending: int):
+        self.backend = backend
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._pending: list[tuple] = []
+        self._flush_lock: asyncio.Lock | None = None
+        self._flusher: asyncio.Task | None = None
+        self._flush_tasks: set[asyncio.Task] = set()  # Referenced so they are not collected mid-write
+        self.by_agent: dict[str, UsageTotals] = {}
+        self.by_model: dict[tuple[str, str], UsageTotals] = {}
+        self.written = 0
+        self.dropped = 0
+
+    def record(self, call: LLMCall) -> None:
+        """Attribute a call to the current request/user and queue it for the table."""
+        usage = _current_usage.get()
+        if usage is not None:
+            call.request_id, call.user_id, call.route = usage.request_id, usage.user_id, usage.route
+            usage.add(call)
+
+        with self._lock:
+            self.by_agent.setdefault(call.agent or "unattributed", UsageTotals()).add_call(call)
+            self.by_model.setdefault((call.provider, call.model), UsageTotals()).add_call(call)
+            if self.backend is None:
+                return
+            self._pending.append(call.as_row())
+            overflow = len(self._pending) - self.max_pending
+            if overflow > 0:
+                del self._pending[:overflow]
+                self.dropped += overflow
+            full = len(self._pending) >= self.batch_size
+
+        if full:
+            try:
+                task = asyncio.get_running_loop().create_task(self.flush())
+            except RuntimeError:
+                return  # No loop (sync caller); the periodic flush picks it up
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+
+    async def flush(self) -> None:
+        """Write pending calls to the usage table."""
+        if self.backend is None:
+            return
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            with self._lock:
+                rows, self._pending = self._pending, []
+            if not rows:
+                return
+            try:
+                await self.backend.write(rows)
+                self.written += len(rows)
+            except Exception as e:
+                logger.warning(f"Failed to write {len(rows)} LLM usage rows, will retry: {e}")
+                with self._lock:
+                    self._pending = rows + self._pending
+                    overflow = len(self._pending) - self.max_pending
+                    if overflow > 0:
+                        del self._pending[:overflow]
+                        self.dropped += overflow
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self) -> None:
+        """Start the periodic flush (call from the app's event loop)."""
+        if self.backend is not None and self._flusher is None:
+            self._flusher = asyncio.get_running_loop().create_task(self._flush_periodically())
+
+    async def stop(self) -> None:
+        """Stop the periodic flush and write what is pending."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        """In-process totals per agent and per provider/model since startup."""
+        with self._lock:
+            return {
+                "by_agent": {agent: t.as_dict() for agent, t in sorted(self.by_agent.items())},
+                "by_model": {f"{provider}/{model}": t.as_dict() for (provider, model), t in sorted(self.by_model.items())},
+                "pending": len(self._pending),
+                "written": self.written,
+                "dropped": self.dropped,
+            }
+
+    async def report(self, since: float, group_by: str, limit: int = 100) -> list[dict]:
+        """
+        Persisted usage since a UNIX time, grouped by one dimension.
+
+        Args:
+            since: Start of the window (UNIX time)
+            group_by: One of REPORT_GROUPS
+            limit: Maximum number of groups, most expensive (then most tokens) first
+
+        Returns:
+            One dict per group: the group key plus calls, tokens, cost and latency
+
+        Raises:
+            ValueError: If group_by is unknown or no usage table is configured
+        """
+        if group_by not in REPORT_GROUPS:
+            raise ValueError(f"group_by must be one of {', '.join(REPORT_GROUPS)}")
+        if self.backend is None:
+            raise ValueError("No usage table configured (USAGE_BACKEND=none)")
+
+        await self.flush()
+        groups: dict[str, UsageTotals] = {}
+        for row in await self.backend.totals(since):
+            totals = groups.setdefault(row[group_by] or "", UsageTotals())
+            totals.add(
+                row["calls"] or 0, row["prompt_tokens"] or 0, row["completion_tokens"] or 0,
+                row["latency_ms"] or 0.0, float(row["cost_usd"] or 0.0), row["errors"] or 0
+            )
+        ranked = sorted(
+            groups.items(),
+            key=lambda item: (item[1].cost_usd, item[1].prompt_tokens + item[1].completion_tokens),
+            reverse=True
+        )
+        return [{group_by: key, **totals.as_dict()} for key, totals in ranked[:limit]]
+
+
+def _build_backend() -> UsageBackend | None:
+    """Select the usage table backend from settings."""
+    backend = settings.USAGE_BACKEND.lower()
+    if backend == "none":
+        return None
+    if backend == "supabase":
+        return SupabaseUsageBackend()
+    if backend != "sqlite":
+        logger.warning(f"Unknown USAGE_BACKEND '{settings.USAGE_BACKEND}', using sqlite")
+    return SQLiteUsageBackend(settings.USAGE_SQLITE_PATH)
+
+
+# Singleton instance
+usage_ledger = UsageLedger(
+    backend=_build_backend(),
+    batch_size=settings.USAGE_FLUSH_BATCH_SIZE,
+    flush_interval=settings.USAGE_FLUSH_INTERVAL_SECONDS,
+    max_pending=settings.USAGE_MAX_PENDING
+)
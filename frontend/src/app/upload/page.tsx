@@ -123,9 +123,7 @@ export default function UploadPage() {
 
         try {
             const result = await tailorApplication({
-                master_cv: analysisResult.master_cv,
-                job_analysis: analysisResult.job_analysis,
-                company_intel: analysisResult.company_intel,
+                session_id: analysisResult.session_id,
                 confirmed_skills: {
                     confirmed_missing_skills: confirmedSkills
                 }
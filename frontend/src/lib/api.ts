@@ -45,6 +45,7 @@ export interface SkillGapAnalysis {
 }
 
 export interface AnalysisResponse {
+    session_id: string;
     master_cv: any;
     job_analysis: {
         role_title: string;
@@ -71,9 +72,7 @@ export interface AnalysisResponse {
 }
 
 export interface TailorRequest {
-    master_cv: any;
-    job_analysis: any;
-    company_intel: any;
+    session_id: string;
     confirmed_skills: {
         confirmed_missing_skills: string[];
     };